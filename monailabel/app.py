@@ -28,6 +28,7 @@ from monailabel.endpoints import (
     info,
     login,
     logs,
+    metrics,
     model,
     ohif,
     proxy,
@@ -81,6 +82,7 @@ app.include_router(logs.router, prefix=settings.MONAI_LABEL_API_STR)
 app.include_router(ohif.router, prefix=settings.MONAI_LABEL_API_STR)
 app.include_router(proxy.router, prefix=settings.MONAI_LABEL_API_STR)
 app.include_router(session.router, prefix=settings.MONAI_LABEL_API_STR)
+app.include_router(metrics.router, prefix=settings.MONAI_LABEL_API_STR)
 
 
 @app.get("/", include_in_schema=False)
@@ -108,3 +110,9 @@ async def startup_event():
     instance = app_instance()
     instance.server_mode(True)
     instance.on_init_complete()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await proxy.close_proxy_client()
+    app_instance().close()
@@ -41,6 +41,12 @@ class Settings(BaseSettings):
     MONAI_LABEL_TASKS_STRATEGY: bool = True
     MONAI_LABEL_TASKS_SCORING: bool = True
     MONAI_LABEL_TASKS_BATCH_INFER: bool = True
+    # background tasks (e.g. scoring, batch_infer) which run in a long-lived (warm) worker process instead of a new
+    # process per run;  opt-in as the worker keeps app/networks (and gpu memory) loaded between the runs
+    MONAI_LABEL_TASKS_WARM_WORKERS: List[str] = []
+    MONAI_LABEL_SCHEDULER_GPU_TASKS: int = 1  # max background tasks running on same gpu; 0 => unlimited
+    # secs after last interactive (infer) request before scoring/batch infer tasks start or resume; 0 => never pause
+    MONAI_LABEL_SCHEDULER_IDLE_TIME: int = 10
 
     MONAI_LABEL_DATASTORE: str = ""
     MONAI_LABEL_DATASTORE_URL: str = ""
@@ -52,6 +58,10 @@ class Settings(BaseSettings):
     MONAI_LABEL_DATASTORE_ASSET_PATH: str = ""
 
     MONAI_LABEL_DATASTORE_DSA_ANNOTATION_GROUPS: str = ""
+    MONAI_LABEL_DATASTORE_DSA_INDEX_INTERVAL: int = 60  # secs between (incremental) refresh of local item index
+    MONAI_LABEL_DATASTORE_DSA_INDEX_FULL_INTERVAL: int = 3600  # secs between full refresh of local item index
+    MONAI_LABEL_DATASTORE_XNAT_WORKERS: int = 8  # max concurrent requests (catalog refresh, scan downloads)
+    MONAI_LABEL_DATASTORE_XNAT_CATALOG_INTERVAL: int = 60  # secs between refresh of (cached) catalog
 
     MONAI_LABEL_DICOMWEB_USERNAME: str = ""  # will be deprecated; use MONAI_LABEL_DATASTORE_USERNAME
     MONAI_LABEL_DICOMWEB_PASSWORD: str = ""  # will be deprecated; use MONAI_LABEL_DATASTORE_PASSWORD
@@ -60,14 +70,20 @@ class Settings(BaseSettings):
     MONAI_LABEL_WADO_PREFIX: Optional[str] = None
     MONAI_LABEL_STOW_PREFIX: Optional[str] = None
     MONAI_LABEL_DICOMWEB_FETCH_BY_FRAME: bool = False
+    MONAI_LABEL_DICOMWEB_DOWNLOAD_WORKERS: int = 8  # concurrent instance/frame requests (and pooled connections)
     MONAI_LABEL_DICOMWEB_CONVERT_TO_NIFTI: bool = True
     MONAI_LABEL_DICOMWEB_SEARCH_FILTER: Dict[str, Any] = {"Modality": "CT"}
     MONAI_LABEL_DICOMWEB_CACHE_EXPIRY: int = 180
     MONAI_LABEL_DICOMWEB_PROXY_TIMEOUT: float = 30.0
     MONAI_LABEL_DICOMWEB_READ_TIMEOUT: float = 5.0
+    MONAI_LABEL_DICOMWEB_PROXY_CONNECTIONS: int = 64  # max (pooled) connections to dicomweb server
+    MONAI_LABEL_DICOMWEB_PROXY_CACHE_PATH: str = ""
+    MONAI_LABEL_DICOMWEB_PROXY_CACHE_SIZE: int = 0  # in MB; cache for (immutable) wado instance/frames; 0 => disabled
 
     MONAI_LABEL_DATASTORE_AUTO_RELOAD: bool = True
     MONAI_LABEL_DATASTORE_READ_ONLY: bool = False
+    MONAI_LABEL_DATASTORE_METADATA_STORE: str = "json"  # json | sqlite
+    MONAI_LABEL_DATASTORE_RECONCILE_INTERVAL: int = 600
     MONAI_LABEL_DATASTORE_FILE_EXT: List[str] = [
         "*.nii.gz",
         "*.nii",
@@ -87,9 +103,36 @@ class Settings(BaseSettings):
     MONAI_LABEL_SESSIONS: bool = True
     MONAI_LABEL_SESSION_PATH: str = ""
     MONAI_LABEL_SESSION_EXPIRY: int = 3600
+    # (opt-in) keep decoded/pre-processed image of the session (for interactive infer tasks which add cache transform)
+    MONAI_LABEL_SESSION_CACHE: bool = False
+    MONAI_LABEL_SESSION_CACHE_MEMORY: int = 2048  # in MB (all sessions); 0 => only memory-mapped file in session path
 
     MONAI_LABEL_INFER_CONCURRENCY: int = -1
     MONAI_LABEL_INFER_TIMEOUT: int = 600
+    # bounded executors (workers + max waiting requests) for blocking work of the endpoints
+    MONAI_LABEL_API_INFER_WORKERS: int = 0  # 0 => MONAI_LABEL_INFER_CONCURRENCY (min 1)
+    MONAI_LABEL_API_INFER_QUEUE: int = 64
+    MONAI_LABEL_API_IO_WORKERS: int = 8
+    MONAI_LABEL_API_IO_QUEUE: int = 256
+    MONAI_LABEL_API_DATASTORE_WORKERS: int = 4
+    MONAI_LABEL_API_DATASTORE_QUEUE: int = 256
+    MONAI_LABEL_API_TASK_WORKERS: int = 1  # long running sync tasks (train/scoring/batch infer with run_sync)
+    MONAI_LABEL_API_TASK_QUEUE: int = 4
+    # devices (e.g. ["cuda:0", "cuda:1"]) for model servers;  http workers dispatch infer requests to them
+    MONAI_LABEL_MODEL_SERVERS: List[str] = []
+    MONAI_LABEL_MODEL_SERVER_PATH: str = ""  # directory for model server sockets; default => tmp dir
+    MONAI_LABEL_MODEL_SERVER_AUTHKEY: str = ""
+    MONAI_LABEL_MODEL_CACHE_GPU_MEMORY: int = 0  # in MB (per device); 0 => unlimited
+    MONAI_LABEL_MODEL_CACHE_HOST_MEMORY: int = 0  # in MB; 0 => unlimited
+    MONAI_LABEL_MODEL_CACHE_OFFLOAD: bool = True
+    MONAI_LABEL_TRANSFORM_CACHE_PATH: str = ""
+    MONAI_LABEL_TRANSFORM_CACHE_MEMORY: int = 4096  # in MB; 0 => unlimited
+    MONAI_LABEL_TRANSFORM_CACHE_DISK: int = 20480  # in MB; 0 => unlimited
+    MONAI_LABEL_TRANSFORM_CACHE_SHARED: bool = False  # in-memory cache also writes to/reads from (shared) disk
+    MONAI_LABEL_WSI_SLIDE_CACHE: int = 8  # max (idle) open slides shared by wsi infer tasks
+    MONAI_LABEL_WSI_PREFETCH_TILES: int = 2  # tiles to read ahead while running wsi infer tasks; 0 => disabled
+    MONAI_LABEL_WSI_TISSUE_THRESHOLD: float = 0.0  # min tissue fraction of a wsi tile to infer; 0 => all tiles
+    MONAI_LABEL_WSI_BATCH_SIZE: int = 8  # tiles per forward pass of wsi infer; 1 => one infer request per tile
     MONAI_LABEL_TRACKING_ENABLED: bool = True
     MONAI_LABEL_TRACKING_URI: str = ""
 
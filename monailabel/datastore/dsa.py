@@ -10,15 +10,19 @@
 # limitations under the License.
 
 import hashlib
+import json
 import logging
 import os
 import pathlib
+import threading
+import time
 from io import BytesIO
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import girder_client
 import numpy as np
+from cachetools import LRUCache
 from PIL import Image
 
 from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
@@ -26,8 +30,204 @@ from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
 logger = logging.getLogger(__name__)
 
 
+class DSAIndex:
+    """
+    Local index of the items (images) and annotations of DSA server which answers listing queries of the datastore.
+
+    Index is saved under `path` and refreshed incrementally (at most once every `interval` secs) by fetching only the
+    items/annotations updated since the last refresh (sorted by `updated`).  Deleted items/annotations are dropped
+    by a full refresh every `full_interval` secs.  Records are fetched outside of the lock;  only one refresh runs at
+    a time and the queries meanwhile are answered from the current version of the index.
+
+    :param gc: girder client
+    :param folders_fn: returns the folder ids (of images) to index
+    :param path: path to save the index (json)
+    :param interval: min secs between incremental refresh;  0 => refresh on every query
+    :param full_interval: secs between full refresh;  0 => always refresh fully
+    :param page_size: number of records to fetch per request (pages overlap by a record)
+    """
+
+    def __init__(
+        self,
+        gc: girder_client.GirderClient,
+        folders_fn: Callable[[], List[str]],
+        path: str,
+        interval: int = 60,
+        full_interval: int = 3600,
+        page_size: int = 1000,
+    ):
+        self.gc = gc
+        self.folders_fn = folders_fn
+        self.path = path
+        self.interval = interval
+        self.full_interval = full_interval
+        self.page_size = max(page_size, 2)
+        self.max_paging_retries = 3
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.annotations: Dict[str, Dict[str, Any]] = {}
+        self._folders_ts: Dict[str, str] = {}
+        self._annotations_ts = ""
+        self._refresh_ts = 0.0
+        self._full_refresh_ts = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as fc:
+                d = json.load(fc)
+            self.items = d["items"]
+            self.annotations = d["annotations"]
+            self._folders_ts = d["folders_ts"]
+            self._annotations_ts = d["annotations_ts"]
+            self._full_refresh_ts = d["full_refresh_ts"]
+            logger.info(f"DSA:: Index loaded from {self.path}; items: {len(self.items)}")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logger.warning(f"DSA:: Ignore invalid index {self.path}; {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        d = {
+            "items": self.items,
+            "annotations": self.annotations,
+            "folders_ts": self._folders_ts,
+            "annotations_ts": self._annotations_ts,
+            "full_refresh_ts": self._full_refresh_ts,
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as fc:
+            json.dump(d, fc)
+        os.replace(tmp, self.path)
+
+    def _updated_since(self, resource: str, parameters: Dict[str, Any], since: str) -> List[Dict[str, Any]]:
+        """
+        Records updated since `since` (newest first).  Offset based pages overlap by a record;  if the overlap does
+        not match, records were updated/deleted while paging (and shifted) so paging starts over.
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        for attempt in range(self.max_paging_retries + 1):
+            offset = 0
+            last = None
+            while True:
+                page = self.gc.get(
+                    resource,
+                    parameters={
+                        **parameters,
+                        "limit": self.page_size,
+                        "offset": offset,
+                        "sort": "updated",
+                        "sortdir": -1,
+                    },
+                )
+                if last is not None:
+                    if not page or page[0]["_id"] != last:
+                        break  # shifted
+                    page = page[1:]
+
+                for d in page:
+                    # records updated at the same ts as last refresh are fetched again (upsert is idempotent)
+                    if since and d.get("updated", "") < since:
+                        return list(result.values())
+                    result[d["_id"]] = d
+                if len(page) < self.page_size - (last is not None):
+                    return list(result.values())
+
+                last = page[-1]["_id"]
+                offset += self.page_size - 1  # next page starts with the last record (of this page)
+
+            logger.info(f"DSA:: {resource} records changed while paging; start over (attempt: {attempt + 1})")
+
+        logger.warning(f"DSA:: {resource} records keep changing while paging; some can be missed until full refresh")
+        return list(result.values())
+
+    def refresh(self, force: bool = False, full: bool = False):
+        """
+        Refresh the index (if `interval` secs have passed since last refresh)
+
+        :param force: refresh even if `interval` secs have not passed
+        :param full: re-build the full index (instead of fetching only updated records)
+        """
+        if not force and not full and time.time() - self._refresh_ts < self.interval:
+            return
+
+        # one refresh at a time;  other (not forced) callers do not wait and use the current version of the index
+        if not self._refresh_lock.acquire(blocking=force or full):
+            return
+        try:
+            self._refresh(full)
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, full: bool):
+        current_ts = time.time()
+
+        # copy-on-write;  readers iterate over previous version while it's being refreshed (outside of the lock)
+        with self._lock:
+            full = full or current_ts - self._full_refresh_ts >= self.full_interval
+            items = {} if full else dict(self.items)
+            annotations = {} if full else dict(self.annotations)
+            folders_ts = {} if full else dict(self._folders_ts)
+            annotations_ts = "" if full else self._annotations_ts
+
+        folders = self.folders_fn()
+        if set(folders_ts) - set(folders):
+            items = {k: v for k, v in items.items() if v["folderId"] in folders}
+
+        count = 0
+        for folder in folders:
+            updated = self._updated_since("item", {"folderId": folder}, folders_ts.get(folder, ""))
+            for d in updated:
+                items[d["_id"]] = {
+                    "name": d["name"],
+                    "folderId": folder,
+                    "largeImage": bool(d.get("largeImage")),
+                    "updated": d.get("updated", ""),
+                }
+            folders_ts[folder] = max([d.get("updated", "") for d in updated] + [folders_ts.get(folder, "")])
+            count += len(updated)
+
+        updated = self._updated_since("annotation", {}, annotations_ts)
+        for d in updated:
+            annotations[d["_id"]] = {
+                "itemId": d["itemId"],
+                "name": d.get("annotation", {}).get("name"),
+                "groups": d.get("groups", []),
+                "updated": d.get("updated", ""),
+            }
+        annotations_ts = max([d.get("updated", "") for d in updated] + [annotations_ts])
+
+        with self._lock:
+            self.items, self.annotations = items, annotations
+            self._folders_ts = {f: folders_ts[f] for f in folders}
+            self._annotations_ts = annotations_ts
+            self._refresh_ts = current_ts
+            if full:
+                self._full_refresh_ts = current_ts
+        if full or count or updated:
+            self._save()
+
+        logger.info(
+            f"DSA:: Index refreshed (full: {full}) in {time.time() - current_ts:.3f} secs; "
+            f"updated items: {count}; updated annotations: {len(updated)}; total items: {len(items)}"
+        )
+
+
 class DSADatastore(Datastore):
-    def __init__(self, api_url, api_key=None, folder=None, annotation_groups=None, asset_store_path="", cache_path=""):
+    def __init__(
+        self,
+        api_url,
+        api_key=None,
+        folder=None,
+        annotation_groups=None,
+        asset_store_path="",
+        cache_path="",
+        index_interval=60,
+        index_full_interval=3600,
+    ):
         self.api_url = api_url
         self.api_key = api_key
         self.folders = folder.split(",") if folder else []
@@ -52,6 +252,17 @@ class DSADatastore(Datastore):
         if api_key:
             self.gc.authenticate(apiKey=api_key)
 
+        folders_hash = hashlib.md5(",".join(sorted(self.folders)).encode("utf-8")).hexdigest()
+        self.index = DSAIndex(
+            gc=self.gc,
+            folders_fn=lambda: list(self.folders) if self.folders else self._get_all_folders(),
+            path=os.path.join(self.cache_path, f".index-{folders_hash}.json"),
+            interval=index_interval,
+            full_interval=index_full_interval,
+        )
+        self._annotation_elements: LRUCache = LRUCache(maxsize=256)
+        self._annotation_elements_lock = threading.Lock()
+
     def name(self) -> str:
         return "DSA Datastore"
 
@@ -84,27 +295,36 @@ class DSADatastore(Datastore):
     def get_annotations_by_image_id(self, image_id: str) -> Dict[str, Dict[str, List]]:
         image_id, name = self._name_to_id(image_id)
 
-        data = self.gc.get("annotation", parameters={"limit": 0})
+        self.index.refresh()
+        annotations = {k: v for k, v in self.index.annotations.items() if v["itemId"] == image_id}
         result: Dict[str, Dict[str, List]] = {}
 
-        # TODO(avirodov): probably can request only annotation for a given image_id, need to check how.
         # TODO(avirodov): download only "relevant" annotations. Maybe a flag to start_server?
-        for d in data:
-            if d["itemId"] == image_id:
-                annotation_data = self.gc.get(f'annotation/{d["_id"]}')
-                name = d["annotation"]["name"]
-                result[name] = {}
-                result[name]["points"] = []
-                for element in annotation_data["annotation"]["elements"]:
-                    # TODO(avirodov): support other elements for other training types. For now only NuClick points.
-                    if element["type"] == "point":
-                        # TODO(avirodov): Define a proper annotation model for Monai-Label (DSA's model could be it).
-                        result[name]["points"].append(
-                            (float(element["center"][0]), float(element["center"][1]), float(element["center"][2]))
-                        )
+        for annotation_id, d in annotations.items():
+            annotation_data = self._get_annotation(annotation_id, d["updated"])
+            name = d["name"]
+            result[name] = {}
+            result[name]["points"] = []
+            for element in annotation_data["annotation"]["elements"]:
+                # TODO(avirodov): support other elements for other training types. For now only NuClick points.
+                if element["type"] == "point":
+                    # TODO(avirodov): Define a proper annotation model for Monai-Label (DSA's model could be it).
+                    result[name]["points"].append(
+                        (float(element["center"][0]), float(element["center"][1]), float(element["center"][2]))
+                    )
 
         return result
 
+    def _get_annotation(self, annotation_id: str, updated: str):
+        key = (annotation_id, updated)
+        with self._annotation_elements_lock:
+            annotation_data = self._annotation_elements.get(key)
+        if annotation_data is None:
+            annotation_data = self.gc.get(f"annotation/{annotation_id}")
+            with self._annotation_elements_lock:
+                self._annotation_elements[key] = annotation_data
+        return annotation_data
+
     def get_image(self, image_id: str, params=None) -> Any:
         try:
             name = self.get_image_info(image_id)["name"]
@@ -134,12 +354,10 @@ class DSADatastore(Datastore):
         return np.asarray(img, dtype=np.uint8)
 
     def _name_to_id(self, name):
-        folders = self.folders if self.folders else self._get_all_folders()
-        for folder in folders:
-            data = self.gc.get("item", parameters={"folderId": folder, "limit": 0})
-            for d in data:
-                if d.get("largeImage") and d["name"] == name or Path(d["name"]).stem == name:
-                    return d["_id"], d["name"]
+        self.index.refresh()
+        for item_id, d in self.index.items.items():
+            if d["largeImage"] and d["name"] == name or Path(d["name"]).stem == name:
+                return item_id, d["name"]
         return name
 
     def get_image_uri(self, image_id: str) -> str:
@@ -170,18 +388,19 @@ class DSADatastore(Datastore):
         return f"{self.api_url}/annotation/item/{label_id}"
 
     def get_image_info(self, image_id: str) -> Dict[str, Any]:
-        return self.gc.getItem(image_id)  # type: ignore
+        item = self.gc.getItem(image_id)
+        return {**item.get("meta", {}), **item}  # custom info (metadata) + item fields
 
     def get_label_info(self, label_id: str, label_tag: str) -> Dict[str, Any]:
         return {}
 
     def _get_annotated_images(self):
-        data = self.gc.get("annotation", parameters={"limit": 0})
+        self.index.refresh()
 
-        images = []
-        for d in data:
+        images = set()
+        for d in self.index.annotations.values():
             if not self.annotation_groups:
-                images.append(d["itemId"])
+                images.add(d["itemId"])
                 continue
 
             # get annotations and find if any matching groups exist
@@ -189,7 +408,7 @@ class DSADatastore(Datastore):
                 g for g in d["groups"] if g in self.annotation_groups or (g and g.lower() in self.annotation_groups)
             ]
             if matched:
-                images.append(d["itemId"])
+                images.add(d["itemId"])
         return images
 
     def get_labeled_images(self, label_tag: Optional[str] = None, labels: Optional[List[str]] = None) -> List[str]:
@@ -199,8 +418,8 @@ class DSADatastore(Datastore):
 
     def get_unlabeled_images(self, label_tag: Optional[str] = None, labels: Optional[List[str]] = None) -> List[str]:
         images = self.list_images()
-        labeled = self.get_labeled_images()
-        return [image for image in images if image not in labeled]
+        annotated = self._get_annotated_images()
+        return [image for image in images if image not in annotated]
 
     def _get_all_folders(self):
         folders = []
@@ -210,16 +429,13 @@ class DSADatastore(Datastore):
         return folders
 
     def list_images(self) -> List[str]:
-        images = []
-        folders = self.folders if self.folders else self._get_all_folders()
-        for folder in folders:
-            for item in self.gc.get("item", parameters={"folderId": folder, "limit": 0}):
-                if item.get("largeImage"):
-                    images.append(item["_id"])
-        return images
+        self.index.refresh()
+        items = self.index.items
+        images = [item_id for item_id, d in items.items() if d["largeImage"]]
+        return sorted(images, key=lambda i: items[i]["name"].lower())
 
     def refresh(self) -> None:
-        pass
+        self.index.refresh(force=True)
 
     def add_image(self, image_id: str, image_filename: str, image_info: Dict[str, Any]) -> str:
         raise NotImplementedError
@@ -234,7 +450,8 @@ class DSADatastore(Datastore):
         raise NotImplementedError
 
     def update_image_info(self, image_id: str, info: Dict[str, Any]) -> None:
-        raise NotImplementedError
+        # saved as (girder) metadata of the item;  see get_image_info
+        self.gc.addMetadataToItem(image_id, info)
 
     def update_label_info(self, label_id: str, label_tag: str, info: Dict[str, Any]) -> None:
         raise NotImplementedError
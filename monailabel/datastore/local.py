@@ -18,6 +18,7 @@ import os
 import pathlib
 import shutil
 import tempfile
+import threading
 import time
 import zipfile
 from typing import Any, Dict, List, Optional, Tuple
@@ -26,8 +27,10 @@ from filelock import FileLock
 from pydantic import BaseModel
 from watchdog.events import PatternMatchingEventHandler
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
 from watchdog.observers.polling import PollingObserver
 
+from monailabel.datastore.utils.metadata import create_metadata_store
 from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
 from monailabel.interfaces.exception import ImageNotFoundException, LabelNotFoundException
 from monailabel.utils.others.generic import file_ext, remove_file
@@ -105,6 +108,9 @@ class LocalDatastore(Datastore):
         extensions=("*.nii.gz", "*.nii"),
         auto_reload=False,
         read_only=False,
+        metadata_store="json",
+        reconcile_interval=600,
+        reconcile=True,
     ):
         """
         Creates a `LocalDataset` object
@@ -116,20 +122,36 @@ class LocalDatastore(Datastore):
 
         `datastore_config: str`
             optional file name of the dataset configuration file (by default `dataset.json`)
+
+        `metadata_store: str`
+            backend to persist the datastore metadata; `json` (default) or `sqlite`.
+            For `sqlite`, an existing datastore config file is migrated (once) into `<datastore_config>.db`
+
+        `reconcile_interval: int`
+            interval (in seconds) to run full consistency check against files on disk when `auto_reload` is enabled;
+            file-watcher events are applied incrementally;  0 to disable the periodic check
+
+        `reconcile: bool`
+            reconcile against files on disk (on init, file-watcher events and periodically);  set it to False for all
+            but one of the processes sharing the datastore (e.g. http workers), which then only reload the datastore
+            config (when modified by the reconciling process) if `auto_reload` is enabled
         """
         self._datastore_path = datastore_path
         self._datastore_config_path = os.path.join(datastore_path, datastore_config)
         self._extensions = [extensions] if isinstance(extensions, str) else extensions
         self._ignore_event_count = 0
         self._ignore_event_config = False
-        self._config_ts = 0
         self._auto_reload = auto_reload
+        self._observer: Optional[BaseObserver] = None
+        self._reconciler: Optional[threading.Thread] = None
+        self._closed = threading.Event()
 
         logging.getLogger("filelock").setLevel(logging.ERROR)
 
-        logger.info(f"Auto Reload: {auto_reload}; Extensions: {self._extensions}")
+        logger.info(f"Auto Reload: {auto_reload}; Extensions: {self._extensions}; Metadata Store: {metadata_store}")
 
         os.makedirs(self._datastore_path, exist_ok=True)
+        self._store = create_metadata_store(metadata_store, self._datastore_config_path)
 
         self._lock_file = os.path.join(datastore_path, ".lock")
         self._datastore: LocalDatastoreModel = LocalDatastoreModel(
@@ -144,34 +166,37 @@ class LocalDatastore(Datastore):
         os.makedirs(self._datastore.label_path(DefaultLabelTag.ORIGINAL), exist_ok=True)
 
         # reconcile the loaded datastore file with any existing files in the path
-        if not read_only:
+        if not read_only and reconcile:
             self._reconcile_datastore()
 
         if auto_reload:
-            logger.info("Start observing external modifications on datastore (AUTO RELOAD)")
-            # Image Dir
-            include_patterns = [f"{self._datastore.image_path()}{os.path.sep}{ext}" for ext in [*extensions]]
-
-            # Label Dir(s)
-            label_dirs = self._datastore.labels_path()
-            label_dirs[DefaultLabelTag.FINAL] = self._datastore.label_path(DefaultLabelTag.FINAL)
-            label_dirs[DefaultLabelTag.ORIGINAL] = self._datastore.label_path(DefaultLabelTag.ORIGINAL)
-            for label_dir in label_dirs.values():
-                include_patterns.extend(f"{label_dir}{os.path.sep}{ext}" for ext in [*extensions])
+            logger.info(f"Start observing external modifications on datastore (AUTO RELOAD); Reconcile: {reconcile}")
+            include_patterns: List[str] = []
+            if reconcile:
+                # Image Dir
+                include_patterns.extend(f"{self._datastore.image_path()}{os.path.sep}{ext}" for ext in [*extensions])
+
+                # Label Dir(s)
+                label_dirs = self._datastore.labels_path()
+                label_dirs[DefaultLabelTag.FINAL] = self._datastore.label_path(DefaultLabelTag.FINAL)
+                label_dirs[DefaultLabelTag.ORIGINAL] = self._datastore.label_path(DefaultLabelTag.ORIGINAL)
+                for label_dir in label_dirs.values():
+                    include_patterns.extend(f"{label_dir}{os.path.sep}{ext}" for ext in [*extensions])
 
             # Config
-            include_patterns.append(self._datastore_config_path)
+            include_patterns.extend(self._store.patterns())
 
             self._handler = PatternMatchingEventHandler(patterns=include_patterns)
             self._handler.on_created = self._on_any_event
             self._handler.on_deleted = self._on_any_event
+            self._handler.on_moved = self._on_move_event
             self._handler.on_modified = self._on_modify_event
 
             try:
                 self._ignore_event_count = 0
                 self._ignore_event_config = False
                 self._observer = PollingObserver() if self._is_on_mount(self._datastore.image_path()) else Observer()
-                self._observer.schedule(self._handler, recursive=True, path=self._datastore_path)
+                self._observer.schedule(self._handler, recursive=reconcile, path=self._datastore_path)
                 self._observer.start()
             except OSError as e:
                 logger.error(
@@ -180,6 +205,15 @@ class LocalDatastore(Datastore):
                 )
                 logger.error(str(e))
 
+            if reconcile_interval > 0 and not read_only and reconcile:
+                self._reconciler = threading.Thread(
+                    target=self._periodic_reconcile,
+                    args=(reconcile_interval,),
+                    name="DatastoreReconcile",
+                    daemon=True,
+                )
+                self._reconciler.start()
+
     def name(self) -> str:
         """
         Dataset name (if one is assigned)
@@ -197,7 +231,7 @@ class LocalDatastore(Datastore):
                 name (str): Desired dataset name
         """
         self._datastore.name = name
-        self._update_datastore_file()
+        self._update_datastore_file(ids=[])
 
     def description(self) -> str:
         """
@@ -214,7 +248,7 @@ class LocalDatastore(Datastore):
         :param description: str
         """
         self._datastore.description = description
-        self._update_datastore_file()
+        self._update_datastore_file(ids=[])
 
     def _to_id(self, file: str) -> Tuple[str, str]:
         ext = file_ext(file)
@@ -412,11 +446,60 @@ class LocalDatastore(Datastore):
             return
 
         logger.debug(f"Event: {event}")
-        self.refresh()
+        if not event.is_directory:
+            self._on_file_changed(event.src_path)
+
+    def _on_move_event(self, event):
+        logger.debug(f"Event: {event}")
+        if not event.is_directory:
+            self._on_file_changed(event.src_path)
+            self._on_file_changed(event.dest_path)
+
+    def _on_file_changed(self, path):
+        # datastore config (re)written by other process (e.g. atomic replace => created/moved event)
+        if self._store.owns(path):
+            self._init_from_datastore_file()
+            return
+
+        # apply delta for a single image/label file instead of full rescan of the datastore
+        self._init_from_datastore_file()
+
+        file_dir = os.path.realpath(os.path.dirname(path))
+        file_id, file_ext = self._to_id(os.path.basename(path))
+        exists = os.path.exists(path)
+
+        if file_dir == os.path.realpath(self._datastore.image_path()):
+            if exists:
+                invalidate = self._add_image_entry(file_id, file_ext)
+                labels_dir = self._datastore.label_path(None)
+                for tag in [f for f in os.listdir(labels_dir) if os.path.isdir(os.path.join(labels_dir, f))]:
+                    for ext in [e.replace("*", "") for e in self._extensions]:
+                        if os.path.exists(os.path.join(self._datastore.label_path(tag), self._filename(file_id, ext))):
+                            invalidate += self._add_label_entry(tag, file_id, ext)
+            else:
+                invalidate = self._remove_image_entry(file_id, file_ext)
+        elif os.path.dirname(file_dir) == os.path.realpath(self._datastore.label_path(None)):
+            tag = os.path.basename(file_dir)
+            if exists:
+                invalidate = self._add_label_entry(tag, file_id, file_ext)
+            else:
+                invalidate = self._remove_label_entry(tag, file_id, file_ext)
+        else:
+            return
+
+        if invalidate:
+            self._update_datastore_file(ids=[file_id])
+
+    def _periodic_reconcile(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self._reconcile_datastore()
+            except Exception as e:
+                logger.error(f"Failed to reconcile datastore => {e}")
 
     def _on_modify_event(self, event):
         # handle modify events only for config path; rest ignored
-        if event.src_path != self._datastore_config_path:
+        if not self._store.owns(event.src_path):
             return
 
         if self._ignore_event_config:
@@ -431,6 +514,20 @@ class LocalDatastore(Datastore):
         """
         self._reconcile_datastore()
 
+    def close(self) -> None:
+        """
+        Stop watching the datastore (file-watcher and periodic reconcile) and close the metadata store
+        """
+        self._closed.set()
+        if self._reconciler is not None:
+            self._reconciler.join()
+            self._reconciler = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        self._store.close()
+
     def add_image(self, image_id: str, image_filename: str, image_info: Dict[str, Any]) -> str:
         id, image_ext = self._to_id(os.path.basename(image_filename))
         if not image_id:
@@ -450,7 +547,7 @@ class LocalDatastore(Datastore):
             image_info["name"] = name
 
             self._datastore.objects[image_id] = ImageLabelModel(image=DataModel(info=image_info, ext=image_ext))
-            self._update_datastore_file(lock=False)
+            self._update_datastore_file(lock=False, ids=[image_id])
         logger.debug("Released the lock!")
         return image_id
 
@@ -470,8 +567,8 @@ class LocalDatastore(Datastore):
         name = self._filename(image_id, obj.image.ext)
         remove_file(os.path.realpath(os.path.join(self._datastore.image_path(), name)))
 
-        if not self._auto_reload:
-            self.refresh()
+        if self._remove_image_entry(image_id, obj.image.ext):
+            self._update_datastore_file(ids=[image_id])
 
     def save_label(self, image_id: str, label_filename: str, label_tag: str, label_info: Dict[str, Any]) -> str:
         """
@@ -508,16 +605,17 @@ class LocalDatastore(Datastore):
 
             obj.labels[label_tag] = DataModel(info=label_info, ext=label_ext)
             logger.info(f"Label Info: {label_info}")
-            self._update_datastore_file(lock=False)
+            self._update_datastore_file(lock=False, ids=[image_id])
         logger.debug("Release the lock!")
         return label_id
 
     def remove_label(self, label_id: str, label_tag: str) -> None:
         logger.info(f"Removing label: {label_id} => {label_tag}")
+        label = self._datastore.label(label_id, label_tag)
         remove_file(self.get_label_uri(label_id, label_tag))
 
-        if not self._auto_reload:
-            self.refresh()
+        if label and self._remove_label_entry(label_tag, label_id, label.ext):
+            self._update_datastore_file(ids=[label_id])
 
     def update_image_info(self, image_id: str, info: Dict[str, Any]) -> None:
         """
@@ -531,7 +629,7 @@ class LocalDatastore(Datastore):
             raise ImageNotFoundException(f"Image {image_id} not found")
 
         obj.image.info.update(info)
-        self._update_datastore_file()
+        self._update_datastore_file(ids=[image_id])
 
     def update_label_info(self, label_id: str, label_tag: str, info: Dict[str, Any]) -> None:
         """
@@ -546,7 +644,40 @@ class LocalDatastore(Datastore):
             raise LabelNotFoundException(f"Label: {label_id} Tag: {label_tag} not found")
 
         label.info.update(info)
-        self._update_datastore_file()
+        self._update_datastore_file(ids=[label_id])
+
+    def update_image_info_many(self, infos: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update (or create a new) info tag for multiple images;  datastore is flushed only once
+
+        :param infos: dictionary of image id => custom image information Dict[str, Any]
+        """
+        objs = {image_id: self._datastore.objects.get(image_id) for image_id in infos}
+        missing = [image_id for image_id, obj in objs.items() if not obj]
+        if missing:
+            raise ImageNotFoundException(f"Image(s) {missing} not found")
+
+        for image_id, info in infos.items():
+            objs[image_id].image.info.update(info)  # type: ignore
+        if infos:
+            self._update_datastore_file(ids=list(infos.keys()))
+
+    def update_label_info_many(self, label_tag: str, infos: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update (or create a new) info tag for multiple labels;  datastore is flushed only once
+
+        :param label_tag: the matching label tag
+        :param infos: dictionary of label id => custom label information Dict[str, Any]
+        """
+        labels = {label_id: self._datastore.label(label_id, label_tag) for label_id in infos}
+        missing = [label_id for label_id, label in labels.items() if not label]
+        if missing:
+            raise LabelNotFoundException(f"Label(s): {missing} Tag: {label_tag} not found")
+
+        for label_id, info in infos.items():
+            labels[label_id].info.update(info)  # type: ignore
+        if infos:
+            self._update_datastore_file(ids=list(infos.keys()))
 
     def _list_files(self, path, patterns):
         files = os.listdir(path)
@@ -560,6 +691,8 @@ class LocalDatastore(Datastore):
 
     def _reconcile_datastore(self):
         logger.debug("reconcile datastore...")
+        self._init_from_datastore_file()
+
         invalidate = 0
         invalidate += self._remove_non_existing()
         invalidate += self._add_non_existing_images()
@@ -572,8 +705,6 @@ class LocalDatastore(Datastore):
         for tag in tags:
             invalidate += self._add_non_existing_labels(tag)
 
-        invalidate += self._remove_non_existing()
-
         logger.info(f"Invalidate count: {invalidate}")
         if invalidate:
             logger.debug("Save datastore file to disk")
@@ -581,113 +712,134 @@ class LocalDatastore(Datastore):
         else:
             logger.debug("No changes needed to flush to disk")
 
+    def _add_image_entry(self, image_id: str, image_ext: str) -> int:
+        if image_id in self._datastore.objects:
+            return 0
+
+        name = self._filename(image_id, image_ext)
+        logger.info(f"Adding New Image: {image_id} => {name}")
+        image_info = {
+            "ts": int(time.time()),
+            # "checksum": file_checksum(os.path.join(self._datastore.image_path(), name)),
+            "name": name,
+        }
+
+        self._datastore.objects[image_id] = ImageLabelModel(image=DataModel(info=image_info, ext=image_ext))
+        return 1
+
+    def _remove_image_entry(self, image_id: str, image_ext: str) -> int:
+        obj = self._datastore.objects.get(image_id)
+        if not obj or obj.image.ext != image_ext:
+            return 0
+
+        logger.info(f"Removing non existing Image Id: {image_id}")
+        self._datastore.objects.pop(image_id)
+        return 1
+
+    def _add_label_entry(self, tag: str, label_id: str, label_ext: str) -> int:
+        obj = self._datastore.objects.get(label_id)
+        if not obj:
+            logger.warning(f"IGNORE:: No matching image exists for '{label_id}' to add [{tag}]")
+            return 0
+        if obj.labels.get(tag):
+            return 0
+
+        name = self._filename(label_id, label_ext)
+        logger.info(f"Adding New Label: {tag} => {label_id} => {name}")
+        label_info = {
+            "ts": int(time.time()),
+            # "checksum": file_checksum(os.path.join(self._datastore.label_path(tag), name)),
+            "name": name,
+        }
+
+        obj.labels[tag] = DataModel(info=label_info, ext=label_ext)
+        return 1
+
+    def _remove_label_entry(self, tag: str, label_id: str, label_ext: str) -> int:
+        label = self._datastore.label(label_id, tag)
+        if not label or label.ext != label_ext:
+            return 0
+
+        logger.info(f"Removing non existing Label Id: '{label_id}' for '{tag}'")
+        self._datastore.objects[label_id].labels.pop(tag)
+        return 1
+
     def _add_non_existing_images(self) -> int:
         invalidate = 0
-        self._init_from_datastore_file()
-
         local_images = self._list_files(self._datastore.image_path(), self._extensions)
-
-        image_ids = list(self._datastore.objects.keys())
         for image_file in local_images:
             image_id, image_ext = self._to_id(image_file)
-            if image_id not in image_ids:
-                logger.info(f"Adding New Image: {image_id} => {image_file}")
-
-                name = self._filename(image_id, image_ext)
-                image_info = {
-                    "ts": int(time.time()),
-                    # "checksum": file_checksum(os.path.join(self._datastore.image_path(), name)),
-                    "name": name,
-                }
-
-                invalidate += 1
-                self._datastore.objects[image_id] = ImageLabelModel(image=DataModel(info=image_info, ext=image_ext))
-
+            invalidate += self._add_image_entry(image_id, image_ext)
         return invalidate
 
     def _add_non_existing_labels(self, tag) -> int:
         invalidate = 0
-        self._init_from_datastore_file()
-
         local_labels = self._list_files(self._datastore.label_path(tag), self._extensions)
-
-        image_ids = list(self._datastore.objects.keys())
         for label_file in local_labels:
             label_id, label_ext = self._to_id(label_file)
-
-            obj = self._datastore.objects.get(label_id)
-            if not obj or label_id not in image_ids:
-                logger.warning(f"IGNORE:: No matching image exists for '{label_id}' to add [{label_file}]")
-                continue
-
-            if not obj.labels.get(tag):
-                logger.info(f"Adding New Label: {tag} => {label_id} => {label_file}")
-
-                name = self._filename(label_id, label_ext)
-                label_info = {
-                    "ts": int(time.time()),
-                    # "checksum": file_checksum(os.path.join(self._datastore.label_path(tag), name)),
-                    "name": name,
-                }
-
-                self._datastore.objects[label_id].labels[tag] = DataModel(info=label_info, ext=label_ext)
-                invalidate += 1
-
+            invalidate += self._add_label_entry(tag, label_id, label_ext)
         return invalidate
 
     def _remove_non_existing(self) -> int:
         invalidate = 0
-        self._init_from_datastore_file()
-
-        objects: Dict[str, ImageLabelModel] = {}
-        for image_id, obj in self._datastore.objects.items():
+        for image_id, obj in list(self._datastore.objects.items()):
             name = self._filename(image_id, obj.image.ext)
             if not os.path.exists(os.path.realpath(os.path.join(self._datastore.image_path(), name))):
-                logger.info(f"Removing non existing Image Id: {image_id}")
-                invalidate += 1
-            else:
-                labels: Dict[str, DataModel] = {}
-                for tag, label in obj.labels.items():
-                    name = self._filename(image_id, label.ext)
-                    if not os.path.exists(os.path.realpath(os.path.join(self._datastore.label_path(tag), name))):
-                        logger.info(f"Removing non existing Label Id: '{image_id}' for '{tag}'")
-                        invalidate += 1
-                    else:
-                        labels[tag] = label
-                obj.labels.clear()
-                obj.labels.update(labels)
-                objects[image_id] = obj
-
-        self._datastore.objects.clear()
-        self._datastore.objects.update(objects)
+                invalidate += self._remove_image_entry(image_id, obj.image.ext)
+                continue
+
+            for tag, label in list(obj.labels.items()):
+                name = self._filename(image_id, label.ext)
+                if not os.path.exists(os.path.realpath(os.path.join(self._datastore.label_path(tag), name))):
+                    invalidate += self._remove_label_entry(tag, image_id, label.ext)
         return invalidate
 
     def _init_from_datastore_file(self, throw_exception=False):
+        def _read_changes():
+            changes = self._store.changes()
+            if changes is None:
+                return
+
+            data, partial = changes
+            if not partial:
+                ds = self._datastore.dict(exclude={"objects", "base_path"})
+                ds.update(data)
+                self._datastore = LocalDatastoreModel.parse_obj(ds)
+                self._datastore.base_path = self._datastore_path
+                return
+
+            for k, v in data.items():
+                if k != "objects":
+                    setattr(self._datastore, k, v)
+            for image_id, obj in data.get("objects", {}).items():
+                if obj is None:
+                    self._datastore.objects.pop(image_id, None)
+                else:
+                    self._datastore.objects[image_id] = ImageLabelModel.parse_obj(obj)
+
         try:
-            with FileLock(self._lock_file):
-                logger.debug("Acquired the lock!")
-                if os.path.exists(self._datastore_config_path):
-                    ts = os.stat(self._datastore_config_path).st_mtime
-                    if self._config_ts != ts:
-                        logger.debug(f"Reload Datastore; old ts: {self._config_ts}; new ts: {ts}")
-                        self._datastore = LocalDatastoreModel.parse_file(self._datastore_config_path)
-                        self._datastore.base_path = self._datastore_path
-                        self._config_ts = ts
-            logger.debug("Release the Lock...")
+            if self._store.file_lock:
+                with FileLock(self._lock_file):
+                    logger.debug("Acquired the lock!")
+                    _read_changes()
+                logger.debug("Release the Lock...")
+            else:
+                _read_changes()
         except ValueError as e:
             logger.error(f"+++ Failed to load datastore => {e}")
             if throw_exception:
                 raise e
 
-    def _update_datastore_file(self, lock=True):
+    def _update_datastore_file(self, lock=True, ids: Optional[List[str]] = None):
         def _write_to_file():
             logger.debug("+++ Datastore is updated...")
             self._ignore_event_config = True
-            with open(self._datastore_config_path, "w") as f:
-                f.write(json.dumps(self._datastore.dict(exclude={"base_path"}), indent=2, default=str))
-            self._config_ts = os.stat(self._datastore_config_path).st_mtime
+            if ids is None:
+                self._store.save(self._datastore)
+            else:
+                self._store.update(self._datastore, ids)
 
-        if lock:
+        if lock and self._store.file_lock:
             with FileLock(self._lock_file):
                 logger.debug("Acquired the Lock...")
                 _write_to_file()
@@ -11,14 +11,24 @@
 
 import logging
 import os
+import shutil
+import tempfile
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from hashlib import md5
+from typing import Dict, List, Optional
 
+import requests
 from dicomweb_client import DICOMwebClient
+from dicomweb_client.session_utils import create_session
+from filelock import FileLock
 from pydicom.dataset import Dataset
 from pydicom.filereader import dcmread
+from requests.adapters import HTTPAdapter
 
+from monailabel.config import settings
 from monailabel.utils.others.generic import run_command
 
 logger = logging.getLogger(__name__)
@@ -62,8 +72,78 @@ def store_scu(input_file, host="127.0.0.1", port="4242", aet="MONAILABEL"):
     logger.info(f"Time to run STORE-SCU: {time.time() - start} (sec)")
 
 
-def dicom_web_download_series(study_id, series_id, save_dir, client: DICOMwebClient, frame_fetch=False):
+def create_session_pool(session: Optional[requests.Session] = None, size: int = 0) -> requests.Session:
+    """
+    Session (for DICOMwebClient) which keeps up to `size` pooled connections per host;  requests keeps at most 10 by
+    default and extra (concurrent) requests would reconnect.
+
+    :param session: existing session (e.g. with auth/credentials);  a new one is created if None
+    :param size: max pooled connections;  0 => MONAI_LABEL_DICOMWEB_DOWNLOAD_WORKERS (but not less than 10)
+    """
+    session = session if session is not None else create_session()
+    size = size if size > 0 else max(settings.MONAI_LABEL_DICOMWEB_DOWNLOAD_WORKERS, 10)
+    for prefix in ("http://", "https://"):
+        retries = session.get_adapter(prefix).max_retries
+        session.mount(prefix, HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=retries))
+    return session
+
+
+_download_locks: Dict[str, List] = {}  # save_dir => [lock, number of callers]
+_download_locks_lock = threading.Lock()
+
+
+def _download_lock_file(save_dir: str) -> str:
+    # outside of the (dicomweb) cache dir;  so that it is never listed/removed along with the series
+    lock_dir = os.path.join(tempfile.gettempdir(), "monailabel", "locks")
+    os.makedirs(lock_dir, exist_ok=True)
+    return os.path.join(lock_dir, f"{md5(os.path.realpath(save_dir).encode('utf-8')).hexdigest()}.lock")
+
+
+@contextmanager
+def _download_lock(save_dir: str):
+    # same series is downloaded (into the same partial dir) by one caller at a time;  entry removed once unused
+    # thread lock serializes the callers of this process;  file lock the ones of other processes (e.g. http workers)
+    with _download_locks_lock:
+        entry = _download_locks.setdefault(save_dir, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0], FileLock(_download_lock_file(save_dir)):
+            yield
+    finally:
+        with _download_locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _download_locks.pop(save_dir, None)
+
+
+def _instance_id(meta) -> str:
+    return str(meta["00080018"]["Value"][0])
+
+
+def dicom_web_download_series(study_id, series_id, save_dir, client: DICOMwebClient, frame_fetch=False, workers=0):
+    """
+    Download all instances of the series into `save_dir` (as <SOPInstanceUID>.dcm).
+
+    Instances (or frames when `frame_fetch` is enabled) are fetched concurrently into `<save_dir>.partial` which is
+    moved to `save_dir` once all of them are downloaded.  Instances already downloaded by an earlier (interrupted or
+    failed) call are not fetched again.  Concurrent calls (of any process) for the same `save_dir` are serialized;
+    the later ones return once the series is downloaded.
+
+    :param workers: number of concurrent requests;  0 => MONAI_LABEL_DICOMWEB_DOWNLOAD_WORKERS
+        (see :py:func:`create_session_pool` to have as many pooled connections)
+    """
+    save_dir = os.path.normpath(save_dir)
+    with _download_lock(save_dir):
+        # save_dir can exist (but empty) or be already completed by a concurrent download of the same series
+        if os.path.isdir(save_dir) and os.listdir(save_dir):
+            logger.info(f"++ Series already downloaded into: {save_dir}")
+            return
+        _download_series(study_id, series_id, save_dir, client, frame_fetch, workers)
+
+
+def _download_series(study_id, series_id, save_dir, client: DICOMwebClient, frame_fetch, workers):
     start = time.time()
+    workers = workers if workers > 0 else max(settings.MONAI_LABEL_DICOMWEB_DOWNLOAD_WORKERS, 1)
 
     # Limitation for DICOMWeb Client as it needs StudyInstanceUID to fetch series
     if not study_id:
@@ -76,37 +156,48 @@ def dicom_web_download_series(study_id, series_id, save_dir, client: DICOMwebCli
         )
         study_id = str(meta["StudyInstanceUID"].value)
 
-    os.makedirs(save_dir, exist_ok=True)
-    if not frame_fetch:
-        instances = client.retrieve_series(study_id, series_id)
-        for instance in instances:
-            instance_id = str(instance["SOPInstanceUID"].value)
-            file_name = os.path.join(save_dir, f"{instance_id}.dcm")
-            instance.save_as(file_name)
-    else:
-        # TODO:: This logic (combining meta+pixeldata) needs improvement
-        def save_from_frame(m):
-            d = Dataset.from_json(m)
-            instance_id = str(d["SOPInstanceUID"].value)
-
-            # Hack to merge Info + RawData
-            d.is_little_endian = True
-            d.is_implicit_VR = True
-            d.PixelData = client.retrieve_instance_frames(
-                study_instance_uid=study_id,
-                series_instance_uid=series_id,
-                sop_instance_uid=instance_id,
-                frame_numbers=[1],
-            )[0]
-
-            file_name = os.path.join(save_dir, f"{instance_id}.dcm")
-            logger.info(f"++ Saved {os.path.basename(file_name)}")
-            d.save_as(file_name)
-
-        meta_list = client.retrieve_series_metadata(study_id, series_id)
-        logger.info(f"++ Saving DCM into: {save_dir}")
-        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="DICOMFetch") as executor:
-            executor.map(save_from_frame, meta_list)
+    partial_dir = f"{save_dir}.partial"
+    os.makedirs(partial_dir, exist_ok=True)
+    for f in [f for f in os.listdir(partial_dir) if f.endswith(".part")]:
+        os.remove(os.path.join(partial_dir, f))
+
+    meta_list = client.retrieve_series_metadata(study_id, series_id)
+    pending = [m for m in meta_list if not os.path.exists(os.path.join(partial_dir, f"{_instance_id(m)}.dcm"))]
+    logger.info(f"++ Saving DCM into: {partial_dir}; pending: {len(pending)}/{len(meta_list)}; workers: {workers}")
+
+    # TODO:: This logic (combining meta+pixeldata) needs improvement
+    def retrieve_from_frame(m, instance_id):
+        d = Dataset.from_json(m)
+
+        # Hack to merge Info + RawData
+        d.is_little_endian = True
+        d.is_implicit_VR = True
+        d.PixelData = client.retrieve_instance_frames(
+            study_instance_uid=study_id,
+            series_instance_uid=series_id,
+            sop_instance_uid=instance_id,
+            frame_numbers=[1],
+        )[0]
+        return d
+
+    def save_instance(m):
+        instance_id = _instance_id(m)
+        if frame_fetch:
+            d = retrieve_from_frame(m, instance_id)
+        else:
+            d = client.retrieve_instance(study_id, series_id, instance_id)
+
+        file_name = os.path.join(partial_dir, f"{instance_id}.dcm")
+        d.save_as(f"{file_name}.part")
+        os.replace(f"{file_name}.part", file_name)  # only complete instances are kept for resume
+        logger.debug(f"++ Saved {os.path.basename(file_name)}")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="DICOMFetch") as executor:
+        for _ in executor.map(save_instance, pending):
+            pass
+
+    shutil.rmtree(save_dir, ignore_errors=True)  # can exist (but empty)
+    os.replace(partial_dir, save_dir)
 
     logger.info(f"Time to download: {time.time() - start} (sec)")
 
@@ -132,8 +223,6 @@ def dicom_web_upload_dcm(input_file, client: DICOMwebClient):
 
 
 if __name__ == "__main__":
-    import shutil
-
     from monailabel.datastore.dicom import DICOMwebClientX
 
     client = DICOMwebClientX(
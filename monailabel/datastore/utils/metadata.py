@@ -0,0 +1,305 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (data, partial) => for partial updates, objects mapped to None are removed
+StoreChanges = Optional[Tuple[Dict[str, Any], bool]]
+
+
+class MetadataStore(metaclass=ABCMeta):
+    """
+    Persistence backend for :py:class:`monailabel.datastore.local.LocalDatastore` metadata
+    """
+
+    # whether callers need to hold the datastore file-lock while reading/writing
+    file_lock: bool = True
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def owns(self, path: str) -> bool:
+        """
+        Check if the given file (e.g. from a file-watcher event) belongs to this store
+        """
+        return path == self.path
+
+    def patterns(self) -> List[str]:
+        """
+        File patterns to be watched for external modifications
+        """
+        return [self.path]
+
+    @abstractmethod
+    def changes(self) -> StoreChanges:
+        """
+        Fetch the modifications made to the store (possibly by other processes) since last load/save
+
+        :return: None if nothing has changed; otherwise tuple of (data, partial)
+        """
+        pass
+
+    @abstractmethod
+    def save(self, ds) -> None:
+        """
+        Persist the full snapshot of datastore model
+
+        :param ds: instance of `LocalDatastoreModel`
+        """
+        pass
+
+    @abstractmethod
+    def update(self, ds, ids: Iterable[str]) -> None:
+        """
+        Persist the records for given image ids;  ids missing in the model are removed from the store
+
+        :param ds: instance of `LocalDatastoreModel`
+        :param ids: image ids which are added/modified/removed
+        """
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonMetadataStore(MetadataStore):
+    """
+    Stores the complete datastore model as (indented) JSON file;  every update rewrites the full file
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._ts: float = 0
+
+    def changes(self) -> StoreChanges:
+        if not os.path.exists(self.path):
+            return None
+
+        ts = os.stat(self.path).st_mtime
+        if self._ts == ts:
+            return None
+
+        logger.debug(f"Reload Datastore; old ts: {self._ts}; new ts: {ts}")
+        with open(self.path) as fp:
+            data = json.load(fp)
+        self._ts = ts
+        return data, False
+
+    def save(self, ds) -> None:
+        with open(self.path, "w") as f:
+            f.write(json.dumps(ds.dict(exclude={"base_path"}), indent=2, default=str))
+        self._ts = os.stat(self.path).st_mtime
+
+    def update(self, ds, ids: Iterable[str]) -> None:
+        self.save(ds)
+
+
+class SQLiteMetadataStore(MetadataStore):
+    """
+    Stores each image (and its labels) as separate records in SQLite (WAL mode).
+
+    Updates are O(1) per record and other processes only fetch the records modified since their last sync.
+    Removed images are kept as tombstones until compaction (full save) so that readers can observe deletes.
+    """
+
+    file_lock = False
+    META_FIELDS = ("name", "description", "images_dir", "labels_dir")
+
+    def __init__(self, path: str, migrate_from: Optional[str] = None, timeout: float = 30.0):
+        super().__init__(path)
+        self._lock = threading.RLock()
+        self._seq = -1  # last synced sequence; -1 => never loaded
+        self._version = -1
+
+        migrate = migrate_from if migrate_from and not os.path.exists(path) and os.path.exists(migrate_from) else None
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+        if migrate:
+            self._migrate(migrate)
+
+    def owns(self, path: str) -> bool:
+        return path in (self.path, f"{self.path}-wal")
+
+    def patterns(self) -> List[str]:
+        return [self.path, f"{self.path}-wal"]
+
+    def _create_tables(self):
+        with self._lock:
+            c = self._conn
+            c.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS images "
+                "(id TEXT PRIMARY KEY, ext TEXT, info TEXT, seq INTEGER NOT NULL, deleted INTEGER DEFAULT 0)"
+            )
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS labels "
+                "(id TEXT NOT NULL, tag TEXT NOT NULL, ext TEXT, info TEXT, PRIMARY KEY (id, tag))"
+            )
+            c.execute("CREATE INDEX IF NOT EXISTS idx_images_seq ON images (seq)")
+            c.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', '0'), ('purged', '0')")
+
+    def _migrate(self, json_path: str):
+        logger.info(f"Migrating datastore metadata from {json_path} => {self.path}")
+        with open(json_path) as fp:
+            data = json.load(fp)
+
+        with self._lock, self._transaction() as seq:
+            for k in self.META_FIELDS:
+                if k in data:
+                    self._set_meta(k, data[k])
+            for image_id, obj in data.get("objects", {}).items():
+                self._upsert(image_id, obj, seq)
+        logger.info(f"Migrated {len(data.get('objects', {}))} objects; {json_path} is no longer updated")
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = int(self._get_meta("seq", "0"))
+            seq = current + 1
+            self._set_meta("seq", seq)
+            yield seq
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        self._conn.execute("COMMIT")
+        # nobody else has written since last sync; so own writes need not be fetched again
+        if current == self._seq:
+            self._seq = seq
+
+    def _get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _upsert(self, image_id: str, obj: Dict[str, Any], seq: int):
+        image = obj.get("image", {})
+        self._conn.execute(
+            "INSERT OR REPLACE INTO images (id, ext, info, seq, deleted) VALUES (?, ?, ?, ?, 0)",
+            (image_id, image.get("ext", ""), json.dumps(image.get("info", {}), default=str), seq),
+        )
+        self._conn.execute("DELETE FROM labels WHERE id=?", (image_id,))
+        self._conn.executemany(
+            "INSERT INTO labels (id, tag, ext, info) VALUES (?, ?, ?, ?)",
+            [
+                (image_id, tag, label.get("ext", ""), json.dumps(label.get("info", {}), default=str))
+                for tag, label in obj.get("labels", {}).items()
+            ],
+        )
+
+    def _delete(self, image_id: str, seq: int):
+        self._conn.execute("UPDATE images SET ext='', info='{}', seq=?, deleted=1 WHERE id=?", (seq, image_id))
+        self._conn.execute("DELETE FROM labels WHERE id=?", (image_id,))
+
+    def _read_objects(self, where: str = "", params: Tuple = ()) -> Dict[str, Optional[Dict[str, Any]]]:
+        objects: Dict[str, Optional[Dict[str, Any]]] = {}
+        for image_id, ext, info, deleted in self._conn.execute(
+            f"SELECT id, ext, info, deleted FROM images {where}", params
+        ):
+            objects[image_id] = None if deleted else {"image": {"ext": ext, "info": json.loads(info)}, "labels": {}}
+
+        ids = [k for k, v in objects.items() if v is not None]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i : i + 500]
+            q = f"SELECT id, tag, ext, info FROM labels WHERE id IN ({','.join('?' * len(chunk))})"
+            for image_id, tag, ext, info in self._conn.execute(q, chunk):
+                objects[image_id]["labels"][tag] = {"ext": ext, "info": json.loads(info)}  # type: ignore
+        return objects
+
+    def changes(self) -> StoreChanges:
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._seq >= 0 and version == self._version:
+                return None
+
+            self._conn.execute("BEGIN")
+            try:
+                seq = int(self._get_meta("seq", "0"))
+                purged = int(self._get_meta("purged", "0"))
+                data: Dict[str, Any] = {k: self._get_meta(k) for k in self.META_FIELDS}
+                data = {k: v for k, v in data.items() if v is not None}
+
+                partial = 0 <= purged <= self._seq
+                if partial:
+                    data["objects"] = self._read_objects("WHERE seq > ?", (self._seq,))
+                else:
+                    data["objects"] = self._read_objects("WHERE deleted = 0")
+            finally:
+                self._conn.execute("COMMIT")
+
+            if partial and not data["objects"] and seq == self._seq:
+                self._version = version
+                return None
+
+            logger.debug(f"Sync Datastore; old seq: {self._seq}; new seq: {seq}; partial: {partial}")
+            self._seq = seq
+            self._version = version
+            return data, partial
+
+    def save(self, ds) -> None:
+        with self._lock, self._transaction() as seq:
+            for k in self.META_FIELDS:
+                self._set_meta(k, getattr(ds, k))
+
+            existing = {r[0] for r in self._conn.execute("SELECT id FROM images WHERE deleted = 0")}
+            for image_id in existing.difference(ds.objects.keys()):
+                self._delete(image_id, seq)
+            for image_id, obj in ds.objects.items():
+                self._upsert(image_id, obj.dict(), seq)
+
+            # compaction: drop tombstones of previous snapshots;  readers behind this point will do full reload
+            self._conn.execute("DELETE FROM images WHERE deleted = 1 AND seq < ?", (seq,))
+            self._set_meta("purged", seq - 1)
+
+    def update(self, ds, ids: Iterable[str]) -> None:
+        with self._lock, self._transaction() as seq:
+            for k in self.META_FIELDS:
+                self._set_meta(k, getattr(ds, k))
+            for image_id in ids:
+                obj = ds.objects.get(image_id)
+                if obj:
+                    self._upsert(image_id, obj.dict(), seq)
+                else:
+                    self._delete(image_id, seq)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_metadata_store(store: str, config_path: str) -> MetadataStore:
+    """
+    Create metadata store for local datastore
+
+    :param store: type of the store; one of `json` or `sqlite`
+    :param config_path: path of datastore json config (e.g. datastore_v2.json)
+    """
+    store = store.lower() if store else "json"
+    if store == "json":
+        return JsonMetadataStore(config_path)
+    if store == "sqlite":
+        return SQLiteMetadataStore(f"{os.path.splitext(config_path)[0]}.db", migrate_from=config_path)
+    raise ValueError(f"Unsupported datastore metadata store: {store}")
@@ -11,16 +11,22 @@
 
 import hashlib
 import io
+import json
 import logging
 import os
 import pathlib
 import shutil
+import threading
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote_plus
 from xml.etree import ElementTree
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 from monailabel.interfaces.datastore import Datastore
@@ -30,9 +36,34 @@ xnat_ns = {"xnat": "http://nrg.wustl.edu/xnat"}
 
 
 class XNATDatastore(Datastore):
-    def __init__(self, api_url, username=None, password=None, project=None, asset_path="", cache_path=""):
+    """
+    XNAT Datastore
+
+    Catalog of images (project/subject/experiment/scan) is cached under `cache_path` and refreshed (at most once every
+    `catalog_interval` secs) by fetching the scans of only those experiments which were modified since last refresh.
+
+    :param workers: max number of concurrent requests to XNAT (e.g. fetching experiments or downloading scans)
+    :param catalog_interval: min secs between refresh of (cached) catalog;  0 => refresh on every query
+    """
+
+    def __init__(
+        self,
+        api_url,
+        username=None,
+        password=None,
+        project=None,
+        asset_path="",
+        cache_path="",
+        workers=8,
+        catalog_interval=60,
+    ):
         self.api_url = api_url
+        self.workers = max(workers, 1)
+        self.catalog_interval = catalog_interval
         self.xnat_session = requests.sessions.session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.xnat_session.mount("http://", adapter)
+        self.xnat_session.mount("https://", adapter)
         self.auth = HTTPBasicAuth(username, password) if username else None
         self.xnat_csrf = ""
         self._login_xnat()
@@ -49,6 +80,12 @@ class XNATDatastore(Datastore):
             else os.path.join(pathlib.Path.home(), ".cache", "monailabel", "xnat", uri_hash)
         )
 
+        self._catalog_lock = threading.Lock()
+        self._catalog: Dict[str, Dict[str, Any]] = self._load_catalog()
+        self._catalog_ts = 0.0
+        self._download_locks: Dict[str, List] = {}  # dest_dir => [lock, number of downloads running/waiting]
+        self._download_locks_lock = threading.Lock()
+
         logger.info(f"XNAT:: API URL: {api_url}")
         logger.info(f"XNAT:: UserName: {username}")
         logger.info(f"XNAT:: Password: {'*' * len(password) if password else ''}")
@@ -124,33 +161,97 @@ class XNATDatastore(Datastore):
         return self.list_images()
 
     def list_images(self) -> List[str]:
-        image_ids: List[str] = []
-
-        response = self._request_get(f"{self.api_url}/data/projects?format=json")
-        for p in response.json().get("ResultSet", {}).get("Result", []):
-            project = p.get("ID")
-            if self.projects and project not in self.projects:
-                continue
+        with self._catalog_lock:
+            if time.time() - self._catalog_ts >= self.catalog_interval:
+                self._refresh_catalog()
 
-            response = self._request_get(f"{self.api_url}/data/projects/{quote_plus(project)}/experiments?format=json")
-            for e in response.json().get("ResultSet", {}).get("Result", []):
-                experiment = e.get("ID")
+            image_ids: List[str] = []
+            for experiment, e in self._catalog.items():
+                image_ids.extend(f"{e['project']}/{e['subject']}/{experiment}/{scan}" for scan in e["scans"])
+            return image_ids
 
-                response = self._request_get(f"{self.api_url}/data/experiments/{quote_plus(experiment)}?format=xml")
-                tree = ElementTree.fromstring(response.content)
-                s = tree.find(".//xnat:subject_ID", namespaces=xnat_ns)
-                if s is None:
-                    continue
+    def refresh(self) -> None:
+        with self._catalog_lock:
+            self._refresh_catalog()
+
+    def fetch_images(self, image_ids: List[str]) -> Dict[str, str]:
+        """
+        Download (if not cached) multiple images concurrently (bounded by `workers`)
+
+        :return: image id => local uri (dicom dir)
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="XNATFetch") as executor:
+            return dict(zip(image_ids, executor.map(self.get_image_uri, image_ids)))
+
+    def _catalog_file(self):
+        return os.path.join(self.cache_path, "catalog.json")
+
+    def _load_catalog(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._catalog_file()) as fc:
+                catalog: Dict[str, Dict[str, Any]] = json.load(fc)
+                return catalog
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"XNAT:: Ignore invalid catalog {self._catalog_file()}; {e}")
+            return {}
+
+    def _save_catalog(self):
+        os.makedirs(self.cache_path, exist_ok=True)
+        tmp = f"{self._catalog_file()}.tmp"
+        with open(tmp, "w") as fc:
+            json.dump(self._catalog, fc)
+        os.replace(tmp, self._catalog_file())
+
+    def _fetch_experiments(self, project):
+        url = f"{self.api_url}/data/projects/{quote_plus(project)}/experiments?format=json&columns=ID,last_modified"
+        response = self._request_get(url)
+        return [(project, e) for e in response.json().get("ResultSet", {}).get("Result", [])]
 
-                subject = s.text
-                for n in tree.findall(".//xnat:scan", namespaces=xnat_ns):
-                    scan = n.get("ID")
-                    image_ids.append(f"{project}/{subject}/{experiment}/{scan}")
+    def _fetch_scans(self, project, experiment, last_modified) -> Optional[Dict[str, Any]]:
+        response = self._request_get(f"{self.api_url}/data/experiments/{quote_plus(experiment)}?format=xml")
+        tree = ElementTree.fromstring(response.content)
+        s = tree.find(".//xnat:subject_ID", namespaces=xnat_ns)
+        if s is None:
+            return None
 
-        return image_ids
+        scans = [n.get("ID") for n in tree.findall(".//xnat:scan", namespaces=xnat_ns)]
+        return {"project": project, "subject": s.text, "scans": scans, "last_modified": last_modified}
 
-    def refresh(self) -> None:
-        pass
+    def _refresh_catalog(self):
+        start = time.time()
+        response = self._request_get(f"{self.api_url}/data/projects?format=json")
+        projects = [p.get("ID") for p in response.json().get("ResultSet", {}).get("Result", [])]
+        projects = [p for p in projects if not self.projects or p in self.projects]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="XNATCatalog") as executor:
+            experiments = [e for result in executor.map(self._fetch_experiments, projects) for e in result]
+
+            # fetch scans only for new/modified experiments (or if the server doesn't report modified time)
+            catalog: Dict[str, Dict[str, Any]] = {}
+            modified = []
+            for project, e in experiments:
+                experiment, last_modified = e.get("ID"), e.get("last_modified")
+                cached = self._catalog.get(experiment)
+                if cached and last_modified and cached.get("last_modified") == last_modified:
+                    catalog[experiment] = cached
+                else:
+                    modified.append((project, experiment, last_modified))
+
+            for (_, experiment, _), result in zip(modified, executor.map(lambda m: self._fetch_scans(*m), modified)):
+                if result:
+                    catalog[experiment] = result
+
+        changed = bool(modified) or len(catalog) != len(self._catalog)
+        self._catalog = catalog
+        self._catalog_ts = time.time()
+        if changed:
+            self._save_catalog()
+        logger.info(
+            f"XNAT:: Catalog refreshed in {round(time.time() - start, 4)} secs; "
+            f"experiments: {len(catalog)}; modified: {len(modified)}"
+        )
 
     def add_image(self, image_id: str, image_filename: str, image_info: Dict[str, Any]) -> str:
         raise NotImplementedError
@@ -212,26 +313,41 @@ class XNATDatastore(Datastore):
             quote_plus(scan),
         )
 
-        response = self._request_get(url)
-        if not response.ok:
-            logger.info(f"Image Fetch Failed: {response.status_code} {response.reason}")
-            return ""
-
+        # stream (chunks) to disk; memory used does not depend on size of the scan
         os.makedirs(dest_dir, exist_ok=True)
-        with open(dest_zip, "wb") as fp:
-            fp.write(response.content)
-
-        extract_dir = os.path.join(dest_dir, "temp")
-        shutil.unpack_archive(dest_zip, extract_dir)
-
-        os.makedirs(dicom_dir, exist_ok=True)
-        for root, _, files in os.walk(extract_dir):
-            for f in files:
-                if f.endswith(".dcm"):
-                    shutil.move(os.path.join(root, f), dicom_dir)
-
-        shutil.rmtree(extract_dir)
-        return dicom_dir
+        zip_part = f"{dest_zip}.part"
+        extract_dir = f"{dicom_dir}.partial"
+        try:
+            with self._request_stream(url) as response:
+                if not response.ok:
+                    logger.info(f"Image Fetch Failed: {response.status_code} {response.reason}")
+                    return ""
+
+                with open(zip_part, "wb") as fp:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        fp.write(chunk)
+
+            # extract only dicom files (flattened) directly from zip
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            os.makedirs(extract_dir)
+            with zipfile.ZipFile(zip_part) as zf:
+                members = [m for m in zf.infolist() if not m.is_dir() and m.filename.endswith(".dcm")]
+                names = [os.path.basename(m.filename) for m in members]
+                for member, name in zip(members, names):
+                    if names.count(name) > 1:  # same file name in different folders (e.g. of multiple resources)
+                        name = f"{hashlib.md5(member.filename.encode('utf-8')).hexdigest()[:8]}_{name}"
+                    with zf.open(member) as src, open(os.path.join(extract_dir, name), "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+
+            shutil.rmtree(dicom_dir, ignore_errors=True)
+            os.replace(extract_dir, dicom_dir)
+            os.replace(zip_part, dest_zip)
+            return dicom_dir
+        finally:
+            # leftovers of a failed download
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            if os.path.exists(zip_part):
+                os.remove(zip_part)
 
     def _download_image(self, image_id, check_zip=False) -> str:
         project, subject, experiment, scan = self._id_to_fields(image_id)
@@ -250,17 +366,35 @@ class XNATDatastore(Datastore):
         dest_dir = os.path.join(self.cache_path, project, subject, experiment, scan)
         dest_zip = os.path.join(dest_dir, "files.zip")
         dicom_dir = os.path.join(dest_dir, "DICOM")
-        if os.path.exists(dest_zip) and len(os.listdir(dicom_dir)) > 0:
-            logger.info(f"Exists in cache: {dest_zip}")
-            return dicom_dir
 
-        # Download DICOM Zip
-        logger.info(f"Downloading: {project} => {subject} => {experiment} => {scan} => {dest_zip}")
-        start = time.time()
+        # same scan is downloaded only once when requested concurrently
+        with self._download_lock(dest_dir):
+            if os.path.exists(dest_zip) and len(os.listdir(dicom_dir)) > 0:
+                logger.info(f"Exists in cache: {dest_zip}")
+                return dicom_dir
+
+            # Download DICOM Zip
+            logger.info(f"Downloading: {project} => {subject} => {experiment} => {scan} => {dest_zip}")
+            start = time.time()
 
-        self._download_zip(dest_dir, dest_zip, dicom_dir, project, subject, experiment, scan)
-        logger.info(f"Download Time (ms) for {image_id}: {round(time.time() - start, 4)}")
-        return dicom_dir
+            self._download_zip(dest_dir, dest_zip, dicom_dir, project, subject, experiment, scan)
+            logger.info(f"Download Time (ms) for {image_id}: {round(time.time() - start, 4)}")
+            return dicom_dir
+
+    @contextmanager
+    def _download_lock(self, dest_dir):
+        # lock (entry) is removed once no download of the scan is running or waiting
+        with self._download_locks_lock:
+            entry = self._download_locks.setdefault(dest_dir, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._download_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._download_locks.pop(dest_dir, None)
 
     def _id_to_fields(self, image_id):
         fields = image_id.split("/")
@@ -294,6 +428,9 @@ class XNATDatastore(Datastore):
     def _request_get(self, url):
         return self.xnat_session.get(url, allow_redirects=True)
 
+    def _request_stream(self, url):
+        return self.xnat_session.get(url, allow_redirects=True, stream=True)
+
     def _request_post(self, url):
         return self.xnat_session.post(url, auth=self.auth, allow_redirects=True)
 
@@ -16,6 +16,7 @@ from typing import Dict, Optional
 from fastapi import APIRouter, Depends
 
 from monailabel.config import RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -67,4 +68,4 @@ async def api_sample(
     params: Optional[dict] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return sample(strategy, params, user.username)
+    return await run_in_pool(Pool.DATASTORE, sample, strategy, params, user.username)
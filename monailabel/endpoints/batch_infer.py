@@ -16,6 +16,7 @@ import torch
 from fastapi import APIRouter, Depends, HTTPException
 
 from monailabel.config import RBAC_ADMIN, RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.datastore import DefaultLabelTag
 from monailabel.interfaces.tasks.batch_infer import BatchInferImageType
@@ -50,8 +51,8 @@ def run(
     return res
 
 
-def stop():
-    res = AsyncTask.stop("batch_infer")
+def stop(cancel_queued=False):
+    res = AsyncTask.stop("batch_infer", cancel_queued)
 
     # Try to clear cuda cache
     if torch.cuda.is_available():
@@ -65,7 +66,7 @@ async def api_status(
     check_if_running: bool = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return status(all, check_if_running)
+    return await run_in_pool(Pool.DATASTORE, status, all, check_if_running)
 
 
 @router.post("/infer/{model}", summary=f"{RBAC_ADMIN}Run Batch Inference Task")
@@ -85,9 +86,12 @@ async def api_run(
     run_sync: Optional[bool] = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return run(model, images, params, run_sync)
+    return await run_in_pool(Pool.TASK if run_sync else Pool.DATASTORE, run, model, images, params, run_sync)
 
 
 @router.delete("/infer", summary=f"{RBAC_ADMIN}Stop Batch Inference Task")
-async def api_stop(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN))):
-    return stop()
+async def api_stop(
+    cancel_queued: bool = False,
+    user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
+):
+    return await run_in_pool(Pool.DATASTORE, stop, cancel_queued)
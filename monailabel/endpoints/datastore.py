@@ -23,6 +23,7 @@ from fastapi.background import BackgroundTasks
 from fastapi.responses import FileResponse
 
 from monailabel.config import RBAC_ADMIN, RBAC_ANNOTATOR, RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
@@ -201,7 +202,7 @@ async def api_datastore(
     output: Optional[ResultType] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return datastore(output)
+    return await run_in_pool(Pool.DATASTORE, datastore, output)
 
 
 @router.put("/", summary=f"{RBAC_ANNOTATOR}Upload new Image", include_in_schema=False, deprecated=True)
@@ -213,7 +214,7 @@ async def api_add_image(
     file: UploadFile = File(...),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return add_image(background_tasks, image, params, file, user.username)
+    return await run_in_pool(Pool.DATASTORE, add_image, background_tasks, image, params, file, user.username)
 
 
 @router.delete(
@@ -221,7 +222,7 @@ async def api_add_image(
 )
 @router.delete("/image", summary=f"{RBAC_ADMIN}Remove Image and corresponding labels")
 async def api_remove_image(id: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN))):
-    return remove_image(id, user.username)
+    return await run_in_pool(Pool.DATASTORE, remove_image, id, user.username)
 
 
 @router.head("/image", summary=f"{RBAC_USER}Check If Image Exists")
@@ -230,17 +231,17 @@ async def api_check_image(
     check_sum: Optional[str] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return download_image(image, check_only=True, check_sum=check_sum)
+    return await run_in_pool(Pool.IO, download_image, image, check_only=True, check_sum=check_sum)
 
 
 @router.get("/image", summary=f"{RBAC_USER}Download Image")
 async def api_download_image(image: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return download_image(image)
+    return await run_in_pool(Pool.IO, download_image, image)
 
 
 @router.get("/image/info", summary=f"{RBAC_USER}Get Image Info")
 async def api_get_image_info(image: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return get_image_info(image)
+    return await run_in_pool(Pool.DATASTORE, get_image_info, image)
 
 
 @router.put("/image/info", summary=f"{RBAC_ANNOTATOR}Update Image Info")
@@ -249,7 +250,7 @@ async def api_put_image_info(
     info: str = Form("{}"),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return update_image_info(image, info, user.username)
+    return await run_in_pool(Pool.DATASTORE, update_image_info, image, info, user.username)
 
 
 @router.put("/label", summary=f"{RBAC_ANNOTATOR}Save Finished Label")
@@ -261,27 +262,27 @@ async def api_save_label(
     label: UploadFile = File(...),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return save_label(background_tasks, image, params, tag, label, user.username)
+    return await run_in_pool(Pool.DATASTORE, save_label, background_tasks, image, params, tag, label, user.username)
 
 
 @router.delete("/label", summary=f"{RBAC_ADMIN}Remove Label")
 async def api_remove_label(id: str, tag: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN))):
-    return remove_label(id, tag, user.username)
+    return await run_in_pool(Pool.DATASTORE, remove_label, id, tag, user.username)
 
 
 @router.head("/label", summary=f"{RBAC_USER}Check If Label Exists")
 async def api_check_label(image: str, tag: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return download_label(image, tag, check_only=True)
+    return await run_in_pool(Pool.IO, download_label, image, tag, check_only=True)
 
 
 @router.get("/label", summary=f"{RBAC_USER}Download Label")
 async def api_download_label(label: str, tag: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return download_label(label, tag)
+    return await run_in_pool(Pool.IO, download_label, label, tag)
 
 
 @router.get("/label/info", summary=f"{RBAC_USER}Get Label Info")
 async def api_get_label_info(label: str, tag: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return get_label_info(label, tag)
+    return await run_in_pool(Pool.DATASTORE, get_label_info, label, tag)
 
 
 @router.put("/label/info", summary=f"{RBAC_ANNOTATOR}Update Label Info")
@@ -291,7 +292,7 @@ async def api_put_label_info(
     info: str = Form("{}"),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return update_label_info(label, tag, info, user.username)
+    return await run_in_pool(Pool.DATASTORE, update_label_info, label, tag, info, user.username)
 
 
 @router.put("/updatelabelinfo", summary=f"{RBAC_ANNOTATOR}Update label info", include_in_schema=False, deprecated=True)
@@ -301,7 +302,7 @@ async def api_update_label_info(
     params: str = Form("{}"),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return update_label_info(label, tag, params, user.username)
+    return await run_in_pool(Pool.DATASTORE, update_label_info, label, tag, params, user.username)
 
 
 @router.get("/dataset", summary=f"{RBAC_ANNOTATOR}Download full dataset as ZIP archive")
@@ -309,4 +310,4 @@ async def api_download_dataset(
     limit_cases: Optional[int] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return download_dataset(limit_cases)
+    return await run_in_pool(Pool.IO, download_dataset, limit_cases)
@@ -0,0 +1,174 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from fastapi import HTTPException
+
+from monailabel.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Pool(str, Enum):
+    INFER = "infer"
+    IO = "io"
+    DATASTORE = "datastore"
+    TASK = "task"  # long running sync tasks (train, scoring, batch infer);  so that they don't block infer
+
+
+class BoundedExecutor:
+    """
+    Thread pool to run blocking (CPU/GPU/IO bound) work of the endpoints off the event loop.
+
+    At most `max_workers` calls run at once and at most `max_queue` calls wait for a free worker;
+    any call beyond that is rejected immediately with HTTP 503 (and Retry-After) instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, retry_after: int = 5):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=f"API-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._stats = {"completed": 0, "failed": 0, "rejected": 0}
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                return False
+            self._pending += 1
+            return True
+
+    def _run(self, fn: Callable, *args, **kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _admit(self):
+        if not self._acquire():
+            logger.warning(f"Executor {self.name} is busy; pending: {self._pending}; reject the request")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server is busy ({self.name}); please retry later",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+    def _release(self, failed: bool):
+        with self._lock:
+            self._pending -= 1
+            self._stats["failed" if failed else "completed"] += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` in the pool and wait (asynchronously) for the result
+        """
+        self._admit()
+
+        failed = True
+        try:
+            loop = asyncio.get_running_loop()
+            res = await loop.run_in_executor(self._executor, functools.partial(self._run, fn, *args, **kwargs))
+            failed = False
+            return res
+        finally:
+            self._release(failed)
+
+    def iterate(self, iterator: Iterator) -> AsyncIterator:
+        """
+        Iterate (blocking) `iterator` in the pool, e.g. body of a streaming response.
+
+        Admission (HTTP 503 when busy) happens right away;  the slot is held until the iteration is finished
+        (or closed) so that streamed work is bounded the same way as :py:meth:`run`.
+        """
+        self._admit()
+        return self._iterate(iterator)
+
+    async def _iterate(self, iterator: Iterator) -> AsyncIterator:
+        sentinel = object()
+        failed = True
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                item = await loop.run_in_executor(self._executor, self._run, next, iterator, sentinel)
+                if item is sentinel:
+                    break
+                yield item
+            failed = False
+        finally:
+            try:
+                close = getattr(iterator, "close", None)
+                if close:
+                    await loop.run_in_executor(self._executor, close)
+            finally:
+                self._release(failed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queue": self.max_queue,
+                "running": self._running,
+                "waiting": self._pending - self._running,
+                **self._stats,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_executors: Dict[Pool, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def executor(pool: Pool) -> BoundedExecutor:
+    """
+    Process-wide instance of :py:class:`BoundedExecutor` for the given pool configured from settings
+    """
+    with _executors_lock:
+        e = _executors.get(pool)
+        if e is None:
+            name = pool.value.upper()
+            workers = getattr(settings, f"MONAI_LABEL_API_{name}_WORKERS")
+            if pool == Pool.INFER and workers <= 0:
+                workers = max(1, settings.MONAI_LABEL_INFER_CONCURRENCY)
+            queue = getattr(settings, f"MONAI_LABEL_API_{name}_QUEUE")
+            e = BoundedExecutor(pool.value, workers, queue)
+            _executors[pool] = e
+        return e
+
+
+async def run_in_pool(pool: Pool, fn: Callable, *args, **kwargs) -> Any:
+    return await executor(pool).run(fn, *args, **kwargs)
+
+
+def iterate_in_pool(pool: Pool, iterator: Iterator) -> AsyncIterator:
+    return executor(pool).iterate(iterator)
+
+
+def executor_stats() -> Dict[str, Any]:
+    with _executors_lock:
+        return {k.value: v.stats() for k, v in _executors.items()}
@@ -25,9 +25,11 @@ from requests_toolbelt import MultipartEncoder
 
 from monailabel.config import RBAC_USER, settings
 from monailabel.datastore.utils.convert import binary_to_image
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
+from monailabel.utils.async_tasks.utils import scheduler
 from monailabel.utils.others.generic import get_mime_type, remove_file
 
 logger = logging.getLogger(__name__)
@@ -159,7 +161,8 @@ def run_inference(
             request["session"] = session.to_json()
 
     logger.info(f"Infer Request: {request}")
-    result = instance.infer(request)
+    with scheduler().interactive():
+        result = instance.infer(request)
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to execute infer")
     return send_response(instance.datastore(), result, output, background_tasks)
@@ -177,4 +180,6 @@ async def api_run_inference(
     output: Optional[ResultType] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return run_inference(background_tasks, model, image, session_id, params, file, label, output)
+    return await run_in_pool(
+        Pool.INFER, run_inference, background_tasks, model, image, session_id, params, file, label, output
+    )
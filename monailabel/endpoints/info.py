@@ -12,6 +12,7 @@
 from fastapi import APIRouter, Depends
 
 from monailabel.config import RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -30,4 +31,4 @@ def app_info():
 
 @router.get("/", summary=f"{RBAC_USER}Get App Info")
 async def api_app_info(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return app_info()
+    return await run_in_pool(Pool.DATASTORE, app_info)
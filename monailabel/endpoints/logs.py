@@ -18,6 +18,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse, Response
 
 from monailabel.config import RBAC_ADMIN, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 
 router = APIRouter(
@@ -96,10 +97,12 @@ async def api_get_logs(
     refresh: Optional[int] = 0,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return get_logs(os.path.join(settings.MONAI_LABEL_APP_DIR, "logs", "app.log"), lines, html, text, refresh)
+    logger_file = os.path.join(settings.MONAI_LABEL_APP_DIR, "logs", "app.log")
+    return await run_in_pool(Pool.IO, get_logs, logger_file, lines, html, text, refresh)
 
 
 @router.get("/gpu", summary=f"{RBAC_ADMIN}Get GPU Info (nvidia-smi)")
 async def gpu_info(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN))):
-    response = subprocess.run(["nvidia-smi"], stdout=subprocess.PIPE).stdout.decode("utf-8")
+    result = await run_in_pool(Pool.IO, subprocess.run, ["nvidia-smi"], stdout=subprocess.PIPE)
+    response = result.stdout.decode("utf-8")
     return Response(content=response, media_type="text/plain")
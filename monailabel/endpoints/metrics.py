@@ -0,0 +1,147 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import logging
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from monailabel.config import RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, executor_stats, run_in_pool
+from monailabel.endpoints.user.auth import RBAC, User
+from monailabel.transform.cache import transform_cache
+from monailabel.utils.async_tasks.utils import scheduler, tasks
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Others"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+class TaskMethod(str, Enum):
+    train = "train"
+    scoring = "scoring"
+    batch_infer = "batch_infer"
+
+
+def task_summary(method: str, task: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "method": method,
+        "id": task["id"],
+        "status": task["status"],
+        "start_ts": task.get("start_ts"),
+        "end_ts": task.get("end_ts"),
+        "progress": task.get("progress", {}),
+    }
+
+
+def _add(lines: List[str], name: str, kind: str, doc: str, samples: List[Tuple[Dict[str, str], Any]]):
+    samples = [(labels, value) for labels, value in samples if isinstance(value, (int, float))]
+    if not samples:
+        return
+
+    lines.append(f"# HELP {name} {doc}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        label = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        lines.append(f"{name}{{{label}}} {float(value)}" if label else f"{name} {float(value)}")
+
+
+def metrics() -> str:
+    """
+    Metrics (of background tasks, api executors and transform cache) in Prometheus text format
+    """
+    lines: List[str] = []
+
+    latest = {m.value: tasks(m.value)[-1] for m in TaskMethod if tasks(m.value)}
+    progress = {m: t.get("progress", {}) for m, t in latest.items()}
+    running = {m: 1 if t["status"] in ("RUNNING", "PAUSED") else 0 for m, t in latest.items()}
+    _add(lines, "monailabel_task_running", "gauge", "Task is running", [({"method": m}, v) for m, v in running.items()])
+
+    counts: Dict[Tuple[str, str], int] = {}
+    for m in TaskMethod:
+        for t in tasks(m.value):
+            counts[(m.value, t["status"])] = counts.get((m.value, t["status"]), 0) + 1
+    _add(
+        lines,
+        "monailabel_tasks",
+        "gauge",
+        "Number of tasks by status",
+        [({"method": m, "status": s}, v) for (m, s), v in counts.items()],
+    )
+
+    for key, name, doc in (
+        ("progress", "monailabel_task_progress", "Progress (0..1) of latest task"),
+        ("eta", "monailabel_task_eta_seconds", "Estimated time to finish latest task"),
+        ("throughput", "monailabel_task_throughput", "Units (iterations/images) per second of latest task"),
+        ("images_per_sec", "monailabel_task_images_per_second", "Images per second of latest (train) task"),
+        ("loss", "monailabel_task_loss", "Loss of latest (train) task"),
+        ("gpu_memory", "monailabel_task_gpu_memory_bytes", "GPU memory allocated by latest task"),
+    ):
+        _add(lines, name, "gauge", doc, [({"method": m}, p.get(key)) for m, p in progress.items()])
+
+    s = scheduler().stats()
+    _add(lines, "monailabel_scheduler_queued_tasks", "gauge", "Queued background tasks", [({}, len(s["queued"]))])
+    _add(lines, "monailabel_scheduler_paused_tasks", "gauge", "Paused background tasks", [({}, len(s["paused"]))])
+
+    e = executor_stats()
+    for key, kind in (("running", "gauge"), ("waiting", "gauge")):
+        doc = f"API requests {key} in executor pool"
+        _add(lines, f"monailabel_api_{key}", kind, doc, [({"pool": p}, v[key]) for p, v in e.items()])
+    for key in ("completed", "failed", "rejected"):
+        doc = f"API requests {key} by executor pool"
+        _add(lines, f"monailabel_api_{key}_total", "counter", doc, [({"pool": p}, v[key]) for p, v in e.items()])
+
+    c = transform_cache().stats()
+    for key in ("hits", "disk_hits", "misses", "evictions", "invalidations"):
+        _add(lines, f"monailabel_transform_cache_{key}_total", "counter", f"Transform cache {key}", [({}, c.get(key))])
+    _add(lines, "monailabel_transform_cache_memory_mb", "gauge", "Transform cache memory", [({}, c["used"]["memory"])])
+
+    return "\n".join(lines) + "\n"
+
+
+async def task_events(request: Request, method: TaskMethod, interval: float):
+    last: Optional[Tuple] = None
+    while not await request.is_disconnected():
+        t = tasks(method.value)
+        task = t[-1] if t else None
+        if task:
+            state = (task["id"], task["status"], task.get("progress", {}).get("seq"))
+            if state != last:
+                last = state
+                yield f"event: {method.value}\ndata: {json.dumps(task_summary(method.value, task))}\n\n"
+        await asyncio.sleep(interval)
+
+
+@router.get("/", summary=f"{RBAC_USER}Get Metrics (Prometheus)", response_class=PlainTextResponse)
+async def api_metrics(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
+    return PlainTextResponse(await run_in_pool(Pool.IO, metrics), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/events/{method}", summary=f"{RBAC_USER}Stream progress of background task (Server-Sent Events)")
+async def api_task_events(
+    request: Request,
+    method: TaskMethod,
+    interval: float = 1.0,
+    user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
+):
+    return StreamingResponse(
+        task_events(request, method, max(interval, 0.1)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -16,6 +16,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 
 from monailabel.config import RBAC_ADMIN, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -55,7 +56,7 @@ async def api_download_model(
     model: str,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return download_model(model)
+    return await run_in_pool(Pool.IO, download_model, model)
 
 
 @router.get("/info/{model}", summary=f"{RBAC_ADMIN}Get CheckSum/Details for the Latest Model File")
@@ -63,4 +64,4 @@ async def api_model_info(
     model: str,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return model_info(model)
+    return await run_in_pool(Pool.IO, model_info, model)
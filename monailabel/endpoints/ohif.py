@@ -16,6 +16,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 
 from monailabel.config import settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.utils.others.generic import get_mime_type
 
@@ -43,4 +44,4 @@ def get_ohif(path: str):
 
 @router.get("/{path:path}", include_in_schema=False)
 async def api_get_ohif(path: str, user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER))):
-    return get_ohif(path)
+    return await run_in_pool(Pool.IO, get_ohif, path)
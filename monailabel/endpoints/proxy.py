@@ -9,15 +9,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import pathlib
+import threading
+import uuid
+from typing import Dict, Optional, Tuple, cast
 
 import google.auth
 import google.auth.transport.requests
 import httpx
 from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 
 from monailabel.config import settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 
 logger = logging.getLogger(__name__)
@@ -28,61 +39,256 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# response headers passed through from dicomweb server
+PROXY_HEADERS = ("content-type", "content-encoding", "content-length", "etag", "last-modified", "cache-control")
+
 
 class GoogleAuth(httpx.Auth):
-    def __init__(self, token):
-        self.token = token
+    """
+    Bearer token of (default) google credentials;  token is cached and refreshed (in IO pool) only once it expires.
+
+    Valid (cached) token is read without the lock;  so the event loop never waits for a refresh in progress.
+    """
+
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self._lock = threading.Lock()
+
+    def cached_token(self) -> Optional[str]:
+        credentials = self.credentials
+        if credentials is not None and credentials.valid:
+            return cast(Optional[str], credentials.token)
+        return None
+
+    def token(self) -> Optional[str]:
+        token = self.cached_token()
+        if token:
+            return token
+
+        with self._lock:
+            if self.credentials is not None and self.credentials.valid:
+                return cast(Optional[str], self.credentials.token)
+
+            if self.credentials is None:
+                self.credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+            self.credentials.refresh(google.auth.transport.requests.Request())
+            return cast(Optional[str], self.credentials.token)
 
     def auth_flow(self, request):
         # Send the request, with a custom `Authorization` header.
-        request.headers["Authorization"] = "Bearer %s" % self.token
+        request.headers["Authorization"] = "Bearer %s" % self.token()
         yield request
 
+    async def async_auth_flow(self, request):
+        token = self.cached_token()
+        token = token if token else await run_in_pool(Pool.IO, self.token)
+        request.headers["Authorization"] = "Bearer %s" % token
+        yield request
 
-async def proxy_dicom(op: str, path: str, response: Response):
+
+class ProxyCache:
+    """
+    On-disk LRU cache of (immutable) dicomweb responses (e.g. wado instances/frames which are addressed by UIDs).
+
+    Each entry is stored as raw (as received) body and its status/headers (json);  least recently accessed entries
+    are removed once the total size exceeds `size` (bytes) until it is below `low_watermark` x `size`, so that the
+    cache directory is scanned only once in a while.  Methods do (blocking) file I/O;  call them off the event loop.
+    """
+
+    def __init__(self, path: str, size: int, low_watermark: float = 0.9):
+        self.path = path
+        self.size = size
+        self.low_watermark = low_watermark
+        self._lock = threading.Lock()
+        self._used: Optional[int] = None
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.md5(url.encode("utf-8")).hexdigest()
+
+    def _files(self, key: str) -> Tuple[str, str]:
+        return os.path.join(self.path, f"{key}.bin"), os.path.join(self.path, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict]]:
+        body, meta = self._files(key)
+        try:
+            with open(meta) as fc:
+                m = json.load(fc)
+            os.utime(body)  # mark as recently accessed
+            return body, m
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def temp_file(self) -> str:
+        os.makedirs(self.path, exist_ok=True)
+        return os.path.join(self.path, f"{uuid.uuid4().hex}.tmp")
+
+    def put(self, key: str, tmp: str, status_code: int, headers: Dict[str, str]) -> None:
+        body, meta = self._files(key)
+        with open(f"{meta}.tmp", "w") as fc:
+            json.dump({"status_code": status_code, "headers": headers}, fc)
+        os.replace(tmp, body)
+        os.replace(f"{meta}.tmp", meta)
+
+        with self._lock:
+            if self._used is None:
+                self._used = sum(s for _, s, _ in self._entries())
+            else:
+                self._used += os.path.getsize(body)
+            if self._used > self.size:
+                self._cleanup()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            if name.endswith(".bin"):
+                try:
+                    st = os.stat(os.path.join(self.path, name))
+                    entries.append((st.st_mtime, st.st_size, name[: -len(".bin")]))
+                except FileNotFoundError:
+                    pass  # removed by other worker
+        return sorted(entries)
+
+    def _cleanup(self):
+        entries = self._entries()
+        used = sum(s for _, s, _ in entries)
+        for _, size, key in entries:
+            if used <= self.size * self.low_watermark:
+                break
+            for f in self._files(key):
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    pass
+            used -= size
+        self._used = used
+
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_proxy_cache: Optional[ProxyCache] = None
+
+
+def _create_client() -> httpx.AsyncClient:
     auth = (
         (settings.MONAI_LABEL_DICOMWEB_USERNAME, settings.MONAI_LABEL_DICOMWEB_PASSWORD)
         if settings.MONAI_LABEL_DICOMWEB_USERNAME and settings.MONAI_LABEL_DICOMWEB_PASSWORD
         else None
     )
     if "googleapis.com" in settings.MONAI_LABEL_STUDIES:
-        google_credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
-        auth_req = google.auth.transport.requests.Request()
-        google_credentials.refresh(auth_req)
-        token = google_credentials.token
-        auth = GoogleAuth(token)
-
-    async with httpx.AsyncClient(auth=auth) as client:
-        server = f"{settings.MONAI_LABEL_STUDIES.rstrip('/')}"
-        prefix = (
-            settings.MONAI_LABEL_WADO_PREFIX
-            if op == "wado"
-            else settings.MONAI_LABEL_QIDO_PREFIX
-            if op == "qido"
-            else settings.MONAI_LABEL_STOW_PREFIX
-            if op == "stow"
-            else ""
-        )
+        auth = GoogleAuth()
 
-        # some version of ohif requests metadata using qido so change it to wado
-        if path.endswith("metadata") and op == "qido":
-            prefix = settings.MONAI_LABEL_WADO_PREFIX
-
-        if prefix:
-            proxy_path = f"{server}/{prefix}/{path}"
-        else:
-            proxy_path = f"{server}/{path}"
-
-        logger.debug(f"Proxy connecting to /dicom/{op}/{path} => {proxy_path}")
-        timeout = httpx.Timeout(
+    connections = settings.MONAI_LABEL_DICOMWEB_PROXY_CONNECTIONS
+    return httpx.AsyncClient(
+        auth=auth,
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        timeout=httpx.Timeout(
             settings.MONAI_LABEL_DICOMWEB_PROXY_TIMEOUT,
             read=settings.MONAI_LABEL_DICOMWEB_READ_TIMEOUT,
+        ),
+    )
+
+
+def proxy_client() -> httpx.AsyncClient:
+    """
+    Shared (connection pooled) client to dicomweb server for the running event loop
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client, _client_loop = _create_client(), loop
+    return _client
+
+
+async def close_proxy_client():
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client, _client_loop = None, None
+
+
+def proxy_cache() -> Optional[ProxyCache]:
+    global _proxy_cache
+    if not settings.MONAI_LABEL_DICOMWEB_PROXY_CACHE_SIZE:
+        return None
+    if _proxy_cache is None:
+        path = settings.MONAI_LABEL_DICOMWEB_PROXY_CACHE_PATH
+        _proxy_cache = ProxyCache(
+            path=path if path else os.path.join(pathlib.Path.home(), ".cache", "monailabel", "proxy"),
+            size=settings.MONAI_LABEL_DICOMWEB_PROXY_CACHE_SIZE * 1024 * 1024,
         )
-        proxy = await client.get(proxy_path, timeout=timeout)
+    return _proxy_cache
+
+
+def _cacheable(op: str, path: str) -> bool:
+    # instances (and their frames/metadata) never change for a given SOPInstanceUID
+    return op == "wado" and "/instances/" in f"/{path}"
+
+
+def _remove(path: Optional[str]):
+    if path and os.path.exists(path):
+        os.remove(path)
 
-    response.body = proxy.content
-    response.status_code = proxy.status_code
-    return response
+
+async def _stream(proxy: httpx.Response, cache: Optional[ProxyCache], key: str, headers: Dict[str, str]):
+    tmp = await run_in_threadpool(cache.temp_file) if cache else None
+    f = await run_in_threadpool(open, tmp, "wb") if tmp else None
+    try:
+        async for chunk in proxy.aiter_raw():
+            if f:
+                await run_in_threadpool(f.write, chunk)
+            yield chunk
+
+        if f and cache and tmp:
+            await run_in_threadpool(f.close)
+            await run_in_threadpool(cache.put, key, tmp, proxy.status_code, headers)
+    finally:
+        if f:
+            f.close()
+        await run_in_threadpool(_remove, tmp)
+        await proxy.aclose()
+
+
+async def proxy_dicom(op: str, path: str, response: Response):
+    server = f"{settings.MONAI_LABEL_STUDIES.rstrip('/')}"
+    prefix = (
+        settings.MONAI_LABEL_WADO_PREFIX
+        if op == "wado"
+        else settings.MONAI_LABEL_QIDO_PREFIX
+        if op == "qido"
+        else settings.MONAI_LABEL_STOW_PREFIX
+        if op == "stow"
+        else ""
+    )
+
+    # some version of ohif requests metadata using qido so change it to wado
+    if path.endswith("metadata") and op == "qido":
+        prefix = settings.MONAI_LABEL_WADO_PREFIX
+
+    if prefix:
+        proxy_path = f"{server}/{prefix}/{path}"
+    else:
+        proxy_path = f"{server}/{path}"
+
+    cache = proxy_cache() if _cacheable(op, path) else None
+    key = ProxyCache.key(proxy_path) if cache else ""
+    cached = await run_in_threadpool(cache.get, key) if cache else None
+    if cached:
+        logger.debug(f"Proxy (cached) /dicom/{op}/{path} => {cached[0]}")
+        headers = {k: v for k, v in cached[1]["headers"].items() if k != "content-length"}
+        return FileResponse(cached[0], status_code=cached[1]["status_code"], headers=headers)
+
+    logger.debug(f"Proxy connecting to /dicom/{op}/{path} => {proxy_path}")
+    client = proxy_client()
+    proxy = await client.send(client.build_request("GET", proxy_path), stream=True)
+
+    headers = {k: proxy.headers[k] for k in PROXY_HEADERS if k in proxy.headers}
+    return StreamingResponse(
+        _stream(proxy, cache if proxy.status_code == 200 else None, key, headers),
+        status_code=proxy.status_code,
+        headers=headers,
+        background=BackgroundTask(proxy.aclose),
+    )
 
 
 @router.get("/dicom/wado/{path:path}", include_in_schema=False)
@@ -16,6 +16,7 @@ import torch
 from fastapi import APIRouter, Depends, HTTPException
 
 from monailabel.config import RBAC_ANNOTATOR, RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -56,8 +57,8 @@ def run_method(method: str, params: Optional[dict] = None, run_sync: Optional[bo
     return res
 
 
-def stop():
-    res = AsyncTask.stop("scoring")
+def stop(cancel_queued=False):
+    res = AsyncTask.stop("scoring", cancel_queued)
 
     # Try to clear cuda cache
     if torch.cuda.is_available():
@@ -71,7 +72,7 @@ async def api_status(
     check_if_running: bool = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return status(all, check_if_running)
+    return await run_in_pool(Pool.DATASTORE, status, all, check_if_running)
 
 
 @router.post("/", summary=f"{RBAC_ANNOTATOR}Run All Scoring Tasks", include_in_schema=False, deprecated=True)
@@ -80,7 +81,7 @@ async def api_run(
     run_sync: Optional[bool] = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return run(params, run_sync)
+    return await run_in_pool(Pool.TASK if run_sync else Pool.DATASTORE, run, params, run_sync)
 
 
 @router.post("/{method}", summary=f"{RBAC_ANNOTATOR}Run Scoring Task for specific method")
@@ -90,9 +91,12 @@ async def api_run_method(
     run_sync: Optional[bool] = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
 ):
-    return run_method(method, params, run_sync)
+    return await run_in_pool(Pool.TASK if run_sync else Pool.DATASTORE, run_method, method, params, run_sync)
 
 
 @router.delete("/", summary=f"{RBAC_ANNOTATOR}Stop Scoring Task")
-async def api_stop(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR))):
-    return stop()
+async def api_stop(
+    cancel_queued: bool = False,
+    user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ANNOTATOR)),
+):
+    return await run_in_pool(Pool.DATASTORE, stop, cancel_queued)
@@ -20,6 +20,7 @@ from fastapi.background import BackgroundTasks
 from fastapi.responses import FileResponse
 
 from monailabel.config import RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -118,7 +119,7 @@ async def api_get_session(
     image: bool = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return get_session(session_id, update_ts, image)
+    return await run_in_pool(Pool.DATASTORE, get_session, session_id, update_ts, image)
 
 
 @router.put("/", summary=f"{RBAC_USER}Create new session with Image")
@@ -129,7 +130,7 @@ async def api_create_session(
     files: List[UploadFile] = File(...),
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return create_session(background_tasks, uncompress, expiry, files)
+    return await run_in_pool(Pool.IO, create_session, background_tasks, uncompress, expiry, files)
 
 
 @router.delete("/{session_id}", summary=f"{RBAC_USER}Delete Session")
@@ -137,4 +138,4 @@ async def api_remove_session(
     session_id: str,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return remove_session(session_id)
+    return await run_in_pool(Pool.IO, remove_session, session_id)
@@ -16,6 +16,7 @@ import torch
 from fastapi import APIRouter, Depends, HTTPException
 
 from monailabel.config import RBAC_ADMIN, RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
@@ -59,8 +60,8 @@ def run_model(
     return res
 
 
-def stop():
-    res = AsyncTask.stop("train")
+def stop(cancel_queued=False):
+    res = AsyncTask.stop("train", cancel_queued)
 
     # Try to clear cuda cache
     if torch.cuda.is_available():
@@ -74,7 +75,7 @@ async def api_status(
     check_if_running: bool = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return status(all, check_if_running)
+    return await run_in_pool(Pool.DATASTORE, status, all, check_if_running)
 
 
 @router.post("/", summary=f"{RBAC_ADMIN}Run All Training Tasks", include_in_schema=False, deprecated=True)
@@ -83,7 +84,7 @@ async def api_run(
     run_sync: Optional[bool] = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return run(params, run_sync)
+    return await run_in_pool(Pool.TASK if run_sync else Pool.DATASTORE, run, params, run_sync)
 
 
 @router.post("/{model}", summary=f"{RBAC_ADMIN} Run Training Task for specific model")
@@ -94,9 +95,12 @@ async def api_run_model(
     enqueue: Optional[bool] = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
 ):
-    return run_model(model, params, run_sync, enqueue)
+    return await run_in_pool(Pool.TASK if run_sync else Pool.DATASTORE, run_model, model, params, run_sync, enqueue)
 
 
 @router.delete("/", summary=f"{RBAC_ADMIN}Stop Training Task")
-async def api_stop(user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN))):
-    return stop()
+async def api_stop(
+    cancel_queued: bool = False,
+    user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_ADMIN)),
+):
+    return await run_in_pool(Pool.DATASTORE, stop, cancel_queued)
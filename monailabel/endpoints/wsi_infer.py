@@ -19,13 +19,15 @@ from typing import Optional, Sequence, Union
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from fastapi.background import BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from monailabel.config import RBAC_USER, settings
+from monailabel.endpoints.executors import Pool, iterate_in_pool, run_in_pool
 from monailabel.endpoints.user.auth import RBAC, User
 from monailabel.interfaces.app import MONAILabelApp
 from monailabel.interfaces.utils.app import app_instance
+from monailabel.utils.async_tasks.utils import scheduler
 from monailabel.utils.others.generic import get_mime_type, remove_file
 
 logger = logging.getLogger(__name__)
@@ -69,7 +71,16 @@ def send_response(datastore, result, output, background_tasks):
     return FileResponse(res_img, media_type=m_type, filename=os.path.basename(res_img))
 
 
-def run_wsi_inference(
+def _ndjson(events):
+    with scheduler().interactive():
+        try:
+            for e in events:
+                yield json.dumps(e) + "\n"
+        finally:
+            events.close()
+
+
+def wsi_infer_request(
     background_tasks: BackgroundTasks,
     model: str,
     image: str = "",
@@ -107,8 +118,21 @@ def run_wsi_inference(
             request["session"] = session.to_json()
 
     logger.info(f"WSI Infer Request: {request}")
+    return instance, request
+
 
-    result = instance.infer_wsi(request)
+def run_wsi_inference(
+    background_tasks: BackgroundTasks,
+    model: str,
+    image: str = "",
+    session_id: str = "",
+    file: Union[UploadFile, None] = None,
+    wsi: WSIInput = WSIInput(),
+    output: Optional[ResultType] = ResultType.dsa,
+):
+    instance, request = wsi_infer_request(background_tasks, model, image, session_id, file, wsi, output)
+    with scheduler().interactive():
+        result = instance.infer_wsi(request)
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to execute wsi infer")
     return send_response(instance.datastore(), result, output, background_tasks)
@@ -129,7 +153,9 @@ async def api_run_wsi_inference(
     output: Optional[ResultType] = None,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
-    return run_wsi_inference(background_tasks, model, image, session_id, None, wsi, output)
+    return await run_in_pool(
+        Pool.INFER, run_wsi_inference, background_tasks, model, image, session_id, None, wsi, output
+    )
 
 
 @router.post("/wsi_v2/{model}", summary=f"{RBAC_USER}Run WSI Inference for supported model")
@@ -141,7 +167,18 @@ async def api_run_wsi_v2_inference(
     file: UploadFile = File(None),
     wsi: str = Form(WSIInput().json()),
     output: Optional[ResultType] = None,
+    stream: bool = False,
     user: User = Depends(RBAC(settings.MONAI_LABEL_AUTH_ROLE_USER)),
 ):
     w = WSIInput.parse_obj(json.loads(wsi))
-    return run_wsi_inference(background_tasks, model, image, session_id, file, w, output)
+    if stream:
+        instance, request = await run_in_pool(
+            Pool.IO, wsi_infer_request, background_tasks, model, image, session_id, file, w, output
+        )
+
+        # tile results are sent as soon as they are ready (newline delimited json);  tiles run in the infer pool
+        # which is held until the stream is finished (or the client goes away)
+        events = iterate_in_pool(Pool.INFER, _ndjson(instance.infer_wsi_stream(request)))
+        return StreamingResponse(events, media_type="application/x-ndjson")
+
+    return await run_in_pool(Pool.INFER, run_wsi_inference, background_tasks, model, image, session_id, file, w, output)
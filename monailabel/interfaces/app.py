@@ -9,6 +9,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import copy
 import logging
 import multiprocessing
@@ -18,9 +19,9 @@ import random
 import shutil
 import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import timedelta
-from typing import Any, Callable, Dict, Optional, Sequence, Union
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple, Union
 
 import requests
 import schedule
@@ -37,6 +38,7 @@ from monailabel.config import settings
 from monailabel.datastore.dicom import DICOMwebClientX, DICOMWebDatastore
 from monailabel.datastore.dsa import DSADatastore
 from monailabel.datastore.local import LocalDatastore
+from monailabel.datastore.utils.dicom import create_session_pool
 from monailabel.datastore.xnat import XNATDatastore
 from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
 from monailabel.interfaces.exception import MONAILabelError, MONAILabelException
@@ -45,9 +47,13 @@ from monailabel.interfaces.tasks.infer_v2 import InferTask
 from monailabel.interfaces.tasks.scoring import ScoringMethod
 from monailabel.interfaces.tasks.strategy import Strategy
 from monailabel.interfaces.tasks.train import TrainTask
-from monailabel.interfaces.utils.wsi import create_infer_wsi_tasks
+from monailabel.interfaces.utils.model_server import ModelServerClient, is_frontend_leader, model_server_addresses
+from monailabel.interfaces.utils.wsi import create_infer_wsi_tasks, slide_cache
 from monailabel.tasks.activelearning.random import Random
+from monailabel.tasks.infer.network_cache import network_cache
+from monailabel.tasks.infer.pipeline import BatchInferPipeline
 from monailabel.tasks.train.bundle import BundleTrainTask
+from monailabel.transform.cache import transform_cache
 from monailabel.utils.async_tasks.task import AsyncTask
 from monailabel.utils.others.generic import (
     file_checksum,
@@ -55,7 +61,11 @@ from monailabel.utils.others.generic import (
     is_openslide_supported,
     strtobool,
 )
-from monailabel.utils.others.pathology import create_asap_annotations_xml, create_dsa_annotations_json
+from monailabel.utils.others.pathology import (
+    create_asap_annotations_xml,
+    create_dsa_annotations_json,
+    dsa_annotation_elements,
+)
 from monailabel.utils.sessions import Sessions
 
 logger = logging.getLogger(__name__)
@@ -112,6 +122,14 @@ class MONAILabelApp:
             else ThreadPoolExecutor(max_workers=settings.MONAI_LABEL_INFER_CONCURRENCY, thread_name_prefix="INFER")
         )
 
+        # infer requests are dispatched to (shared) model server processes; see monailabel.main --model_servers
+        authkey = settings.MONAI_LABEL_MODEL_SERVER_AUTHKEY
+        self._model_servers = (
+            ModelServerClient(model_server_addresses(), authkey.encode() if authkey else None)
+            if settings.MONAI_LABEL_MODEL_SERVERS
+            else None
+        )
+
         # control call back requests
         self._server_mode = bool(strtobool(conf.get("server_mode", "false")))
 
@@ -141,6 +159,10 @@ class MONAILabelApp:
             extensions=settings.MONAI_LABEL_DATASTORE_FILE_EXT,
             auto_reload=settings.MONAI_LABEL_DATASTORE_AUTO_RELOAD,
             read_only=settings.MONAI_LABEL_DATASTORE_READ_ONLY,
+            metadata_store=settings.MONAI_LABEL_DATASTORE_METADATA_STORE,
+            reconcile_interval=settings.MONAI_LABEL_DATASTORE_RECONCILE_INTERVAL,
+            # with model servers, only one of the http workers watches/reconciles the files; others follow the config
+            reconcile=not settings.MONAI_LABEL_MODEL_SERVERS or is_frontend_leader(),
         )
 
     def init_remote_datastore(self) -> Datastore:
@@ -157,13 +179,14 @@ class MONAILabelApp:
         dw_session = None
         if "googleapis.com" in self.studies:
             logger.info("Creating DICOM Credentials for Google Cloud")
-            dw_session = create_session_from_gcp_credentials()
+            dw_session = create_session_pool(create_session_from_gcp_credentials())
             dw_client = DICOMwebClient(url=self.studies, session=dw_session)
         else:
             if settings.MONAI_LABEL_DICOMWEB_USERNAME and settings.MONAI_LABEL_DICOMWEB_PASSWORD:
                 dw_session = create_session_from_user_pass(
                     settings.MONAI_LABEL_DICOMWEB_USERNAME, settings.MONAI_LABEL_DICOMWEB_PASSWORD
                 )
+            dw_session = create_session_pool(dw_session)
             dw_client = DICOMwebClientX(
                 url=self.studies,
                 session=dw_session,
@@ -195,6 +218,8 @@ class MONAILabelApp:
             folder=settings.MONAI_LABEL_DATASTORE_PROJECT,
             annotation_groups=settings.MONAI_LABEL_DATASTORE_DSA_ANNOTATION_GROUPS,
             asset_store_path=settings.MONAI_LABEL_DATASTORE_ASSET_PATH,
+            index_interval=settings.MONAI_LABEL_DATASTORE_DSA_INDEX_INTERVAL,
+            index_full_interval=settings.MONAI_LABEL_DATASTORE_DSA_INDEX_FULL_INTERVAL,
         )
 
     def _init_xnat_datastore(self) -> Datastore:
@@ -206,6 +231,8 @@ class MONAILabelApp:
             project=settings.MONAI_LABEL_DATASTORE_PROJECT,
             asset_path=settings.MONAI_LABEL_DATASTORE_ASSET_PATH,
             cache_path=settings.MONAI_LABEL_DATASTORE_CACHE_PATH,
+            workers=settings.MONAI_LABEL_DATASTORE_XNAT_WORKERS,
+            catalog_interval=settings.MONAI_LABEL_DATASTORE_XNAT_CATALOG_INTERVAL,
         )
 
     def info(self):
@@ -223,6 +250,8 @@ class MONAILabelApp:
             "scoring": {k: v.info() for k, v in self._scoring_methods.items()},
             "train_stats": {k: v.stats() for k, v in self._trainers.items()},
             "datastore": self._datastore.status(),
+            "network_cache": network_cache().stats(),
+            "transform_cache": transform_cache().stats(),
         }
 
         # If labels are not provided, aggregate from all individual infers
@@ -294,7 +323,10 @@ class MONAILabelApp:
         else:
             request["save_label"] = False
 
-        if self._infers_threadpool:
+        if self._model_servers:
+            res = self._model_servers(request)
+            result_file_name, result_json = res["file"], res["params"]
+        elif self._infers_threadpool:
 
             def run_infer_in_thread(t, r):
                 handle_torch_linalg_multithread(r)
@@ -498,6 +530,13 @@ class MONAILabelApp:
     def server_mode(self, mode: bool):
         self._server_mode = mode
 
+    def close(self):
+        """
+        Callback method when the server is shutting down
+        """
+        logger.info("App Shutdown - closing datastore")
+        self._datastore.close()
+
     def async_scoring(self, method, params=None):
         if not method and not self._scoring_methods:
             return {}
@@ -588,7 +627,11 @@ class MONAILabelApp:
     def sessions(self):
         return self._sessions
 
-    def infer_wsi(self, request, datastore=None):
+    def _infer_wsi_request(self, request, datastore=None):
+        """
+        Resolve WSI Infer request;  returns tuple of (task, request, image, result) where result is not None
+        in case the request is not for a (tiled) whole slide image and has been already run as normal infer
+        """
         model = request.get("model")
         if not model:
             raise MONAILabelException(
@@ -613,7 +656,7 @@ class MONAILabelApp:
         if not isinstance(image, str):
             res = self.infer(request, datastore)
             logger.info(f"Latencies: {res.get('params', {}).get('latencies')}")
-            return res
+            return task, request, image, res
 
         request = copy.deepcopy(request)
         if not os.path.exists(image):
@@ -630,15 +673,16 @@ class MONAILabelApp:
                 request["image"] = image
                 res = self.infer(request, datastore)
                 logger.info(f"Latencies: {res.get('params', {}).get('latencies')}")
-                return res
+                return task, request, image, res
 
         # simple image
         if not is_openslide_supported(image):
             res = self.infer(request, datastore)
             logger.info(f"Latencies: {res.get('params', {}).get('latencies')}")
-            return res
+            return task, request, image, res
+        return task, request, image, None
 
-        start = time.time()
+    def _infer_wsi_tasks(self, request, image):
         infer_tasks = create_infer_wsi_tasks(request, image)
         if len(infer_tasks) > 1:
             logger.info(f"WSI Infer Request (final): {request}")
@@ -651,9 +695,8 @@ class MONAILabelApp:
         gpus = (
             list(range(torch.cuda.device_count())) if not multi_gpus or multi_gpus == "all" else multi_gpus.split(",")
         )
-        device_ids = [f"cuda:{id}" for id in gpus] if multi_gpu else [request.get("device", "cuda")]
+        device_ids = [f"cuda:{id}" for id in gpus] if multi_gpu and gpus else [request.get("device", "cuda")]
 
-        res_json = {"annotations": [None] * len(infer_tasks)}
         for idx, t in enumerate(infer_tasks):
             t["logging"] = request["logging"]
             t["device"] = (
@@ -662,34 +705,53 @@ class MONAILabelApp:
                 else device_ids[random.randint(0, len(device_ids) - 1)]
             )
 
-        total = len(infer_tasks)
         max_workers = request.get("max_workers", 0)
         max_workers = max_workers if max_workers else max(1, multiprocessing.cpu_count() // 2)
         max_workers = min(max_workers, multiprocessing.cpu_count())
 
-        if len(infer_tasks) > 1 and (max_workers == 0 or max_workers > 1):
-            logger.info(f"MultiGpu: {multi_gpu}; Using Device(s): {device_ids}; Max Workers: {max_workers}")
-            futures = {}
-            with ThreadPoolExecutor(max_workers if max_workers else None, "WSI Infer") as executor:
+        logger.info(f"MultiGpu: {multi_gpu}; Using Device(s): {device_ids}; Max Workers: {max_workers}")
+        return infer_tasks, max_workers
+
+    def infer_wsi(self, request, datastore=None):
+        task, request, image, res = self._infer_wsi_request(request, datastore)
+        if res is not None:
+            return res
+
+        model = request.get("model")
+        img_id = request["image"]
+        start = time.time()
+        infer_tasks, max_workers = self._infer_wsi_tasks(request, image)
+
+        total = len(infer_tasks)
+        res_json = {"annotations": [None] * len(infer_tasks)}
+
+        def add_result(t, res):
+            tid = t["id"]
+            res_json["annotations"][tid] = res
+            finished = len([a for a in res_json["annotations"] if a])
+            logger.info(
+                f"{img_id} => {tid} => {t['device']} => {finished} / {total}; Latencies: {res.get('latencies')}"
+            )
+
+        # read ahead next tiles while running current ones (tiles are read by infer tasks of this process)
+        prefetch = request.get("prefetch_tiles", settings.MONAI_LABEL_WSI_PREFETCH_TILES)
+        prefetch = prefetch if total > 1 and not self._model_servers else 0
+        pipeline = self._infer_wsi_pipeline(task, request, total, max_workers)
+        with slide_cache().prefetch(image, infer_tasks, prefetch) if prefetch else contextlib.nullcontext():
+            if pipeline:
+                for t, res in self._run_infer_wsi_pipeline(pipeline, task, infer_tasks):
+                    add_result(t, res)
+            elif len(infer_tasks) > 1 and (max_workers == 0 or max_workers > 1):
+                futures = {}
+                with ThreadPoolExecutor(max_workers if max_workers else None, "WSI Infer") as executor:
+                    for t in infer_tasks:
+                        futures[t["id"]] = t, executor.submit(self._run_infer_wsi_task, t)
+
+                    for tid, (t, future) in futures.items():
+                        add_result(t, future.result())
+            else:
                 for t in infer_tasks:
-                    futures[t["id"]] = t, executor.submit(self._run_infer_wsi_task, t)
-
-                for tid, (t, future) in futures.items():
-                    res = future.result()
-                    res_json["annotations"][tid] = res
-                    finished = len([a for a in res_json["annotations"] if a])
-                    logger.info(
-                        f"{img_id} => {tid} => {t['device']} => {finished} / {total}; Latencies: {res.get('latencies')}"
-                    )
-        else:
-            for t in infer_tasks:
-                tid = t["id"]
-                res = self._run_infer_wsi_task(t, multi_thread=False)
-                res_json["annotations"][tid] = res
-                finished = len([a for a in res_json["annotations"] if a])
-                logger.info(
-                    f"{img_id} => {tid} => {t['device']} => {finished} / {total}; Latencies: {res.get('latencies')}"
-                )
+                    add_result(t, self._run_infer_wsi_task(t, multi_thread=False))
 
         latency_total = time.time() - start
         logger.debug(f"WSI Infer Time Taken: {latency_total:.4f}")
@@ -734,6 +796,142 @@ class MONAILabelApp:
             )
         return {"file": res_file, "params": res_json}
 
+    def infer_wsi_stream(self, request, datastore=None) -> Iterator[Dict[str, Any]]:
+        """
+        Run WSI Inference and stream the results tile by tile (in the order they finish)
+
+        Yields the following events:
+            - `{"type": "start", "name": ..., "model": ..., "location": ..., "size": ..., "tiles": ...}`
+            - `{"type": "tile", "id": ..., "elements": [...], "latencies": ...}` for each tile;  elements are DSA
+              annotation elements for `dsa` output and `annotation` (raw result) is streamed for `json` output
+            - `{"type": "end", "count": ..., "latencies": ...}`
+
+        Only a bounded number of tiles (2 x max_workers) are in-flight and no tile result is retained once it is
+        yielded;  so memory usage does not grow with the size of the slide.
+        """
+        output = request.get("output", "dsa")
+        output = output if output else "dsa"
+        if output not in ("dsa", "json"):
+            raise MONAILabelException(
+                MONAILabelError.INVALID_INPUT,
+                f"WSI/Inference streaming is not supported for output type: {output}",
+            )
+
+        start = time.time()
+        task, request, image, res = self._infer_wsi_request(request, datastore)
+        if res is not None:
+            infer_tasks, max_workers = [], 1
+        else:
+            infer_tasks, max_workers = self._infer_wsi_tasks(request, image)
+
+        model = request.get("model")
+        bbox = list(request.get("location", [0, 0])) + list(request.get("size", [0, 0]))
+        yield {
+            "type": "start",
+            "name": f"MONAILabel Annotations - {model} for {bbox}",
+            "description": task.description,
+            "model": model,
+            "location": request.get("location"),
+            "size": request.get("size"),
+            "tiles": max(1, len(infer_tasks)),
+        }
+
+        def tile_event(tid, result):
+            event: Dict[str, Any] = {"type": "tile", "id": tid, "latencies": result.get("latencies")}
+            if output == "dsa":
+                event["elements"] = list(dsa_annotation_elements(result.get("annotation")))
+            else:
+                event["annotation"] = result.get("annotation")
+            return event
+
+        count = 0
+        latencies: Dict[str, float] = {"tsum": 0, "pre": 0, "post": 0, "infer": 0}
+
+        def update_stats(event):
+            nonlocal count
+            count += len(event["elements"]) if output == "dsa" else 1
+            for k, v in (event.get("latencies") or {}).items():
+                k = "tsum" if k == "total" else k
+                if k in latencies:
+                    latencies[k] += v
+
+        pipeline = self._infer_wsi_pipeline(task, request, len(infer_tasks), max_workers)
+        if res is not None:
+            event = tile_event(0, res.get("params", {}))
+            update_stats(event)
+            yield event
+        elif pipeline:
+            for t, result in self._run_infer_wsi_pipeline(pipeline, task, infer_tasks):
+                event = tile_event(t["id"], result)
+                update_stats(event)
+                yield event
+        elif len(infer_tasks) > 1 and max_workers > 1:
+            pending: set = set()
+            tasks_iter = iter(infer_tasks)
+
+            def submit():
+                t = next(tasks_iter, None)
+                if t is not None:
+                    pending.add(executor.submit(lambda x: (x["id"], self._run_infer_wsi_task(x)), t))
+
+            with ThreadPoolExecutor(max_workers, "WSI Infer") as executor:
+                try:
+                    for _ in range(2 * max_workers):
+                        submit()
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            submit()
+                            event = tile_event(*future.result())
+                            update_stats(event)
+                            yield event
+                finally:
+                    # client went away (or failed);  do not run the tiles which are not yet started
+                    for future in pending:
+                        future.cancel()
+        else:
+            for t in infer_tasks:
+                event = tile_event(t["id"], self._run_infer_wsi_task(t, multi_thread=False))
+                update_stats(event)
+                yield event
+
+        latency_total = time.time() - start
+        yield {
+            "type": "end",
+            "count": count,
+            "latencies": {
+                "total": round(latency_total, 2),
+                **{k: round(v / max(1, max_workers), 2) for k, v in latencies.items()},
+            },
+        }
+        logger.info(f"WSI Infer (stream) Time Taken: {latency_total:.4f}; Total Annotations: {count}")
+
+    def _infer_wsi_pipeline(self, task, request, total, max_workers) -> Optional[BatchInferPipeline]:
+        """
+        Pipeline to run the tiles in batches (reader => batched forward pass => post-processing);  None in case
+        the tiles have to be run as separate infer requests
+        """
+        batch_size = request.get("tile_batch_size", settings.MONAI_LABEL_WSI_BATCH_SIZE)
+        if total < 2 or batch_size < 2 or self._model_servers or not BatchInferPipeline.supported(task):
+            return None
+
+        # forward passes run in the infer thread pool (if any) to honor the infer concurrency/timeout as infer()
+        executor = self._infers_threadpool
+        timeout = request.get("timeout", settings.MONAI_LABEL_INFER_TIMEOUT) if executor else 0
+
+        logger.info(f"WSI Infer Pipeline => Batch Size: {batch_size}; Workers: {max_workers}")
+        return BatchInferPipeline(task, batch_size, max_workers, executor=executor, timeout=timeout)
+
+    def _run_infer_wsi_pipeline(self, pipeline, task, infer_tasks) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        requests = []
+        for t in infer_tasks:
+            req = copy.deepcopy(t)
+            req.update({"description": task.description, "save_label": False, "result_write_to_file": False})
+            requests.append(req)
+
+        for idx, (_, result_json) in pipeline(requests):
+            yield infer_tasks[idx], result_json
+
     def _run_infer_wsi_task(self, task, multi_thread=True):
         req = copy.deepcopy(task)
         req["result_write_to_file"] = False
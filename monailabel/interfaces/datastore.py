@@ -266,6 +266,31 @@ class Datastore(metaclass=ABCMeta):
         """
         pass
 
+    def update_image_info_many(self, infos: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update (or create a new) info tag for multiple images at once
+
+        :param infos: dictionary of image id => custom image information Dict[str, Any]
+        """
+        for image_id, info in infos.items():
+            self.update_image_info(image_id, info)
+
+    def update_label_info_many(self, label_tag: str, infos: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update (or create a new) info tag for multiple labels (of the same tag) at once
+
+        :param label_tag: the matching label tag
+        :param infos: dictionary of label id => custom label information Dict[str, Any]
+        """
+        for label_id, info in infos.items():
+            self.update_label_info(label_id, label_tag, info)
+
+    def close(self) -> None:
+        """
+        Release any resources (e.g. file watchers, connections) held by the datastore
+        """
+        pass
+
     @abstractmethod
     def status(self) -> Dict[str, Any]:
         """
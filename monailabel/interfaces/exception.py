@@ -49,6 +49,8 @@ class MONAILabelException(Exception):
     """
 
     __slots__ = ["error", "msg"]
+    error: MONAILabelError
+    msg: str
 
     def __init__(self, error: MONAILabelError, msg: str):
         super().__setattr__("error", error)
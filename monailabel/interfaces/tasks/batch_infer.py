@@ -20,6 +20,7 @@ from typing import Callable
 import torch
 
 from monailabel.interfaces.datastore import Datastore, DefaultLabelTag
+from monailabel.utils.async_tasks import progress
 from monailabel.utils.others.generic import handle_torch_linalg_multithread, remove_file
 
 logger = logging.getLogger(__name__)
@@ -110,6 +111,7 @@ class BatchInferTask:
 
                     finished = len([a for a in result.values() if a is not None])
                     logger.info(f"{tid} => {image_id} => {t['device']} => {finished} / {total}")
+                    progress.emit("batch_infer", done=finished, total=total)
         else:
             for t in infer_tasks:
                 tid = t["_id"]
@@ -119,6 +121,7 @@ class BatchInferTask:
                 result[image_id] = res
                 finished = tid + 1
                 logger.info(f"{tid} => {image_id} => {t['device']} => {finished} / {total}")
+                progress.emit("batch_infer", done=finished, total=total)
 
         latency_total = time.time() - start
         logger.info(f"Batch Infer Time Taken: {latency_total:.4f}")
@@ -126,6 +129,7 @@ class BatchInferTask:
 
 
 def run_infer_task(req, datastore, infer):
+    progress.wait_if_paused()
     handle_torch_linalg_multithread(req)
 
     image_id = req.get("image")
@@ -0,0 +1,291 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import logging
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from filelock import BaseFileLock, FileLock, Timeout
+
+from monailabel.config import settings
+from monailabel.interfaces.exception import MONAILabelError, MONAILabelException
+
+logger = logging.getLogger(__name__)
+
+# arrays smaller than this are simply pickled
+SHARED_MEMORY_MIN_SIZE = 1024 * 1024
+
+
+class SharedArray:
+    """
+    Reference to numpy array/tensor which is placed in shared memory (instead of sending it through socket)
+    """
+
+    def __init__(self, name: str, shape: Tuple[int, ...], dtype: str, tensor: bool):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+        self.tensor = tensor
+
+    def get(self):
+        shm = SharedMemory(name=self.name)
+        try:
+            arr = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf).copy()
+        finally:
+            shm.close()
+        return torch.from_numpy(arr) if self.tensor else arr
+
+
+def share(obj, segments: List[SharedMemory]):
+    """
+    Replace (large) numpy arrays/tensors in the given object by :py:class:`SharedArray`;  caller owns the
+    created shared memory segments and should release them (see :py:func:`release`) after the peer has read them
+    """
+    if isinstance(obj, dict):
+        return {k: share(v, segments) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(share(v, segments) for v in obj)
+
+    tensor = torch.is_tensor(obj)
+    arr = obj.detach().cpu().numpy() if tensor else obj
+    if not isinstance(arr, np.ndarray) or arr.nbytes < SHARED_MEMORY_MIN_SIZE or arr.dtype == object:
+        return obj
+
+    shm = SharedMemory(create=True, size=arr.nbytes)
+    segments.append(shm)
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return SharedArray(shm.name, arr.shape, arr.dtype.str, tensor)
+
+
+def unshare(obj):
+    if isinstance(obj, SharedArray):
+        return obj.get()
+    if isinstance(obj, dict):
+        return {k: unshare(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(unshare(v) for v in obj)
+    return obj
+
+
+def release(segments: List[SharedMemory]):
+    for shm in segments:
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+
+def model_server_addresses(port: Optional[int] = None, count: Optional[int] = None) -> List[str]:
+    """
+    Addresses (unix sockets) of the model servers for the given server port
+    """
+    port = port if port else settings.MONAI_LABEL_SERVER_PORT
+    count = count if count is not None else len(settings.MONAI_LABEL_MODEL_SERVERS)
+    path = settings.MONAI_LABEL_MODEL_SERVER_PATH if settings.MONAI_LABEL_MODEL_SERVER_PATH else tempfile.gettempdir()
+    return [os.path.join(path, f"monailabel-{port}-model-{i}.sock") for i in range(count)]
+
+
+_frontend_lock: Optional[BaseFileLock] = None
+
+
+def is_frontend_leader(port: Optional[int] = None) -> bool:
+    """
+    Elect exactly one of the HTTP workers (front-ends of the model servers) of the server to run the shared
+    background work of the app (e.g. datastore file watcher/reconcile);  the elected worker holds the lock until exit
+    """
+    global _frontend_lock
+    if _frontend_lock is not None:
+        return _frontend_lock.is_locked
+
+    port = port if port else settings.MONAI_LABEL_SERVER_PORT
+    path = settings.MONAI_LABEL_MODEL_SERVER_PATH if settings.MONAI_LABEL_MODEL_SERVER_PATH else tempfile.gettempdir()
+    _frontend_lock = FileLock(os.path.join(path, f"monailabel-{port}-frontend.lock"), timeout=0)
+    try:
+        _frontend_lock.acquire()
+    except Timeout:
+        pass
+
+    logger.info(f"Front-end worker {os.getpid()} => leader: {_frontend_lock.is_locked}")
+    return _frontend_lock.is_locked
+
+
+class ModelServer:
+    """
+    Serves (infer) requests of HTTP workers from a single process which holds the networks for one device.
+
+    Each client connection is served by a separate thread;  requests are executed through `handler`
+    (e.g. :py:meth:`monailabel.interfaces.app.MONAILabelApp.infer`) with the device of this server.
+    """
+
+    def __init__(self, address: str, handler: Callable, device: str = "cuda", authkey: Optional[bytes] = None):
+        self.address = address
+        self.handler = handler
+        self.device = device
+        self.authkey = authkey
+        self._listener: Optional[Listener] = None
+
+    def serve_forever(self):
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        logger.info(f"Model Server ({self.device}) listening on: {self.address}")
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                break  # closed
+            except Exception as e:
+                logger.warning(f"Model Server failed to accept connection: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection):
+        segments: List[SharedMemory] = []
+        try:
+            while True:
+                try:
+                    request = unshare(conn.recv())
+                except EOFError:
+                    break
+
+                try:
+                    request["device"] = self.device
+                    response: Tuple[str, Any] = ("ok", self.handler(request))
+                except Exception as e:
+                    logger.exception(e)
+                    response = ("error", e.msg if isinstance(e, MONAILabelException) else str(e))
+
+                release(segments)
+                conn.send(share(response, segments))
+        finally:
+            release(segments)
+            conn.close()
+
+    def close(self):
+        if self._listener:
+            self._listener.close()
+
+
+class ModelServerClient:
+    """
+    Dispatch requests to model servers;  the server with least in-flight requests is picked for each request
+    """
+
+    def __init__(self, addresses: Sequence[str], authkey: Optional[bytes] = None, timeout: int = 600):
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, int] = {a: 0 for a in self.addresses}
+        self._idle: Dict[str, "queue.LifoQueue[Connection]"] = {a: queue.LifoQueue() for a in self.addresses}
+
+    def _connect(self, address: str) -> Connection:
+        start = time.time()
+        while True:
+            try:
+                return Client(address, family="AF_UNIX", authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.time() - start > self.timeout:
+                    raise MONAILabelException(
+                        MONAILabelError.SERVER_ERROR, f"Model Server ({address}) is not available"
+                    )
+                time.sleep(1)  # model server might still be loading
+
+    def __call__(self, request: Dict[str, Any]) -> Any:
+        with self._lock:
+            address = min(self.addresses, key=lambda a: self._inflight[a])
+            self._inflight[address] += 1
+
+        segments: List[SharedMemory] = []
+        try:
+            try:
+                conn = self._idle[address].get_nowait()
+            except queue.Empty:
+                conn = self._connect(address)
+
+            try:
+                conn.send(share(request, segments))
+                status, result = unshare(conn.recv())
+            except (EOFError, OSError):
+                conn.close()
+                raise MONAILabelException(MONAILabelError.SERVER_ERROR, f"Model Server ({address}) went away")
+
+            self._idle[address].put(conn)
+            if status != "ok":
+                raise MONAILabelException(MONAILabelError.INFERENCE_ERROR, result)
+            return result
+        finally:
+            release(segments)
+            with self._lock:
+                self._inflight[address] -= 1
+
+
+def start_model_servers(devices: Sequence[str], port: int, authkey: str) -> List[subprocess.Popen]:
+    """
+    Start one model server (process) per device;  HTTP workers dispatch infer requests to them
+    """
+    processes = []
+    for address, device in zip(model_server_addresses(port, len(devices)), devices):
+        env = os.environ.copy()
+        env.update(
+            {
+                # model server only runs infer tasks
+                "MONAI_LABEL_MODEL_SERVERS": "[]",
+                "MONAI_LABEL_DATASTORE_AUTO_RELOAD": "false",
+                "MONAI_LABEL_TASKS_TRAIN": "false",
+                "MONAI_LABEL_TASKS_STRATEGY": "false",
+                "MONAI_LABEL_TASKS_SCORING": "false",
+                "MONAI_LABEL_TASKS_BATCH_INFER": "false",
+                "MONAI_LABEL_MODEL_SERVER_AUTHKEY": authkey,
+            }
+        )
+        if device.startswith("cuda:"):
+            env["CUDA_VISIBLE_DEVICES"] = device.split(":")[1]
+            device = "cuda"
+
+        cmd = [sys.executable, "-m", "monailabel.interfaces.utils.model_server", "--address", address, "-d", device]
+        logger.info(f"Starting Model Server: {' '.join(cmd)}")
+        processes.append(subprocess.Popen(cmd, env=env))
+    return processes
+
+
+def run_main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] [%(process)s] [%(threadName)s] [%(levelname)s] (%(name)s:%(lineno)d) - %(message)s",
+    )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--address", required=True)
+    parser.add_argument("-d", "--device", default="cuda")
+    args = parser.parse_args()
+
+    from monailabel.interfaces.utils.app import app_instance
+
+    app = app_instance()
+    authkey = settings.MONAI_LABEL_MODEL_SERVER_AUTHKEY
+    ModelServer(args.address, app.infer, args.device, authkey.encode() if authkey else None).serve_forever()
+
+
+if __name__ == "__main__":
+    run_main()
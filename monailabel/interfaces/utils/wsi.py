@@ -12,16 +12,265 @@
 import copy
 import ctypes.util
 import logging
+import os
 import platform
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from ctypes import cdll
 from math import ceil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from monai.utils import optional_import
 
+from monailabel.config import settings
+
 logger = logging.getLogger(__name__)
 
 
+def _openslide():
+    if platform.system() == "Windows":
+        cdll.LoadLibrary(str(ctypes.util.find_library("libopenslide-0.dll")))
+
+    openslide, has_openslide = optional_import("openslide")
+    if not has_openslide:
+        raise ImportError("Unable to find openslide, please ensure openslide library packages are correctly installed")
+    return openslide
+
+
+class _Slide:
+    def __init__(self):
+        self.slide = None
+        self.error: Optional[BaseException] = None
+        self.ready = threading.Event()  # set once the slide is opened (or failed to open)
+        self.refs = 0
+        self.evicted = False
+
+
+class SlideCache:
+    """
+    Thread-safe LRU pool of open OpenSlide handles shared by (WSI) infer tasks.
+
+    OpenSlide handles are thread-safe;  all the threads reading (tiles of) a slide use the same handle instead of
+    re-opening and re-parsing the slide for every tile.  At most `max_slides` handles are kept open;  evicted handles
+    are closed once they are no longer in use.
+
+    Slides are opened (parsed) outside of the pool lock;  concurrent callers of the same slide wait for the one which
+    opens it while the other slides remain available.
+
+    Regions read ahead by :py:class:`TilePrefetcher` are returned by :py:meth:`read_region` without reading again.
+    Prefetched regions are shared by the process;  a region (same slide, location, level and size) can be consumed by
+    any request which reads it first, in which case the request which prefetched it reads the region again.
+
+    :param max_slides: max number of (idle) open slides
+    """
+
+    def __init__(self, max_slides: int = 8):
+        self.max_slides = max(max_slides, 1)
+
+        self._lock = threading.Lock()
+        self._slides: "OrderedDict[Tuple[str, int], _Slide]" = OrderedDict()
+        self._prefetched: Dict[Tuple, Tuple[Any, "TilePrefetcher"]] = {}
+        self._prefetching: Dict[Tuple, "TilePrefetcher"] = {}
+
+    @contextmanager
+    def open(self, path: str):
+        key = (os.path.realpath(path), os.stat(path).st_mtime_ns)
+        with self._lock:
+            cached = self._slides.get(key)
+            owner = cached is None
+            if cached is None:
+                cached = _Slide()  # placeholder;  opened outside of the lock
+                self._slides[key] = cached
+            e: _Slide = cached
+            self._slides.move_to_end(key)
+            e.refs += 1
+            self._evict()
+
+        try:
+            if owner:
+                try:
+                    e.slide = _openslide().OpenSlide(path)
+                except BaseException as ex:
+                    e.error = ex
+                    with self._lock:
+                        if self._slides.get(key) is e:
+                            self._slides.pop(key)
+                    raise
+                finally:
+                    e.ready.set()
+            else:
+                e.ready.wait()
+                if e.error is not None:
+                    raise e.error
+            yield e.slide
+        finally:
+            with self._lock:
+                e.refs -= 1
+                if e.evicted and e.refs == 0 and e.slide is not None:
+                    e.slide.close()
+
+    def _evict(self):
+        while len(self._slides) > self.max_slides:
+            _, e = self._slides.popitem(last=False)
+            e.evicted = True
+            if e.refs == 0 and e.slide is not None:
+                e.slide.close()
+
+    @staticmethod
+    def region_key(path: str, location: Sequence[int], level: int, size: Sequence[int]) -> Tuple:
+        return os.path.realpath(path), tuple(int(v) for v in location), int(level), tuple(int(v) for v in size)
+
+    def read_region(self, path: str, location: Sequence[int], level: int, size: Sequence[int]):
+        """
+        Read region (PIL Image) of the slide;  same as `OpenSlide.read_region`
+        """
+        key = self.region_key(path, location, level, size)
+        with self._lock:
+            e = self._prefetched.pop(key, None)
+            self._prefetching.pop(key, None)  # not needed anymore (if it's not yet read ahead)
+        if e is not None:
+            e[1].consumed()
+            return e[0]
+
+        with self.open(path) as slide:
+            return slide.read_region(tuple(location), level, tuple(size))
+
+    def prefetch(self, path: str, tasks: List[Dict[str, Any]], depth: int) -> "TilePrefetcher":
+        return TilePrefetcher(self, path, tasks, depth)
+
+    def clear(self):
+        with self._lock:
+            for e in self._slides.values():
+                e.evicted = True
+                if e.refs == 0 and e.slide is not None:
+                    e.slide.close()
+            self._slides.clear()
+
+
+class TilePrefetcher:
+    """
+    Read ahead (in a background thread) the regions of the WSI infer tasks in their order;  so that reading the next
+    tiles overlaps with the inference of current ones.  At most `depth` regions (not yet consumed) are kept in memory.
+
+    Use it as a context manager (or call :py:meth:`close`) to drop the regions which are not consumed.
+    """
+
+    def __init__(self, cache: SlideCache, path: str, tasks: List[Dict[str, Any]], depth: int):
+        self.cache = cache
+        self.path = path
+        self.regions = [(t["location"], t.get("level", 0), t["size"]) for t in tasks]
+        self._sem = threading.Semaphore(max(depth, 1))
+        self._stop = threading.Event()
+
+        with cache._lock:
+            for r in self.regions:
+                cache._prefetching[cache.region_key(path, *r)] = self
+
+        self._thread = threading.Thread(target=self._run, name="TilePrefetcher", daemon=True)
+        self._thread.start()
+
+    def consumed(self):
+        self._sem.release()
+
+    def _run(self):
+        cache = self.cache
+        for location, level, size in self.regions:
+            while not self._sem.acquire(timeout=0.1):
+                if self._stop.is_set():
+                    return
+            if self._stop.is_set():
+                return
+
+            key = cache.region_key(self.path, location, level, size)
+            with cache._lock:
+                pending = cache._prefetching.get(key) is self
+            if not pending:
+                self._sem.release()
+                continue
+
+            try:
+                with cache.open(self.path) as slide:
+                    img = slide.read_region(tuple(location), level, tuple(size))
+            except Exception as e:
+                logger.warning(f"Failed to prefetch {key}: {e}")
+                self._sem.release()
+                continue
+
+            with cache._lock:
+                if cache._prefetching.get(key) is self:
+                    cache._prefetching.pop(key)
+                    cache._prefetched[key] = (img, self)
+                    img = None
+            if img is not None:
+                self._sem.release()  # already read by the task itself
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        with self.cache._lock:
+            for key in [k for k, v in self.cache._prefetching.items() if v is self]:
+                self.cache._prefetching.pop(key)
+            for key in [k for k, v in self.cache._prefetched.items() if v[1] is self]:
+                self.cache._prefetched.pop(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+_slide_cache: Optional[SlideCache] = None
+_slide_cache_lock = threading.Lock()
+
+
+def slide_cache() -> SlideCache:
+    """
+    Process-wide instance of :py:class:`SlideCache` configured from settings
+    """
+    global _slide_cache
+    with _slide_cache_lock:
+        if _slide_cache is None:
+            _slide_cache = SlideCache(max_slides=settings.MONAI_LABEL_WSI_SLIDE_CACHE)
+        return _slide_cache
+
+
+def tissue_mask(slide, location: Sequence[int], size: Sequence[int], max_size: int = 2048, min_saturation: int = 20):
+    """
+    Tissue mask of the slide region computed on a low resolution (pyramid) level.
+
+    Pixels whose saturation (HSV) is above `min_saturation` are tissue;  background (glass) is bright and
+    unsaturated.  The threshold is fixed (not derived from the region) so that regions which are entirely tissue
+    are not split between lightly and darkly stained parts.
+
+    :param slide: OpenSlide handle
+    :param location: (x, y) of the region at level 0
+    :param size: (w, h) of the region at level 0
+    :param max_size: max size (of the longer side) of the region at the level used for the mask
+    :param min_saturation: min saturation (0-255) of the tissue
+    :return: boolean mask (rows x cols) and its downsample factor relative to level 0
+    """
+    x, y = location
+    w, h = size
+
+    level = slide.get_best_level_for_downsample(max(w, h) / max_size)
+    ds = slide.level_downsamples[level]
+    if max(w, h) / ds <= 2 * max_size:
+        img = slide.read_region((x, y), level, (max(1, int(w / ds)), max(1, int(h / ds))))
+    else:
+        # no suitable pyramid level;  crop the region from the thumbnail of the slide
+        thumbnail = slide.get_thumbnail((max_size, max_size))
+        ds = slide.dimensions[0] / thumbnail.width
+        img = thumbnail.crop((int(x / ds), int(y / ds), ceil((x + w) / ds), ceil((y + h) / ds)))
+
+    rgb = np.asarray(img.convert("RGB"), dtype=np.int32)
+    hi, lo = rgb.max(axis=-1), rgb.min(axis=-1)
+    saturation = np.where(hi > 0, (hi - lo) * 255 // np.maximum(hi, 1), 0).astype(np.uint8)
+    return saturation > min_saturation, ds
+
+
 def create_infer_wsi_tasks(request, image):
     if request.get("wsi_tiles"):
         return create_infer_wsi_tasks_from_tiles(request, image)
@@ -34,22 +283,31 @@ def create_infer_wsi_tasks(request, image):
     bbox = [[location[0], location[1]], [location[0] + size[0], location[1] + size[1]]]
     bbox = bbox if bbox and sum(bbox[0]) + sum(bbox[1]) > 0 else None
 
-    if platform.system() == "Windows":
-        cdll.LoadLibrary(str(ctypes.util.find_library("libopenslide-0.dll")))
-
-    openslide, has_openslide = optional_import("openslide")
-    if not has_openslide:
-        raise ImportError("Unable to find openslide, please ensure openslide library packages are correctly installed")
-
-    with openslide.OpenSlide(image) as slide:
+    tissue_threshold = request.get("tissue_threshold", settings.MONAI_LABEL_WSI_TISSUE_THRESHOLD)
+    mask = None
+    with slide_cache().open(image) as slide:
         w, h = slide.dimensions
-    logger.debug(f"Input WSI Image Dimensions: ({w} x {h}); Tile Size: {tile_size}")
+        logger.debug(f"Input WSI Image Dimensions: ({w} x {h}); Tile Size: {tile_size}")
 
-    x, y = 0, 0
-    if bbox:
-        x, y = int(bbox[0][0]), int(bbox[0][1])
-        w, h = int(bbox[1][0] - x), int(bbox[1][1] - y)
-        logger.debug(f"WSI Region => Location: ({x}, {y}); Dimensions: ({w} x {h})")
+        x, y = 0, 0
+        if bbox:
+            x, y = int(bbox[0][0]), int(bbox[0][1])
+            w, h = int(bbox[1][0] - x), int(bbox[1][1] - y)
+            logger.debug(f"WSI Region => Location: ({x}, {y}); Dimensions: ({w} x {h})")
+
+        if tissue_threshold > 0 and ceil(w / tile_size[0]) * ceil(h / tile_size[1]) > 1:
+            mask, ds = tissue_mask(slide, (x, y), (w, h))
+            tissue = np.argwhere(mask)
+            if len(tissue):
+                # generate grid only over the bounding box of the tissue
+                (my0, mx0), (my1, mx1) = tissue.min(axis=0), tissue.max(axis=0) + 1
+                x0, y0 = x + int(mx0 * ds), y + int(my0 * ds)
+                w, h = min(x + w, x + ceil(mx1 * ds)) - x0, min(y + h, y + ceil(my1 * ds)) - y0
+                mask, x, y = mask[my0:my1, mx0:mx1], x0, y0
+                logger.debug(f"WSI Tissue Region => Location: ({x}, {y}); Dimensions: ({w} x {h})")
+            else:
+                logger.info("No tissue found in WSI Region;  tiles are not filtered")
+                mask = None
 
     cols = ceil(w / tile_size[0])  # COL
     rows = ceil(h / tile_size[1])  # ROW
@@ -75,6 +333,11 @@ def create_infer_wsi_tasks(request, image):
             if ignore_small_patches and (tw < pw or th < ph):
                 continue
 
+            if mask is not None:
+                m = mask[int((ty - y) / ds) : ceil((ty - y + th) / ds), int((tx - x) / ds) : ceil((tx - x + tw) / ds)]
+                if not m.size or m.mean() < tissue_threshold:
+                    continue
+
             if ignore_non_click_patches and (request.get("foreground") or request.get("background")):
 
                 def filter_points(ptype):
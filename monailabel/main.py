@@ -15,6 +15,7 @@ import logging
 import os
 import pathlib
 import platform
+import secrets
 import shutil
 import sys
 
@@ -60,6 +61,12 @@ class Main:
         parser.add_argument("--ssl_keyfile_password", default=None, type=str, help="SSL key file password")
         parser.add_argument("--ssl_ca_certs", default=None, type=str, help="CA certificates file")
         parser.add_argument("--workers", default=None, type=int, help="Number of worker processes")
+        parser.add_argument(
+            "--model_servers",
+            default=None,
+            type=str,
+            help="Devices (e.g. cuda:0,cuda:1 or auto) to run inference in separate model server processes",
+        )
         parser.add_argument("--limit_concurrency", default=None, type=int, help="Max concurrent connections")
         parser.add_argument("--access_log", action="store_true", help="Enable access log")
 
@@ -237,21 +244,35 @@ class Main:
         if args.dryrun:
             return
 
-        uvicorn.run(
-            args.uvicorn_app,
-            host=args.host,
-            port=args.port,
-            log_level="info",
-            log_config=log_config,
-            use_colors=True,
-            access_log=args.access_log,
-            ssl_keyfile=args.ssl_keyfile,
-            ssl_certfile=args.ssl_certfile,
-            ssl_keyfile_password=args.ssl_keyfile_password,
-            ssl_ca_certs=args.ssl_ca_certs,
-            workers=args.workers,
-            limit_concurrency=args.limit_concurrency,
-        )
+        model_servers = []
+        if settings.MONAI_LABEL_MODEL_SERVERS:
+            from monailabel.interfaces.utils.model_server import start_model_servers
+
+            model_servers = start_model_servers(
+                settings.MONAI_LABEL_MODEL_SERVERS, args.port, settings.MONAI_LABEL_MODEL_SERVER_AUTHKEY
+            )
+
+        try:
+            uvicorn.run(
+                args.uvicorn_app,
+                host=args.host,
+                port=args.port,
+                log_level="info",
+                log_config=log_config,
+                use_colors=True,
+                access_log=args.access_log,
+                ssl_keyfile=args.ssl_keyfile,
+                ssl_certfile=args.ssl_certfile,
+                ssl_keyfile_password=args.ssl_keyfile_password,
+                ssl_ca_certs=args.ssl_ca_certs,
+                workers=args.workers,
+                limit_concurrency=args.limit_concurrency,
+            )
+        finally:
+            for p in model_servers:
+                p.terminate()
+            for p in model_servers:
+                p.wait()
 
     def start_server_validate_args(self, args):
         if not args.app:
@@ -286,6 +307,7 @@ class Main:
             "MONAI_ZOO_AUTH_TOKEN",
             "MONAI_LABEL_DATASTORE_PASSWORD",
             "MONAI_LABEL_DATASTORE_API_KEY",
+            "MONAI_LABEL_MODEL_SERVER_AUTHKEY",
         ]
         for k, v in settings.dict().items():
             v = f"'{json.dumps(v)}'" if isinstance(v, list) or isinstance(v, dict) else v
@@ -301,6 +323,18 @@ class Main:
         settings.MONAI_LABEL_STUDIES = args.studies
         settings.MONAI_LABEL_APP_CONF = conf
 
+        model_servers = getattr(args, "model_servers", None)
+        if model_servers:
+            if model_servers == "auto":
+                import torch
+
+                devices = [f"cuda:{i}" for i in range(torch.cuda.device_count())]
+            else:
+                devices = [d.strip() for d in model_servers.split(",") if d.strip()]
+            settings.MONAI_LABEL_MODEL_SERVERS = devices if devices else ["cpu"]
+        if settings.MONAI_LABEL_MODEL_SERVERS and not settings.MONAI_LABEL_MODEL_SERVER_AUTHKEY:
+            settings.MONAI_LABEL_MODEL_SERVER_AUTHKEY = secrets.token_hex(16)
+
         dirs = ["model", "lib", "logs", "bin"]
         for d in dirs:
             d = os.path.join(args.app, d)
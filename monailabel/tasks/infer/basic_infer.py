@@ -21,12 +21,16 @@ import torch
 from monai.data import decollate_batch
 from monai.inferers import Inferer, SimpleInferer, SlidingWindowInferer
 
+from monailabel.config import settings
 from monailabel.interfaces.exception import MONAILabelError, MONAILabelException
 from monailabel.interfaces.tasks.infer_v2 import InferTask, InferType
 from monailabel.interfaces.utils.transform import dump_data, run_transforms
-from monailabel.transform.cache import CacheTransformDatad
+from monailabel.tasks.infer.batching import MicroBatcher
+from monailabel.tasks.infer.network_cache import network_cache
+from monailabel.transform.cache import CacheTransformDatad, transform_fingerprint
 from monailabel.transform.writer import ClassificationWriter, DetectionWriter, Writer
 from monailabel.utils.others.generic import device_list
+from monailabel.utils.sessions import session_cache
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +66,9 @@ class BasicInferTask(InferTask):
         preload=False,
         train_mode=False,
         skip_writer=False,
+        pinned=False,
+        max_batch_size=1,
+        max_batch_wait=0.05,
     ):
         """
         :param path: Model File Path. Supports multiple paths to support versions (Last item will be picked as latest)
@@ -77,9 +84,12 @@ class BasicInferTask(InferTask):
         :param config: K,V pairs to be part of user config
         :param load_strict: Load model in strict mode
         :param roi_size: ROI size for scanning window inference
-        :param preload: Preload model/network on all available GPU devices
+        :param preload: Preload model/network on all available GPU devices (skipped in front-ends of model servers)
         :param train_mode: Run in Train mode instead of eval (when network has dropouts)
         :param skip_writer: Skip Writer and return data dictionary
+        :param pinned: Pin the network in the (process-wide) network cache; i.e. never offload/evict it
+        :param max_batch_size: Max number of concurrent requests to be batched into single forward pass (1 => disabled)
+        :param max_batch_wait: Max time (in seconds) to wait for concurrent requests to fill the batch
         """
 
         super().__init__(type, labels, dimension, description, config)
@@ -94,8 +104,8 @@ class BasicInferTask(InferTask):
         self.roi_size = roi_size
         self.train_mode = train_mode
         self.skip_writer = skip_writer
-
-        self._networks: Dict = {}
+        self.pinned = pinned
+        self._batcher = MicroBatcher(max_batch_size, max_batch_wait) if max_batch_size > 1 else None
 
         self._config.update(
             {
@@ -112,7 +122,8 @@ class BasicInferTask(InferTask):
         if config:
             self._config.update(config)
 
-        if preload:
+        # http workers (front-ends) of model servers never run the network;  model servers preload it instead
+        if preload and not settings.MONAI_LABEL_MODEL_SERVERS:
             for device in ["cuda", *device_list()]:
                 logger.info(f"Preload Network for device: {device}")
                 self._get_network(device)
@@ -150,11 +161,33 @@ class BasicInferTask(InferTask):
         return None
 
     def add_cache_transform(self, t, data, keys=("image", "image_meta_dict"), hash_key=("image_path", "model")):
-        if data and data.get("cache_transforms", False):
+        """
+        Add :py:class:`CacheTransformDatad` to cache (or load) the output of the transforms `t` added so far.
+
+        For requests of a session, the decoded/pre-processed image is kept with the session (see
+        :py:func:`monailabel.utils.sessions.session_cache`) so that repeated requests (e.g. clicks) skip the image I/O;
+        otherwise it is cached only if `cache_transforms` is enabled in the request.
+        """
+        session = data.get("session") if data else None
+        if session and session.get("path") and settings.MONAI_LABEL_SESSION_CACHE:
+            t.append(
+                CacheTransformDatad(
+                    keys=keys,
+                    hash_key=hash_key,
+                    in_memory=settings.MONAI_LABEL_SESSION_CACHE_MEMORY > 0,
+                    ttl=session.get("expiry", 0),
+                    fingerprint=transform_fingerprint(t),
+                    cache=session_cache(session["path"]),
+                )
+            )
+        elif data and data.get("cache_transforms", False):
             in_memory = data.get("cache_transforms_in_memory", True)
             ttl = data.get("cache_transforms_ttl", 300)
 
-            t.append(CacheTransformDatad(keys=keys, hash_key=hash_key, in_memory=in_memory, ttl=ttl))
+            fingerprint = transform_fingerprint(t)
+            t.append(
+                CacheTransformDatad(keys=keys, hash_key=hash_key, in_memory=in_memory, ttl=ttl, fingerprint=fingerprint)
+            )
 
     @abstractmethod
     def pre_transforms(self, data=None) -> Sequence[Callable]:
@@ -263,7 +296,48 @@ class BasicInferTask(InferTask):
 
         Returns: Label (File Path) and Result Params (JSON)
         """
+        with network_cache().busy(self):
+            return self._run(request, callbacks)
+
+    def _run(
+        self, request, callbacks: Union[Dict[CallBackTypes, Any], None] = None
+    ) -> Union[Dict, Tuple[str, Dict[str, Any]]]:
         begin = time.time()
+        data = self.prepare_request(request)
+        device = data["device"]
+
+        # callbacks useful in case of pipeliens to consume intermediate output from each of the following stages
+        # callback function should consume data and returns data (modified/updated)
+        callbacks = callbacks if callbacks else {}
+        callback_run_pre_transforms = callbacks.get(CallBackTypes.PRE_TRANSFORMS)
+        callback_run_inferer = callbacks.get(CallBackTypes.INFERER)
+
+        start = time.time()
+        pre_transforms = self.pre_transforms(data)
+        data = self.run_pre_transforms(data, pre_transforms)
+        if callback_run_pre_transforms:
+            data = callback_run_pre_transforms(data)
+        latency_pre = time.time() - start
+
+        start = time.time()
+        if self.type == InferType.DETECTION:
+            data = self.run_detector(data, device=device)
+        else:
+            data = self.run_inferer(data, device=device)
+
+        if callback_run_inferer:
+            data = callback_run_inferer(data)
+        latency_inferer = time.time() - start
+
+        return self.finish(data, pre_transforms, begin, latency_pre, latency_inferer, callbacks)
+
+    def prepare_request(self, request) -> Dict[str, Any]:
+        """
+        Merge the request with the config of the task and resolve the device
+
+        :param request: infer request
+        :return: data to run pre-transforms over
+        """
         req = copy.deepcopy(self._config)
         req.update(request)
 
@@ -288,33 +362,33 @@ class BasicInferTask(InferTask):
         else:
             dump_data(req, logger.level)
             data = req
+        return data
 
-        # callbacks useful in case of pipeliens to consume intermediate output from each of the following stages
-        # callback function should consume data and returns data (modified/updated)
+    def finish(
+        self,
+        data: Dict[str, Any],
+        pre_transforms,
+        begin: float,
+        latency_pre: float,
+        latency_inferer: float,
+        callbacks: Union[Dict[CallBackTypes, Any], None] = None,
+    ) -> Union[Dict, Tuple[str, Dict[str, Any]]]:
+        """
+        Run Invert Transforms, Post Transforms and Writer over the output of the inferer
+
+        :param data: output of the inferer
+        :param pre_transforms: pre-transforms which were run over the data
+        :param begin: start time of the request
+        :param latency_pre: time taken by pre-transforms
+        :param latency_inferer: time taken by inferer
+        :param callbacks: callbacks to consume outputs of invert/post transforms and writer
+        :return: Label (File Path) and Result Params (JSON)
+        """
         callbacks = callbacks if callbacks else {}
-        callback_run_pre_transforms = callbacks.get(CallBackTypes.PRE_TRANSFORMS)
-        callback_run_inferer = callbacks.get(CallBackTypes.INFERER)
         callback_run_invert_transforms = callbacks.get(CallBackTypes.INVERT_TRANSFORMS)
         callback_run_post_transforms = callbacks.get(CallBackTypes.POST_TRANSFORMS)
         callback_writer = callbacks.get(CallBackTypes.WRITER)
 
-        start = time.time()
-        pre_transforms = self.pre_transforms(data)
-        data = self.run_pre_transforms(data, pre_transforms)
-        if callback_run_pre_transforms:
-            data = callback_run_pre_transforms(data)
-        latency_pre = time.time() - start
-
-        start = time.time()
-        if self.type == InferType.DETECTION:
-            data = self.run_detector(data, device=device)
-        else:
-            data = self.run_inferer(data, device=device)
-
-        if callback_run_inferer:
-            data = callback_run_inferer(data)
-        latency_inferer = time.time() - start
-
         start = time.time()
         data = self.run_invert_transforms(data, pre_transforms, self.inverse_transforms(data))
         if callback_run_invert_transforms:
@@ -419,7 +493,7 @@ class BasicInferTask(InferTask):
         return run_transforms(data, transforms, log_prefix="POST")
 
     def clear_cache(self):
-        self._networks.clear()
+        network_cache().remove(self)
 
     def _get_network(self, device):
         path = self.get_path()
@@ -433,14 +507,9 @@ class BasicInferTask(InferTask):
                 f"Model Path ({self.path}) does not exist/valid",
             )
 
-        cached = self._networks.get(device)
         statbuf = os.stat(path) if path else None
-        network = None
-        if cached:
-            if statbuf and statbuf.st_mtime == cached[1]:
-                network = cached[0]
-            elif statbuf:
-                logger.warning(f"Reload model from cache.  Prev ts: {cached[1]}; Current ts: {statbuf.st_mtime}")
+        ts = statbuf.st_mtime if statbuf else 0
+        network = network_cache().get(self, device, ts)
 
         if network is None:
             if self.network:
@@ -458,7 +527,8 @@ class BasicInferTask(InferTask):
                 network.train()
             else:
                 network.eval()
-            self._networks[device] = (network, statbuf.st_mtime if statbuf else 0)
+            name = f"{self.__class__.__name__}({os.path.basename(path) if path else ''})"
+            network_cache().put(self, device, network, ts, name=name, pinned=self.pinned)
 
         return network
 
@@ -484,24 +554,69 @@ class BasicInferTask(InferTask):
             inputs = inputs.to(torch.device(device))
 
             with torch.no_grad():
-                outputs = inferer(inputs, network)
+                if convert_to_batch and self._batcher:
+                    key = (device, tuple(inputs.shape), inputs.dtype, inferer.__class__.__name__, str(inferer.__dict__))
+                    outputs = self._batcher(key, inputs, lambda x: inferer(x, network))
+                else:
+                    outputs = inferer(inputs, network)
+                    if convert_to_batch:
+                        if isinstance(outputs, dict):
+                            outputs_d = decollate_batch(outputs)
+                            outputs = outputs_d[0]
+                        else:
+                            outputs = outputs[0]
 
             if device.startswith("cuda"):
                 torch.cuda.empty_cache()
 
-            if convert_to_batch:
-                if isinstance(outputs, dict):
-                    outputs_d = decollate_batch(outputs)
-                    outputs = outputs_d[0]
-                else:
-                    outputs = outputs[0]
-
             data[self.output_label_key] = outputs
         else:
             # consider them as callable transforms
             data = run_transforms(data, inferer, log_prefix="INF", log_name="Inferer")
         return data
 
+    def run_inferer_batch(self, batch: List[Dict[str, Any]], device="cuda") -> List[Dict[str, Any]]:
+        """
+        Run Inferer over a batch of pre-processed Data (e.g. tiles of a WSI) in as few forward passes as possible.
+        Inputs of the same shape are stacked into a single batch;  the output of each is the same as
+        running :py:meth:`run_inferer` for it.
+
+        Runs :py:meth:`run_inferer` (or :py:meth:`run_detector`) for each data in case the task customizes it
+        or there is no network (i.e. inferer is a list of callable transforms).
+
+        :param batch: list of pre-processed data
+        :param device: device type run load the model and run inferer
+        :return: list of updated data with output_key stored that will be used for post-processing
+        """
+        batched = self.type != InferType.DETECTION and type(self).run_inferer is BasicInferTask.run_inferer
+        network = self._get_network(device) if batched and len(batch) > 1 else None
+        if network is None:
+            if self.type == InferType.DETECTION:
+                return [self.run_detector(data, device=device) for data in batch]
+            return [self.run_inferer(data, device=device) for data in batch]
+
+        groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+        for data in batch:
+            groups.setdefault(tuple(data[self.input_key].shape), []).append(data)
+
+        for group in groups.values():
+            inferer = self.inferer(group[0])
+            logger.info(f"Inferer:: {device} => {inferer.__class__.__name__} => Batch Size: {len(group)}")
+
+            inputs = [d[self.input_key] for d in group]
+            inputs = [i if torch.is_tensor(i) else torch.from_numpy(i) for i in inputs]
+            batch_inputs = torch.stack(inputs).to(torch.device(device))
+            with torch.no_grad():
+                outputs = inferer(batch_inputs, network)
+            outputs = decollate_batch(outputs) if isinstance(outputs, dict) else list(outputs)
+
+            for d, o in zip(group, outputs):
+                d[self.output_label_key] = o
+
+        if device.startswith("cuda"):
+            torch.cuda.empty_cache()
+        return batch
+
     def run_detector(self, data: Dict[str, Any], convert_to_batch=True, device="cuda"):
         """
         Run Detector over pre-processed Data.  Derive this logic to customize the normal behavior.
@@ -599,7 +714,7 @@ class BasicInferTask(InferTask):
         return writer(data)
 
     def clear(self):
-        self._networks.clear()
+        network_cache().remove(self)
 
     def set_loglevel(self, level: str):
         logger.setLevel(level.upper())
@@ -0,0 +1,89 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import torch
+from monai.data import decollate_batch
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.inputs: List[torch.Tensor] = []
+        self.outputs: List[Any] = []  # set by the leader once the forward pass is done
+        self.error: Optional[BaseException] = None
+        self.full = threading.Event()
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Collects inputs of concurrent requests (from different threads) and runs them as a single batched forward pass.
+
+    The first request for a given (compatibility) key becomes the leader;  it waits up to `max_wait` seconds
+    (or until `max_batch_size` inputs are collected), runs the forward pass over the concatenated inputs and
+    scatters the outputs back to each of the waiting requests.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait: float = 0.05):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, _Batch] = {}
+
+    def __call__(self, key: Hashable, inputs: torch.Tensor, forward: Callable) -> Any:
+        """
+        Run forward for the given (single) input as part of a micro batch
+
+        :param key: inputs with the same key are considered compatible to be batched together
+        :param inputs: batched input of size 1 (i.e. shape: 1 x C x ...)
+        :param forward: callable which runs the network over batched input
+        :return: output for the given input (decollated; i.e. without batch dimension)
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+            leader = pending is None
+            if pending is None:
+                pending = _Batch()
+                self._pending[key] = pending
+            batch: _Batch = pending
+
+            idx = len(batch.inputs)
+            batch.inputs.append(inputs)
+            if len(batch.inputs) >= self.max_batch_size:
+                self._pending.pop(key, None)
+                batch.full.set()
+
+        if not leader:
+            batch.done.wait()
+        else:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    self._pending.pop(key)
+
+            try:
+                logger.info(f"Micro Batch:: Running forward for batch size: {len(batch.inputs)}")
+                outputs = forward(torch.cat(batch.inputs) if len(batch.inputs) > 1 else batch.inputs[0])
+                batch.outputs = decollate_batch(outputs) if isinstance(outputs, dict) else list(outputs)
+            except BaseException as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.outputs[idx]
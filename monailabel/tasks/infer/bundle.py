@@ -9,12 +9,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import glob
 import json
 import logging
 import os
 import sys
-from typing import Any, Callable, Dict, Optional, Sequence, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union, cast
 
 from monai.bundle import ConfigItem, ConfigParser
 from monai.inferers import Inferer, SimpleInferer
@@ -87,6 +90,7 @@ class BundleInferTask(BasicInferTask):
         extend_load_image: bool = True,
         add_post_restore: bool = True,
         dropout: float = 0.0,
+        max_cached_chains: int = 16,
         **kwargs,
     ):
         self.valid: bool = False
@@ -96,6 +100,14 @@ class BundleInferTask(BasicInferTask):
         self.post_filter = post_filter
         self.extend_load_image = extend_load_image
         self.dropout = dropout
+        self.displayable_configs: Dict[str, Any] = {}
+
+        # instantiated transform chains/inferer per (device, displayable config values)
+        self.max_cached_chains = max_cached_chains
+        self._chains: OrderedDict = OrderedDict()
+        self._chains_lock = threading.RLock()
+        self._bundle_ts: Optional[Tuple] = None
+        self._displayable_base: Dict[str, Any] = {}
 
         config_paths = [c for c in self.const.configs() if os.path.exists(os.path.join(path, "configs", c))]
         if not config_paths:
@@ -108,9 +120,7 @@ class BundleInferTask(BasicInferTask):
         self.bundle_path = path
         self.bundle_config_path = os.path.join(path, "configs", config_paths[0])
         self.bundle_config = self._load_bundle_config(self.bundle_path, self.bundle_config_path)
-
-        if self.dropout > 0:
-            self.bundle_config["network_def"]["dropout"] = self.dropout
+        self._bundle_ts = self._bundle_files_ts()
 
         network = None
         model_path = os.path.join(path, "models", self.const.model_pytorch())
@@ -174,17 +184,25 @@ class BundleInferTask(BasicInferTask):
         i["version"] = self.version
         return i
 
+    def prepare_request(self, request) -> Dict[str, Any]:
+        self._check_bundle()  # once per request
+        return super().prepare_request(request)
+
     def pre_transforms(self, data=None) -> Sequence[Callable]:
-        # Update bundle parameters based on user's option
-        for k in self.const.key_displayable_configs():
-            if self.bundle_config.get(k):
-                self.bundle_config[k].update({c: data[c] for c in self.displayable_configs.keys()})
-                self.bundle_config.parse()
+        return cast(Sequence[Callable], self._cached("pre", data, self._create_pre_transforms))
 
-        sys.path.insert(0, self.bundle_path)
-        unload_module("scripts")
-        self._update_device(data)
+    def inferer(self, data=None) -> Inferer:
+        return cast(Inferer, self._cached("inferer", data, self._create_inferer))
 
+    def detector(self, data=None) -> Optional[Callable]:
+        # not cached;  detector ops (e.g. box selector parameters) modify the detector of the request
+        with self._chains_lock:
+            return cast(Optional[Callable], self._create(data, self._create_detector))
+
+    def post_transforms(self, data=None) -> Sequence[Callable]:
+        return cast(Sequence[Callable], self._cached("post", data, self._create_post_transforms))
+
+    def _create_pre_transforms(self):
         pre = []
         for k in self.const.key_preprocessing():
             if self.bundle_config.get(k):
@@ -200,29 +218,17 @@ class BundleInferTask(BasicInferTask):
                 else:
                     res.append(t)
             pre = res
-
-        sys.path.remove(self.bundle_path)
         return pre
 
-    def inferer(self, data=None) -> Inferer:
-        sys.path.insert(0, self.bundle_path)
-        unload_module("scripts")
-        self._update_device(data)
-
+    def _create_inferer(self):
         i = None
         for k in self.const.key_inferer():
             if self.bundle_config.get(k):
                 i = self.bundle_config.get_parsed_content(k, instantiate=True)  # type: ignore
                 break
-
-        sys.path.remove(self.bundle_path)
         return i if i is not None else SimpleInferer()
 
-    def detector(self, data=None) -> Optional[Callable]:
-        sys.path.insert(0, self.bundle_path)
-        unload_module("scripts")
-        self._update_device(data)
-
+    def _create_detector(self):
         d = None
         for k in self.const.key_detector():
             if self.bundle_config.get(k):
@@ -234,15 +240,9 @@ class BundleInferTask(BasicInferTask):
                     d = detector  # type: ignore
                     break
                 raise ValueError("Invalid Detector type;  It's not callable")
-
-        sys.path.remove(self.bundle_path)
         return d
 
-    def post_transforms(self, data=None) -> Sequence[Callable]:
-        sys.path.insert(0, self.bundle_path)
-        unload_module("scripts")
-        self._update_device(data)
-
+    def _create_post_transforms(self):
         post = []
         for k in self.const.key_postprocessing():
             if self.bundle_config.get(k):
@@ -252,10 +252,61 @@ class BundleInferTask(BasicInferTask):
 
         if self.add_post_restore:
             post.append(Restored(keys=self.key_pred, ref_image=self.key_image))
-
-        sys.path.remove(self.bundle_path)
         return post
 
+    def _bundle_files_ts(self) -> Tuple:
+        files = [self.bundle_config_path]
+        files.extend(glob.glob(os.path.join(self.bundle_path, "scripts", "**", "*.py"), recursive=True))
+        return tuple((f, os.stat(f).st_mtime_ns) for f in sorted(files) if os.path.exists(f))
+
+    def _check_bundle(self):
+        """
+        Reload bundle config (and drop all the cached objects) in case bundle config/scripts are modified
+        """
+        ts = self._bundle_files_ts()
+        with self._chains_lock:
+            if ts != self._bundle_ts:
+                logger.info(f"Bundle {self.bundle_path} has been modified; reload config")
+                self.bundle_config = self._load_bundle_config(self.bundle_path, self.bundle_config_path)
+                self._bundle_ts = ts
+                self._chains.clear()
+
+    def _cached(self, kind: str, data, create: Callable[[], Any]):
+        """
+        Instantiate (bundle config => object) only once per unique device + displayable config values;
+        every call gets its own copy of the cached object so that (stateful) transforms are never shared by
+        concurrent requests
+        """
+        values = {c: data[c] for c in self.displayable_configs.keys() if c in data} if data else {}
+        device = data.get(self.const.key_device()) if data else None
+        key = (kind, str(device), json.dumps(values, sort_keys=True, default=str))
+
+        with self._chains_lock:
+            if key in self._chains:
+                self._chains.move_to_end(key)
+                obj = self._chains[key]
+            else:
+                obj = self._create(data, create)
+                self._chains[key] = obj
+                while len(self._chains) > max(1, self.max_cached_chains):
+                    self._chains.popitem(last=False)
+        return copy.deepcopy(obj)
+
+    def _create(self, data, create: Callable[[], Any]):
+        values = {c: data[c] for c in self.displayable_configs.keys() if c in data} if data else {}
+
+        sys.path.insert(0, self.bundle_path)
+        unload_module("scripts")
+        try:
+            # Update bundle parameters based on user's option;  (base) config values for the ones not in request
+            for k, base in self._displayable_base.items():
+                self.bundle_config[k] = {**copy.deepcopy(base), **values}
+                self.bundle_config.parse()
+            self._update_device(data)
+            return create()
+        finally:
+            sys.path.remove(self.bundle_path)
+
     def _get_type(self, name, type):
         name = name.lower() if name else ""
         return (
@@ -298,4 +349,10 @@ class BundleInferTask(BasicInferTask):
         bundle_config = ConfigParser()
         bundle_config.read_config(config)
         bundle_config.config.update({self.const.key_bundle_root(): path})  # type: ignore
+        if self.dropout > 0:
+            bundle_config["network_def"]["dropout"] = self.dropout
+
+        self._displayable_base = {
+            k: copy.deepcopy(bundle_config[k]) for k in self.const.key_displayable_configs() if bundle_config.get(k)
+        }
         return bundle_config
@@ -0,0 +1,220 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import torch
+
+from monailabel.config import settings
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def network_size(network) -> int:
+    """
+    Memory (in bytes) occupied by parameters and buffers of the network
+    """
+    size = 0
+    for t in (*network.parameters(), *network.buffers()):
+        size += t.numel() * t.element_size()
+    return size
+
+
+class _Entry:
+    def __init__(self, name: str, network, ts: float, device: str, size: int, pinned: bool):
+        self.name = name
+        self.network = network
+        self.ts = ts
+        self.device = device  # device requested by infer task
+        self.location = device  # device where network currently lives (cpu when offloaded)
+        self.size = size
+        self.pinned = pinned
+        self.hits = 0
+        self.last_used = time.time()
+
+
+class NetworkCache:
+    """
+    Process-wide LRU cache of networks shared by all infer tasks.
+
+    Networks are accounted per device against `gpu_memory` (per cuda device) and `host_memory` budgets.
+    When a cuda device runs out of budget, the least recently used (and not pinned/busy) networks are
+    offloaded to host memory (or dropped if `offload` is disabled);  when host runs out of budget they are dropped.
+    A budget of 0 means unlimited.
+    """
+
+    def __init__(self, gpu_memory: int = 0, host_memory: int = 0, offload: bool = True):
+        self.gpu_memory = gpu_memory
+        self.host_memory = host_memory
+        self.offload = offload
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Tuple[Hashable, str], _Entry]" = OrderedDict()
+        self._busy: Dict[Hashable, int] = {}
+        self._stats = {"hits": 0, "misses": 0, "offloads": 0, "evictions": 0}
+
+    def _budget(self, location: str) -> int:
+        return self.gpu_memory if location.startswith("cuda") else self.host_memory
+
+    def _used(self, location: str) -> int:
+        return sum(e.size for e in self._entries.values() if e.location == location)
+
+    def _make_room(self, location: str, size: int, exclude=None) -> None:
+        budget = self._budget(location)
+        if not budget:
+            return
+
+        for key in list(self._entries.keys()):
+            if self._used(location) + size <= budget:
+                return
+
+            e = self._entries.get(key)
+            if e is None or key == exclude or e.location != location or e.pinned or self._busy.get(key[0]):
+                continue
+
+            if location.startswith("cuda") and self.offload:
+                self._make_room("cpu", e.size)
+                logger.info(f"Offload network: {e.name} ({e.size // MB} MB) from {location} => cpu")
+                e.network.to(torch.device("cpu"))
+                e.location = "cpu"
+                self._stats["offloads"] += 1
+            else:
+                logger.info(f"Evict network: {e.name} ({e.size // MB} MB) from {location}")
+                self._entries.pop(key)
+                self._stats["evictions"] += 1
+
+        if self._used(location) + size > budget:
+            logger.warning(f"Network cache for {location} exceeds budget ({budget // MB} MB); all are pinned/busy")
+
+    def get(self, owner: Hashable, device: str, ts: float) -> Optional[Any]:
+        """
+        Get cached network for given owner (infer task) and device
+
+        :param owner: owner of the network (e.g. infer task)
+        :param device: device on which network is expected
+        :param ts: timestamp (modified time) of the model file;  stale networks are discarded
+        """
+        key = (owner, device)
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                self._stats["misses"] += 1
+                return None
+
+            if e.ts != ts:
+                logger.warning(f"Reload model from cache.  Prev ts: {e.ts}; Current ts: {ts}")
+                self._entries.pop(key)
+                self._stats["misses"] += 1
+                return None
+
+            if e.location != e.device:
+                self._make_room(e.device, e.size, exclude=key)
+                logger.info(f"Restore network: {e.name} from {e.location} => {e.device}")
+                e.network.to(torch.device(e.device))
+                e.location = e.device
+
+            e.hits += 1
+            e.last_used = time.time()
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return e.network
+
+    def put(self, owner: Hashable, device: str, network, ts: float, name: str = "", pinned: bool = False) -> None:
+        """
+        Add network into cache
+
+        :param owner: owner of the network (e.g. infer task)
+        :param device: device on which network is loaded
+        :param network: network
+        :param ts: timestamp (modified time) of the model file
+        :param name: name of the network (used for stats)
+        :param pinned: pinned networks are never offloaded/evicted
+        """
+        key = (owner, device)
+        with self._lock:
+            self._entries.pop(key, None)
+            size = network_size(network)
+            self._make_room(device, size)
+            self._entries[key] = _Entry(name if name else str(owner), network, ts, device, size, pinned)
+
+    def remove(self, owner: Hashable) -> None:
+        """
+        Remove all networks for the given owner
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == owner]:
+                self._entries.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @contextmanager
+    def busy(self, owner: Hashable):
+        """
+        Mark networks of the owner as in-use;  busy networks are not offloaded/evicted
+        """
+        with self._lock:
+            self._busy[owner] = self._busy.get(owner, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._busy[owner] -= 1
+                if not self._busy[owner]:
+                    self._busy.pop(owner)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            locations = sorted({e.location for e in self._entries.values()})
+            return {
+                "budget": {"gpu": self.gpu_memory // MB, "host": self.host_memory // MB},
+                "used": {loc: self._used(loc) // MB for loc in locations},
+                **self._stats,
+                "networks": [
+                    {
+                        "name": e.name,
+                        "device": e.device,
+                        "location": e.location,
+                        "size": round(e.size / MB, 2),
+                        "pinned": e.pinned,
+                        "hits": e.hits,
+                        "last_used": int(e.last_used),
+                    }
+                    for e in self._entries.values()
+                ],
+            }
+
+
+_network_cache: Optional[NetworkCache] = None
+_network_cache_lock = threading.Lock()
+
+
+def network_cache() -> NetworkCache:
+    """
+    Process-wide instance of :py:class:`NetworkCache` configured from settings
+    """
+    global _network_cache
+    with _network_cache_lock:
+        if _network_cache is None:
+            _network_cache = NetworkCache(
+                gpu_memory=settings.MONAI_LABEL_MODEL_CACHE_GPU_MEMORY * MB,
+                host_memory=settings.MONAI_LABEL_MODEL_CACHE_HOST_MEMORY * MB,
+                offload=settings.MONAI_LABEL_MODEL_CACHE_OFFLOAD,
+            )
+        return _network_cache
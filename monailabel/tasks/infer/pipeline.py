@@ -0,0 +1,209 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import torch
+
+from monailabel.tasks.infer.basic_infer import BasicInferTask
+from monailabel.tasks.infer.network_cache import network_cache
+from monailabel.utils.others.generic import handle_torch_linalg_multithread
+
+logger = logging.getLogger(__name__)
+
+
+class _Item:
+    def __init__(self, idx: int, request: Dict[str, Any]):
+        self.idx = idx
+        self.request = request
+        self.data: Dict[str, Any] = {}
+        self.pre_transforms: Any = None
+        self.begin = 0.0
+        self.latency_pre = 0.0
+        self.latency_infer = 0.0
+
+
+class BatchInferPipeline:
+    """
+    Runs many requests (e.g. tiles of a WSI) of an infer task as a pipeline of
+
+        - pre-transforms (which also read the tile)
+        - batched forward passes over up to `batch_size` pre-processed inputs (of the same device)
+        - invert/post transforms and writer (e.g. contours of the tile)
+
+    so that the network runs over batches while other tiles are read and post-processed.  The result of each
+    request is the same as running the task (i.e. ``task(request)``) for it.
+
+    At most ``2 x batch_size + workers`` requests are in-flight;  memory usage does not grow with number of requests.
+    In case a forward pass runs out of (GPU) memory, the batch is halved and the smaller size is used for the rest
+    of the batches (of the device).
+
+    :param task: infer task;  see :py:meth:`supported`
+    :param batch_size: max number of inputs per forward pass
+    :param workers: number of threads to run pre/post transforms (of different requests) in parallel
+    :param executor: executor to run the forward passes (e.g. shared infer thread pool of the app which limits
+        concurrent inference);  a thread per device is used if None
+    :param timeout: max time (in seconds) to wait for a forward pass (including the wait for the executor);
+        0 => no timeout
+    """
+
+    PRE, INFER, POST = range(3)
+
+    def __init__(
+        self,
+        task: BasicInferTask,
+        batch_size: int = 8,
+        workers: int = 4,
+        executor: Optional[Executor] = None,
+        timeout: float = 0,
+    ):
+        self.task = task
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.timeout = timeout
+        self._batch_limits: Dict[str, int] = {}
+
+    @staticmethod
+    def supported(task) -> bool:
+        """
+        Task can be run as pipeline only if it does not customize how (all the stages of) a request is run
+        """
+        return (
+            isinstance(task, BasicInferTask)
+            and type(task).__call__ is BasicInferTask.__call__
+            and type(task)._run is BasicInferTask._run
+        )
+
+    def __call__(self, requests: Sequence[Dict[str, Any]]) -> Iterator[Tuple[int, Any]]:
+        """
+        Run the requests
+
+        :param requests: infer requests
+        :return: iterator of (index of the request, result of the task) in the order they finish
+        """
+        items = iter([_Item(idx, r) for idx, r in enumerate(requests)])
+        devices = max(1, len({str(r.get("device")) for r in requests}))
+        limit = 2 * self.batch_size + self.workers
+        alive = 0
+
+        futures: Dict[Future, int] = {}
+        deadlines: Dict[Future, float] = {}
+        batches: Dict[str, List[_Item]] = {}
+
+        # forward passes (of different devices) run in parallel to pre/post transforms of other requests
+        own_pool = ThreadPoolExecutor(devices, "Infer Batch") if self.executor is None else None
+        infer_pool = self.executor if self.executor is not None else own_pool
+        pool = ThreadPoolExecutor(self.workers, "Infer Transforms")
+
+        def submit_pre():
+            nonlocal alive
+            while alive < limit:
+                item = next(items, None)
+                if item is None:
+                    return
+                alive += 1
+                futures[pool.submit(self._pre, item)] = self.PRE
+
+        def submit_infer(device):
+            future = infer_pool.submit(self._infer, device, batches.pop(device))  # type: ignore
+            futures[future] = self.INFER
+            if self.timeout > 0:
+                deadlines[future] = time.time() + self.timeout
+
+        try:
+            with network_cache().busy(self.task):
+                submit_pre()
+                while futures:
+                    timeout = max(0.0, min(deadlines.values()) - time.time()) if deadlines else None
+                    done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind = futures.pop(future)
+                        deadlines.pop(future, None)
+                        if kind == self.PRE:
+                            item = future.result()
+                            batch = batches.setdefault(item.data["device"], [])
+                            batch.append(item)
+                            if len(batch) >= self.batch_size:
+                                submit_infer(item.data["device"])
+                        elif kind == self.INFER:
+                            for item in future.result():
+                                futures[pool.submit(self._post, item)] = self.POST
+                        else:
+                            alive -= 1
+                            submit_pre()
+                            yield future.result()
+
+                    if any(d <= time.time() for d in deadlines.values()):
+                        raise FutureTimeoutError(f"Batch Infer did not finish in {self.timeout} secs")
+
+                    # no more inputs to fill the (partial) batches
+                    if not any(kind == self.PRE for kind in futures.values()):
+                        for device in list(batches):
+                            submit_infer(device)
+        finally:
+            # consumer went away (or failed);  do not run the stages which are not yet started
+            for future in futures:
+                future.cancel()
+            pool.shutdown()
+            if own_pool is not None:
+                own_pool.shutdown(wait=False)
+
+    def _pre(self, item: _Item) -> _Item:
+        handle_torch_linalg_multithread(item.request)
+        item.begin = time.time()
+        data = self.task.prepare_request(item.request)
+        item.pre_transforms = self.task.pre_transforms(data)
+        item.data = self.task.run_pre_transforms(data, item.pre_transforms)
+        item.latency_pre = time.time() - item.begin
+        return item
+
+    def _infer(self, device: str, batch: List[_Item]) -> List[_Item]:
+        handle_torch_linalg_multithread(batch[0].request)
+        start = time.time()
+        outputs = self._run_batch(device, [item.data for item in batch])
+        latency = (time.time() - start) / len(batch)
+        logger.debug(f"Batch Infer:: {device} => Batch Size: {len(batch)}; Latency (per input): {latency:.4f}")
+
+        for item, data in zip(batch, outputs):
+            item.data = data
+            item.latency_infer = latency
+        return batch
+
+    def _run_batch(self, device: str, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        outputs: List[Dict[str, Any]] = []
+        while len(outputs) < len(batch):
+            size = self._batch_limits.get(device, self.batch_size)
+            chunk = batch[len(outputs) : len(outputs) + size]
+            try:
+                outputs.extend(self.task.run_inferer_batch(chunk, device=device))
+                continue
+            except RuntimeError as e:
+                if len(chunk) == 1 or "out of memory" not in str(e):
+                    raise
+
+            # retry (outside of the except block so that the memory of the failed pass can be released)
+            self._batch_limits[device] = len(chunk) // 2
+            logger.warning(f"Batch Infer:: {device} => OOM; reducing batch size to {len(chunk) // 2}")
+            if device.startswith("cuda"):
+                torch.cuda.empty_cache()
+        return outputs
+
+    def _post(self, item: _Item) -> Tuple[int, Any]:
+        handle_torch_linalg_multithread(item.request)
+        res = self.task.finish(item.data, item.pre_transforms, item.begin, item.latency_pre, item.latency_infer)
+        item.data = {}
+        return item.idx, res
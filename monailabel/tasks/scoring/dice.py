@@ -26,16 +26,19 @@ class Dice(ScoringMethod):
     Compute dice between final vs original tags
     """
 
-    def __init__(self):
+    def __init__(self, info_batch_size=100):
         super().__init__("Compute Dice for predicated label vs submitted")
+        self.info_batch_size = info_batch_size
 
     def __call__(self, request, datastore: Datastore):
         loader = LoadImage(image_only=True)
 
         tag_y = request.get("y", DefaultLabelTag.FINAL)
         tag_y_pred = request.get("y_pred", DefaultLabelTag.ORIGINAL)
+        info_batch_size = max(1, request.get("info_batch_size", self.info_batch_size))
 
         result = {}
+        infos = {}
         for image_id in datastore.list_images():
             y_i = datastore.get_label_by_image_id(image_id, tag_y) if tag_y else None
             y_pred_i = datastore.get_label_by_image_id(image_id, tag_y_pred) if tag_y_pred else None
@@ -54,6 +57,13 @@ class Dice(ScoringMethod):
                 dice = 2.0 * np.sum(y * y_pred) / union if union != 0 else 1
 
                 logger.info(f"Dice Score for {image_id} is {dice}")
-                datastore.update_image_info(image_id, {"dice": dice})
+                infos[image_id] = {"dice": dice}
                 result[image_id] = dice
+
+                if len(infos) >= info_batch_size:
+                    datastore.update_image_info_many(infos)
+                    infos.clear()
+
+        if infos:
+            datastore.update_image_info_many(infos)
         return result
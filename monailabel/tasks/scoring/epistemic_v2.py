@@ -9,28 +9,80 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import logging
 import multiprocessing
 import os
 import time
 from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 import numpy as np
 import torch
-from monai.metrics.active_learning_metrics import VarianceMetric
 
 from monailabel.interfaces.datastore import Datastore
 from monailabel.interfaces.tasks.scoring import ScoringMethod
 from monailabel.tasks.infer.basic_infer import BasicInferTask
+from monailabel.tasks.infer.network_cache import network_cache
+from monailabel.utils.async_tasks import progress
 
 logger = logging.getLogger(__name__)
 
 
+class RunningStats:
+    """
+    Streaming (Welford/Chan) mean and M2 across simulations;  simulations are merged one (batch) at a time,
+    so memory stays constant irrespective of number of simulations.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold
+        self.count = 0
+        self.mean: Optional[torch.Tensor] = None
+        self.m2: Optional[torch.Tensor] = None
+
+    def update(self, batch: torch.Tensor) -> None:
+        """
+        Merge batch of simulations (N x C x ...);  the batch is modified in-place
+        """
+        batch = batch.float()
+        if self.threshold is not None:
+            batch.masked_fill_(batch <= 0, self.threshold)
+
+        n = batch.shape[0]
+        b_mean = batch.mean(dim=0)
+        b_m2 = batch.sub_(b_mean).square_().sum(dim=0)
+
+        if self.mean is None or self.m2 is None:
+            self.count, self.mean, self.m2 = n, b_mean, b_m2
+            return
+
+        total = self.count + n
+        delta = b_mean.sub_(self.mean)
+        self.mean.add_(delta, alpha=n / total)
+        self.m2.add_(b_m2).add_(delta.square_(), alpha=self.count * n / total)
+        self.count = total
+
+    def variance(self) -> torch.Tensor:
+        if self.m2 is None:
+            raise ValueError("No simulations to compute the variance")
+        return self.m2.div(self.count)
+
+
+def nanmean(x: torch.Tensor) -> float:
+    # mean ignoring nans (same as torch.nanmean which needs torch >= 1.10)
+    valid = x[~torch.isnan(x)]
+    return float(valid.mean()) if valid.numel() else float("nan")
+
+
 class EpistemicScoring(ScoringMethod):
     """
     First version of Epistemic computation used as active learning strategy
     """
 
+    ENTROPY_THRESHOLD = 0.00005
+    VARIANCE_THRESHOLD = 0.0005
+
     def __init__(
         self,
         infer_task: BasicInferTask,
@@ -39,7 +91,23 @@ class EpistemicScoring(ScoringMethod):
         use_variance=False,
         key_output_entropy="epistemic_entropy",
         key_output_ts="epistemic_ts",
+        info_batch_size=100,
+        batched=False,
+        mc_batch_size=0,
     ):
+        """
+        :param infer_task: infer task (in train mode; i.e. with dropouts enabled) to run the simulations
+        :param max_samples: max number of unlabeled images to be scored (0 => all)
+        :param simulation_size: number of (dropout) simulations per image
+        :param use_variance: use variance instead of entropy as score
+        :param key_output_entropy: key to store the score in image info
+        :param key_output_ts: key to store the model timestamp in image info
+        :param info_batch_size: number of image infos to be written into datastore at once
+        :param batched: pre-process each image once and run all simulations as batched forward pass(es) over the
+            network output (probabilities); otherwise run complete infer task for every simulation
+        :param mc_batch_size: max simulations per forward pass in batched mode (0 => all at once);
+            it is halved automatically on running out of GPU memory
+        """
         super().__init__(f"Compute initial score based on dropout - {infer_task.description}")
         self.infer_task = infer_task
         self.dimension = infer_task.dimension
@@ -49,54 +117,9 @@ class EpistemicScoring(ScoringMethod):
         self.use_variance = use_variance
         self.key_output_entropy = key_output_entropy
         self.key_output_ts = key_output_ts
-
-    def entropy_volume(self, vol_input):
-        # The input is assumed with repetitions, channels and then volumetric data
-        vol_input = vol_input.cpu().detach().numpy() if isinstance(vol_input, torch.Tensor) else vol_input
-        vol_input = vol_input.astype(dtype="float32")
-        dims = vol_input.shape
-        reps = dims[0]
-        entropy = np.zeros(dims[2:], dtype="float32")
-
-        # Threshold values less than or equal to zero
-        threshold = 0.00005
-        vol_input[vol_input <= 0] = threshold
-
-        # Looping across channels as each channel is a class
-        if len(dims) == 5 if self.dimension == 3 else 4:
-            for channel in range(dims[1]):
-                t_vol = np.squeeze(
-                    vol_input[:, channel, :, :, :] if self.dimension == 3 else vol_input[:, channel, :, :]
-                )
-                t_sum = np.sum(t_vol, axis=0)
-                t_avg = np.divide(t_sum, reps)
-                t_log = np.log(t_avg)
-                t_entropy = -np.multiply(t_avg, t_log)
-                entropy = entropy + t_entropy
-        else:
-            t_vol = np.squeeze(vol_input)
-            t_sum = np.sum(t_vol, axis=0)
-            t_avg = np.divide(t_sum, reps)
-            t_log = np.log(t_avg)
-            t_entropy = -np.multiply(t_avg, t_log)
-            entropy = entropy + t_entropy
-
-        # Returns a 3D volume of entropy
-        return entropy
-
-    def variance_volume(self, vol_input, ignore_nans=True):
-        if ignore_nans:
-            vol_input[vol_input <= 0] = 0.0005
-            vari = np.nanvar(vol_input.cpu().detach().numpy(), axis=0)  # torch.var vs np.nanvar (ignore_nans)
-            variance = np.sum(vari, axis=0)
-        else:
-            variance_metric = VarianceMetric(threshold=0.0005, spatial_map=True, scalar_reduction="sum")
-            variance = variance_metric(vol_input)
-
-        if self.dimension == 3:
-            variance = np.expand_dims(variance, axis=0)
-            variance = np.expand_dims(variance, axis=0)
-        return variance
+        self.info_batch_size = info_batch_size
+        self.batched = batched
+        self.mc_batch_size = mc_batch_size
 
     def __call__(self, request, datastore: Datastore):
         logger.info("Starting Epistemic Uncertainty scoring")
@@ -134,21 +157,48 @@ class EpistemicScoring(ScoringMethod):
             list(range(torch.cuda.device_count())) if not multi_gpus or multi_gpus == "all" else multi_gpus.split(",")
         )
         device_ids = [f"cuda:{id}" for id in gpus] if multi_gpu else [request.get("device", "cuda")]
+        batched = request.get("batched", self.batched)
+        mc_batch_size = request.get("mc_batch_size", self.mc_batch_size)
+
+        def score(idx, image_id):
+            progress.wait_if_paused()
+            device = device_ids[idx % len(device_ids)] if multi_gpu and device_ids else request.get("device")
+            if batched:
+                return self.run_scoring_batched(image_id, simulation_size, model_ts, datastore, device, mc_batch_size)
+            return self.run_scoring(image_id, simulation_size, model_ts, datastore, device)
 
         max_workers = max_workers if max_workers else max(1, multiprocessing.cpu_count() // 2)
         max_workers = min(max_workers, multiprocessing.cpu_count())
 
-        if len(image_ids) > 1 and (max_workers == 0 or max_workers > 1):
-            logger.info(f"MultiGpu: {multi_gpu}; Using Device(s): {device_ids}; Max Workers: {max_workers}")
-            futures = []
-            with ThreadPoolExecutor(max_workers if max_workers else None, "ScoreInfer") as e:
-                for image_id in image_ids:
-                    futures.append(e.submit(self.run_scoring, image_id, simulation_size, model_ts, datastore))
-                for future in futures:
-                    future.result()
-        else:
-            for image_id in image_ids:
-                self.run_scoring(image_id, simulation_size, model_ts, datastore)
+        # Flush scores into datastore in batches (instead of one datastore update per image)
+        info_batch_size = max(1, request.get("info_batch_size", self.info_batch_size))
+        infos = {}
+        scored = []
+
+        def add_info(image_id, info):
+            scored.append(image_id)
+            progress.emit("scoring", done=len(scored), total=len(image_ids), name="epistemic")
+            infos[image_id] = info
+            if len(infos) >= info_batch_size:
+                datastore.update_image_info_many(infos)
+                infos.clear()
+
+        try:
+            if len(image_ids) > 1 and (max_workers == 0 or max_workers > 1):
+                logger.info(f"MultiGpu: {multi_gpu}; Using Device(s): {device_ids}; Max Workers: {max_workers}")
+                futures = []
+                with ThreadPoolExecutor(max_workers if max_workers else None, "ScoreInfer") as e:
+                    for idx, image_id in enumerate(image_ids):
+                        futures.append(e.submit(score, idx, image_id))
+                    for image_id, future in zip(image_ids, futures):
+                        add_info(image_id, future.result())
+            else:
+                for idx, image_id in enumerate(image_ids):
+                    add_info(image_id, score(idx, image_id))
+        finally:
+            # scores of the images completed so far are kept even if scoring of some other image fails
+            if infos:
+                datastore.update_image_info_many(infos)
 
         summary = {
             "total": len(unlabeled_images),
@@ -161,37 +211,105 @@ class EpistemicScoring(ScoringMethod):
         self.infer_task.clear_cache()
         return summary
 
-    def run_scoring(self, image_id, simulation_size, model_ts, datastore):
+    def run_scoring(self, image_id, simulation_size, model_ts, datastore, device=None):
         start = time.time()
         request = {
             "image": datastore.get_image_uri(image_id),
             "logging": "error",
             "cache_transforms": False,
         }
+        if device:
+            request["device"] = device
 
-        accum_unl_outputs = []
+        stats = RunningStats(threshold=self.VARIANCE_THRESHOLD if self.use_variance else self.ENTROPY_THRESHOLD)
         for i in range(simulation_size):
             data = self.infer_task(request=request)
             pred = data[self.infer_task.output_label_key] if isinstance(data, dict) else None
             if pred is not None:
                 logger.debug(f"EPISTEMIC:: {image_id} => {i} => pred: {pred.shape}; sum: {np.sum(pred)}")
-                accum_unl_outputs.append(pred)
+
+                # Pred Expected shape for 2D images is (C, H, W) for 3D (C, H, W, D)
+                # To handle cases where only a single class of segmentation is present, an extra dimension is added
+                pred = torch.squeeze(torch.as_tensor(pred))
+                pred = torch.unsqueeze(pred, dim=0) if len(pred.shape) == self.dimension else pred
+                stats.update(pred[None])
             else:
                 logger.info(f"EPISTEMIC:: {image_id} => {i} => pred: None")
 
-        accum = torch.stack(accum_unl_outputs)
-        accum = torch.squeeze(accum)
+        entropy = self.score(stats)
+        return self._score_info(image_id, simulation_size, entropy, model_ts, start)
+
+    def run_scoring_batched(self, image_id, simulation_size, model_ts, datastore, device=None, mc_batch_size=0):
+        start = time.time()
+        task = self.infer_task
+
+        data = copy.deepcopy(task.config())
+        data.update({"image": datastore.get_image_uri(image_id), "logging": "error", "cache_transforms": False})
+        data["image_path"] = data["image"]
+
+        device = device if device else data.get("device", "cuda")
+        device = device if isinstance(device, str) else device[0]
+        if device.startswith("cuda") and not torch.cuda.is_available():
+            device = "cpu"
+        data["device"] = device
+
+        stats = RunningStats(threshold=self.VARIANCE_THRESHOLD if self.use_variance else self.ENTROPY_THRESHOLD)
+        with network_cache().busy(task):
+            data = task.run_pre_transforms(data, task.pre_transforms(data))
+            network = task._get_network(device)
+            inferer = task.inferer(data)
+
+            inputs = data[task.input_key]
+            inputs = inputs if torch.is_tensor(inputs) else torch.from_numpy(inputs)
+            inputs = inputs[None].to(torch.device(device))
+
+            batch_size = mc_batch_size if mc_batch_size > 0 else simulation_size
+            remaining = simulation_size
+            while remaining > 0:
+                n = min(batch_size, remaining)
+                try:
+                    with torch.no_grad():
+                        outputs = inferer(inputs.expand(n, *inputs.shape[1:]), network)
+                except RuntimeError as e:
+                    if n == 1 or "out of memory" not in str(e):
+                        raise
+                    batch_size = n // 2
+                    logger.warning(f"EPISTEMIC:: {image_id} => OOM; reducing simulations per pass to {batch_size}")
+                    torch.cuda.empty_cache()
+                    continue
+
+                stats.update(self.probabilities(outputs))
+                del outputs
+                remaining -= n
+
+        entropy = self.score(stats)
+        if device.startswith("cuda"):
+            torch.cuda.empty_cache()
+        return self._score_info(image_id, simulation_size, entropy, model_ts, start)
+
+    def probabilities(self, outputs):
+        # network output (logits) => class probabilities; (N, C, ...)
+        outputs = outputs.float()
+        return torch.softmax(outputs, dim=1) if outputs.shape[1] > 1 else torch.sigmoid(outputs)
+
+    def score(self, stats: "RunningStats") -> float:
+        if not stats.count:
+            return float("nan")
+        return self.variance_tensor(stats) if self.use_variance else self.entropy_tensor(stats)
 
-        # Accum Expected shape for 2D images is (N, C, H, W) for 3D (N, C, H, W, D)
-        # To handle cases where only a single class of segmentation is present, an extra dimension is added
-        if self.dimension == 2 and len(accum.shape) == 3:
-            accum = torch.unsqueeze(accum, dim=1)
-        elif self.dimension == 3 and len(accum.shape) == 4:
-            accum = torch.unsqueeze(accum, dim=1)
+    def entropy_tensor(self, stats: "RunningStats") -> float:
+        # entropy of mean probability across simulations; summed across channels (classes)
+        mean = stats.mean
+        if mean is None:
+            return float("nan")
+        entropy = torch.log(mean).mul_(mean).sum(dim=0).neg_()
+        return nanmean(entropy)
 
-        entropy = self.variance_volume(accum) if self.use_variance else self.entropy_volume(accum)
-        entropy = float(np.nanmean(entropy))
+    def variance_tensor(self, stats: "RunningStats") -> float:
+        variance = stats.variance().sum(dim=0)
+        return nanmean(variance)
 
+    def _score_info(self, image_id, simulation_size, entropy, model_ts, start):
         latency = time.time() - start
         logger.info(
             "EPISTEMIC:: {} => iters: {}; entropy: {}; latency: {};".format(
@@ -202,6 +320,5 @@ class EpistemicScoring(ScoringMethod):
             )
         )
 
-        # Add epistemic_entropy in datastore
-        info = {self.key_output_entropy: entropy, self.key_output_ts: model_ts}
-        datastore.update_image_info(image_id, info)
+        # epistemic_entropy to be added in datastore
+        return {self.key_output_entropy: entropy, self.key_output_ts: model_ts}
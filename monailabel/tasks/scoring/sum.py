@@ -10,6 +10,7 @@
 # limitations under the License.
 
 import logging
+from typing import Any, Dict
 
 import numpy as np
 import torch
@@ -26,13 +27,17 @@ class Sum(ScoringMethod):
     Consider implementing simple np sum method of label tags; Also add valid slices that have label mask
     """
 
-    def __init__(self, tags=(DefaultLabelTag.FINAL.value, DefaultLabelTag.ORIGINAL.value)):
+    def __init__(self, tags=(DefaultLabelTag.FINAL.value, DefaultLabelTag.ORIGINAL.value), info_batch_size=100):
         super().__init__("Compute Numpy Sum for Final/Original Labels")
         self.tags = tags
+        self.info_batch_size = info_batch_size
 
     def __call__(self, request, datastore: Datastore):
         loader = LoadImage(image_only=True)
+        info_batch_size = max(1, request.get("info_batch_size", self.info_batch_size))
+
         result = {}
+        infos: Dict[str, Dict[str, Any]] = {tag: {} for tag in self.tags}
         for image_id in datastore.list_images():
             for tag in self.tags:
                 label_id: str = datastore.get_label_by_image_id(image_id, tag)
@@ -44,6 +49,14 @@ class Sum(ScoringMethod):
                     info = {"sum": int(np.sum(label)), "slices": len(slices)}
                     logger.debug(f"{label_id} => {info}")
 
-                    datastore.update_label_info(label_id, tag, info)
+                    infos[tag][label_id] = info
                     result[label_id] = info
+
+                    if len(infos[tag]) >= info_batch_size:
+                        datastore.update_label_info_many(tag, infos[tag])
+                        infos[tag].clear()
+
+        for tag, tag_infos in infos.items():
+            if tag_infos:
+                datastore.update_label_info_many(tag, tag_infos)
         return result
@@ -55,7 +55,7 @@ from monai.transforms import Compose
 from monailabel.config import settings
 from monailabel.interfaces.datastore import Datastore
 from monailabel.interfaces.tasks.train import TrainTask
-from monailabel.tasks.train.handler import PublishStatsAndModel, prepare_stats
+from monailabel.tasks.train.handler import ProgressHandler, PublishStatsAndModel, prepare_stats
 from monailabel.utils.others.generic import path_to_uri, remove_file
 
 logger = logging.getLogger(__name__)
@@ -578,6 +578,7 @@ class BasicTrainTask(TrainTask):
                 context.evaluator.add_event_handler(event_name=Events.EPOCH_COMPLETED, handler=publisher)
             else:
                 context.trainer.add_event_handler(event_name=Events.EPOCH_COMPLETED, handler=publisher)
+            ProgressHandler(evaluator=context.evaluator).attach(context.trainer)
 
         early_stop_patience = int(context.request.get("early_stop_patience", 0))
         if early_stop_patience > 0 and context.evaluator:
@@ -21,6 +21,8 @@ from typing import Any, Dict
 import torch
 from monai.engines.workflow import Engine, Events
 
+from monailabel.utils.async_tasks import progress
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,3 +94,69 @@ class PublishStatsAndModel:
 
     def __call__(self, engine: Engine) -> None:
         self.iteration_completed()
+
+
+class ProgressHandler:
+    """
+    Emit training progress (epoch/iteration, loss, images/sec, key metric) as structured task events;
+    see :py:func:`monailabel.utils.async_tasks.progress.emit`
+
+    :param interval: min interval (secs) between two iteration events
+    :param evaluator: evaluator (if any) to report the key (validation) metric at the end of each epoch
+    """
+
+    def __init__(self, interval: float = 1.0, evaluator=None):
+        self.interval = interval
+        self.evaluator = evaluator
+        self._ts = 0.0
+        self._images = 0
+
+    @staticmethod
+    def _batch_size(batch) -> int:
+        if isinstance(batch, dict):
+            v = next((v for v in batch.values() if torch.is_tensor(v)), None)
+            return int(v.shape[0]) if v is not None and v.ndim else 1
+        return len(batch) if isinstance(batch, (list, tuple)) else 1
+
+    def _emit(self, engine: Engine, **kwargs):
+        state = engine.state
+        epoch_length = state.epoch_length if state.epoch_length else 0
+        output = state.output
+        if isinstance(output, (list, tuple)) and output:
+            output = output[0]
+        loss = output.get("loss") if isinstance(output, dict) else None
+        loss = float(loss.item() if torch.is_tensor(loss) else loss) if loss is not None else None
+
+        progress.emit(
+            "train",
+            done=state.iteration,
+            total=state.max_epochs * epoch_length if state.max_epochs and epoch_length else None,
+            epoch=state.epoch,
+            max_epochs=state.max_epochs,
+            iteration=(state.iteration - 1) % epoch_length + 1 if epoch_length else state.iteration,
+            epoch_length=epoch_length,
+            loss=loss,
+            **kwargs,
+        )
+
+    def iteration_completed(self, engine: Engine) -> None:
+        self._images += self._batch_size(engine.state.batch)
+        now = time.time()
+        if not self._ts:
+            self._ts = now
+        elif now - self._ts >= self.interval:
+            self._emit(engine, images_per_sec=round(self._images / (now - self._ts), 3))
+            self._ts, self._images = now, 0
+
+    def epoch_completed(self, engine: Engine) -> None:
+        metric = {}
+        if self.evaluator and self.evaluator.state.key_metric_name:
+            metric = {
+                "key_metric_name": self.evaluator.state.key_metric_name,
+                "best_metric": float(self.evaluator.state.best_metric),
+            }
+        self._emit(engine, **metric)
+
+    def attach(self, engine: Engine) -> None:
+        engine.add_event_handler(Events.ITERATION_COMPLETED, self.iteration_completed)
+        engine.add_event_handler(Events.EPOCH_COMPLETED, self.epoch_completed)
@@ -11,40 +11,397 @@
 
 import copy
 import hashlib
+import inspect
 import logging
 import os
 import pathlib
-from typing import Hashable, Sequence, Tuple, Union
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import torch
-from expiring_dict import ExpiringDict
 from monai.config import KeysCollection
 from monai.data import MetaTensor
 from monai.transforms import Transform
 from monai.utils import ensure_tuple
 
-from monailabel.utils.sessions import Sessions
+from monailabel.config import settings
 
 logger = logging.getLogger(__name__)
 
-_cache_path = None
-_data_mem_cache = None
-_data_file_cache = None
+MB = 1024 * 1024
 
+_torch_load_args = inspect.signature(torch.load).parameters
+_TORCH_LOAD_KWARGS = {k: v for k, v in (("weights_only", False), ("mmap", True)) if k in _torch_load_args}
 
-def init_cache():
-    global _cache_path
-    global _data_mem_cache
-    global _data_file_cache
-    if not _cache_path:
-        _cache_path = os.path.join(pathlib.Path.home(), ".cache", "monailabel", "cacheT")
-        _data_mem_cache = ExpiringDict(ttl=600)
-        _data_file_cache = Sessions(store_path=_cache_path, expiry=600)
 
-    _data_file_cache.remove_expired()
+def nbytes(obj) -> int:
+    """
+    Approximate memory (in bytes) occupied by the (cached) object
+    """
+    if torch.is_tensor(obj):
+        return obj.element_size() * obj.nelement()
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _versions(obj, versions: Optional[list] = None) -> list:
+    # in-place modification of a tensor (or any of its views) bumps the version counter of its storage
+    versions = [] if versions is None else versions
+    if torch.is_tensor(obj):
+        versions.append(obj._version)
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _versions(v, versions)
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            _versions(v, versions)
+    return versions
+
+
+def _snapshot(obj):
+    # tensors are kept as is (no copy);  everything else (meta, numpy etc...) is copied
+    if isinstance(obj, MetaTensor):
+        return _view(obj)
+    if torch.is_tensor(obj):
+        return obj.detach()
+    if isinstance(obj, dict):
+        return {k: _snapshot(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_snapshot(v) for v in obj)
+    return copy.deepcopy(obj)
+
+
+def _view(obj):
+    """
+    Copy-on-write view of the cached object;  tensors share the storage with the cached ones (no copy) while the
+    meta information is copied.  Any in-place modification on the view invalidates the cache entry.
+    """
+    if isinstance(obj, MetaTensor):
+        return MetaTensor(
+            obj.as_tensor(),
+            meta=copy.deepcopy(obj.meta),
+            applied_operations=copy.deepcopy(obj.applied_operations),
+        )
+    if torch.is_tensor(obj):
+        return obj.detach()
+    if isinstance(obj, dict):
+        return {k: _view(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_view(v) for v in obj)
+    return copy.deepcopy(obj)
+
+
+def content_fingerprint(value) -> str:
+    """
+    Fingerprint of the hash value;  for local files/dirs it includes the modified time and size (content changes)
+    """
+    if isinstance(value, str) and os.path.exists(value):
+        st = os.stat(value)
+        return f"{os.path.realpath(value)}:{st.st_mtime_ns}:{st.st_size}"
+    return str(value)
+
+
+def _is_primitive(v, depth=0) -> bool:
+    if v is None or isinstance(v, (str, int, float, bool)):
+        return True
+    if isinstance(v, (list, tuple)) and depth < 2:
+        return all(_is_primitive(i, depth + 1) for i in v)
+    return False
+
+
+def _describe(t, depth=0) -> str:
+    attrs = {}
+    for k, v in sorted(vars(t).items()) if hasattr(t, "__dict__") else []:
+        if _is_primitive(v):
+            attrs[k] = v
+        elif depth < 1 and hasattr(v, "__dict__") and type(v).__module__.startswith("monai"):
+            attrs[k] = _describe(v, depth + 1)
+    return f"{type(t).__module__}.{type(t).__qualname__}{attrs}"
+
+
+def transform_fingerprint(transforms: Sequence[Any]) -> str:
+    """
+    Fingerprint of the transform chain (class names and their simple attributes) which produces the cached data
+    """
+    return hashlib.md5("|".join(_describe(t) for t in transforms).encode("utf-8")).hexdigest()
+
+
+class TransformCache:
+    """
+    Cache for the outputs of (pre) transforms.
+
+    In-memory tier is a LRU bounded by `memory` budget (bytes);  on-disk tier stores each entry as a separate
+    file under `path` (written atomically and loaded with mmap) so that multiple server workers can share it.
+    On-disk tier is bounded by `disk` budget (bytes) where the least recently accessed files are removed first.
+    A budget of 0 means unlimited.
+
+    Tensors are never copied in-memory;  hits return copy-on-write views (see :py:func:`_view`) and the version
+    counters of the cached tensors are verified on every hit.  If the tensors were modified in-place (by the
+    request which added them or by any consumer of a view) the entry is dropped and treated as miss.  Consumers
+    which need to modify the tensors in-place must clone them first;  otherwise a concurrent reader of the same entry
+    can observe the modification before it is detected.
+    """
+
+    def __init__(self, path: str, memory: int = 0, disk: int = 0, shared: bool = False):
+        self.path = path
+        self.memory = memory
+        self.disk = disk
+        self.shared = shared
+
+        self._lock = threading.RLock()
+        # (obj, size, expiry, versions, ttl)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float, list, int]]" = OrderedDict()
+        self._used = 0
+        self._last_cleanup = 0.0
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "puts": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "invalidations": 0,
+        }
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.pt")
+
+    def _pop(self, key: str):
+        e = self._entries.pop(key, None)
+        if e is not None:
+            self._used -= e[1]
+        return e
+
+    def get(self, key: str, in_memory: bool = True, ttl: int = 0) -> Optional[Any]:
+        """
+        Get cached object (None in case of miss/expired)
+
+        :param key: cache key
+        :param in_memory: lookup in-memory tier; (shared) disk tier is also checked when in_memory is False
+            or in case `shared` is enabled
+        :param ttl: max time (in seconds) since the entry was last accessed on disk
+        """
+        if in_memory:
+            with self._lock:
+                e = self._entries.get(key)
+                if e is not None and e[2] >= time.time():
+                    if _versions(e[0]) == e[3]:
+                        if e[4] > 0:
+                            self._entries[key] = (e[0], e[1], time.time() + e[4], e[3], e[4])  # since last access
+                        self._entries.move_to_end(key)
+                        self._stats["hits"] += 1
+                        return _view(e[0])
+
+                    logger.info(f"Cached object {key} was modified in-place; invalidate")
+                    self._stats["invalidations"] += 1
+                if e is not None:
+                    self._pop(key)
+
+        if not in_memory or self.shared:
+            obj = self._load_file(key, ttl)
+            if obj is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    if in_memory:
+                        self._put_memory(key, obj, ttl)
+                return _view(obj) if in_memory else obj
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key: str, obj: Any, in_memory: bool = True, ttl: int = 600) -> None:
+        """
+        Add object into cache
+
+        :param key: cache key
+        :param obj: object to be cached;  tensors are not copied (any in-place modification invalidates the entry)
+        :param in_memory: add into in-memory tier; otherwise (or when `shared` is enabled) it is saved on disk
+        :param ttl: time (in seconds) after which the entry expires (since last access)
+        """
+        with self._lock:
+            self._stats["puts"] += 1
+            if in_memory:
+                self._put_memory(key, obj, ttl)
+
+        if not in_memory or self.shared:
+            self._save_file(key, obj)
+
+    def _put_memory(self, key: str, obj: Any, ttl: int) -> None:
+        self._pop(key)
+        size = nbytes(obj)
+        if self.memory and size > self.memory:
+            logger.info(f"Skip caching {key} in memory; size: {size // MB} MB > budget: {self.memory // MB} MB")
+            return
+
+        while self.memory and self._entries and self._used + size > self.memory:
+            k, _ = next(iter(self._entries.items()))
+            self._pop(k)
+            self._stats["evictions"] += 1
+
+        obj = _snapshot(obj)
+        self._entries[key] = (obj, size, time.time() + ttl if ttl > 0 else float("inf"), _versions(obj), ttl)
+        self._used += size
+
+    @property
+    def used(self) -> int:
+        """
+        Memory (in bytes) used by in-memory entries
+        """
+        return self._used
+
+    def evict(self, size: int) -> int:
+        """
+        Evict least recently used in-memory entries to free (at least) `size` bytes
+
+        :return: number of bytes freed
+        """
+        freed = 0
+        with self._lock:
+            while self._entries and freed < size:
+                k, _ = next(iter(self._entries.items()))
+                freed += self._pop(k)[1]
+                self._stats["evictions"] += 1
+        return freed
+
+    def _load_file(self, key: str, ttl: int) -> Optional[Any]:
+        f = self._file(key)
+        try:
+            if ttl > 0 and os.path.getmtime(f) + ttl < time.time():
+                logger.info(f"Removing expired cache file: {f}")
+                os.remove(f)
+                return None
+
+            obj = torch.load(f, map_location="cpu", **_TORCH_LOAD_KWARGS)
+            os.utime(f)  # mark as recently accessed
+            return obj
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to load cache file: {f}; {e}")
+            return None
+
+    def _save_file(self, key: str, obj: Any) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        f = self._file(key)
+        tmp = f"{f}.{uuid.uuid4().hex}.tmp"
+        try:
+            torch.save(obj, tmp)
+            os.replace(tmp, f)  # atomic; readers in other processes never see partial file
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        if self.disk:
+            self._cleanup_disk()
+
+    def _disk_files(self):
+        files = []
+        for name in os.listdir(self.path) if os.path.isdir(self.path) else []:
+            if not name.endswith(".pt"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, name))
+                files.append((st.st_mtime, st.st_size, os.path.join(self.path, name)))
+            except FileNotFoundError:
+                pass  # removed by other process
+        return sorted(files)
+
+    def _cleanup_disk(self) -> None:
+        files = self._disk_files()
+        used = sum(f[1] for f in files)
+        for _, size, f in files:
+            if used <= self.disk:
+                break
+            try:
+                os.remove(f)
+                with self._lock:
+                    self._stats["disk_evictions"] += 1
+            except FileNotFoundError:
+                pass
+            used -= size
+
+    def remove_expired(self, ttl: int = 600, interval: int = 60) -> None:
+        """
+        Remove expired entries (at most once every `interval` seconds)
+        """
+        current_ts = time.time()
+        with self._lock:
+            if current_ts - self._last_cleanup < interval:
+                return
+            self._last_cleanup = current_ts
+
+            for key in [k for k, e in self._entries.items() if e[2] < current_ts]:
+                self._pop(key)
+
+        for ts, _, f in self._disk_files():
+            if ttl > 0 and ts + ttl < current_ts:
+                try:
+                    os.remove(f)
+                except FileNotFoundError:
+                    pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget": {"memory": self.memory // MB, "disk": self.disk // MB},
+                "used": {"memory": round(self._used / MB, 2)},
+                "items": len(self._entries),
+                "shared": self.shared,
+                **self._stats,
+            }
+
+
+_transform_cache: Optional[TransformCache] = None
+_transform_cache_lock = threading.Lock()
+
+
+def transform_cache() -> TransformCache:
+    """
+    Process-wide instance of :py:class:`TransformCache` configured from settings
+    """
+    global _transform_cache
+    with _transform_cache_lock:
+        if _transform_cache is None:
+            path = settings.MONAI_LABEL_TRANSFORM_CACHE_PATH
+            _transform_cache = TransformCache(
+                path=path if path else os.path.join(pathlib.Path.home(), ".cache", "monailabel", "cacheT"),
+                memory=settings.MONAI_LABEL_TRANSFORM_CACHE_MEMORY * MB,
+                disk=settings.MONAI_LABEL_TRANSFORM_CACHE_DISK * MB,
+                shared=settings.MONAI_LABEL_TRANSFORM_CACHE_SHARED,
+            )
+        return _transform_cache
+
+
+def init_cache(ttl: int = 600):
+    transform_cache().remove_expired(ttl)
 
 
 class CacheTransformDatad(Transform):
+    """
+    Cache (or load from cache) the output of the transforms run so far.
+
+    Cache key is computed from the content of `hash_key` values (e.g. image path + its modified time and size)
+    and the `fingerprint` of the transform chain which produced the data.
+    Entries are kept in the process-wide :py:func:`transform_cache` unless a specific `cache` is provided
+    (e.g. :py:func:`monailabel.utils.sessions.session_cache`).
+    """
+
     def __init__(
         self,
         keys: KeysCollection,
@@ -52,22 +409,37 @@ class CacheTransformDatad(Transform):
         in_memory: bool = True,
         ttl: int = 600,
         reset_applied_operations_id: bool = True,
+        fingerprint: str = "",
+        cache: Optional[TransformCache] = None,
     ):
         self.keys: Tuple[Hashable, ...] = ensure_tuple(keys)
         self.hash_key = [hash_key] if isinstance(hash_key, str) else hash_key
         self.in_memory = in_memory
         self.ttl = ttl
         self.reset_applied_operations_id = reset_applied_operations_id
+        self.fingerprint = fingerprint
+        self.cache = cache
 
         # remove previous expired...
-        init_cache()
+        init_cache(ttl)
 
     def __call__(self, data):
         return self.save(data)
 
+    def _hash_key_prefix(self, d) -> Optional[str]:
+        hash_keys = [d[k] for k in self.hash_key if d.get(k)]
+        if len(hash_keys) != len(self.hash_key):
+            logger.warning(f"Ignore caching; Missing hash keys;  Found: {hash_keys}; Expected: {self.hash_key}")
+            return None
+
+        content = "|".join([content_fingerprint(v) for v in hash_keys] + [self.fingerprint])
+        return hashlib.md5(content.encode("utf-8")).hexdigest()
+
     def load(self, data):
         d = dict(data)
-        hash_key_prefix = hashlib.md5("".join([d[k] for k in self.hash_key]).encode("utf-8")).hexdigest()
+        hash_key_prefix = self._hash_key_prefix(d)
+        if hash_key_prefix is None:
+            return None
 
         # full dictionary
         if not self.keys:
@@ -88,11 +460,8 @@ class CacheTransformDatad(Transform):
 
     def save(self, data):
         d = dict(data)
-
-        hash_keys = [d[k] for k in self.hash_key if d.get(k)]
-        hash_key_prefix = hashlib.md5("".join(hash_keys).encode("utf-8")).hexdigest()
-        if len(hash_keys) != len(self.hash_key):
-            logger.warning(f"Ignore caching; Missing hash keys;  Found: {hash_keys}; Expected: {self.hash_key}")
+        hash_key_prefix = self._hash_key_prefix(d)
+        if hash_key_prefix is None:
             return d
 
         # full dictionary
@@ -103,21 +472,11 @@ class CacheTransformDatad(Transform):
                 self._save(f"{hash_key_prefix}_{key}", d[key])
         return d
 
-    def _load(self, hash_key):
-        if self.in_memory:
-            return _data_mem_cache.get(hash_key)
+    def _cache(self) -> TransformCache:
+        return self.cache if self.cache is not None else transform_cache()
 
-        info = _data_file_cache.get_session(session_id=hash_key)
-        if info and os.path.isfile(info.image):
-            return torch.load(info.image)
-        return None
+    def _load(self, hash_key):
+        return self._cache().get(hash_key, in_memory=self.in_memory, ttl=self.ttl)
 
     def _save(self, hash_key, obj):
-        if self.in_memory:
-            _data_mem_cache.ttl(key=hash_key, value=copy.deepcopy(obj), ttl=self.ttl)
-        else:
-            os.makedirs(_cache_path, exist_ok=True)
-
-            cached_file = os.path.join(_cache_path, f"{hash_key}.tmp")
-            torch.save(obj, cached_file)
-            _data_file_cache.add_session(cached_file, expiry=self.ttl, session_id=hash_key)
+        self._cache().put(hash_key, obj, self.in_memory, self.ttl)
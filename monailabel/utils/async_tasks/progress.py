@@ -0,0 +1,113 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# prefix of (structured) progress events printed on stdout by background tasks
+TASK_EVENT = "__MONAILABEL_EVENT__"
+
+# set (to "true") for background tasks;  events are not emitted otherwise (e.g. when running synchronously)
+TASK_EVENTS_ENV = "MONAI_LABEL_TASK_EVENTS"
+
+# pause flag file of the background task;  the task waits (between its units of work) while the file exists
+TASK_PAUSE_ENV = "MONAI_LABEL_TASK_PAUSE_FILE"
+
+
+def gpu_memory() -> Dict[str, int]:
+    if not torch.cuda.is_available():
+        return {}
+    return {"gpu_memory": torch.cuda.memory_allocated(), "gpu_memory_max": torch.cuda.max_memory_allocated()}
+
+
+def emit(event_type: str, done: Optional[int] = None, total: Optional[int] = None, **kwargs):
+    """
+    Emit progress event of the running background task (e.g. train/scoring/batch infer).
+
+    :param event_type: type of the event (e.g. train, scoring, batch_infer)
+    :param done: number of units (iterations/images) finished so far
+    :param total: total number of units;  progress, throughput and eta are derived from `done`/`total`
+    :param kwargs: other (json serializable) values of the event (e.g. epoch, loss)
+    """
+    if os.environ.get(TASK_EVENTS_ENV, "false").lower() != "true":
+        return
+
+    event = {"type": event_type, "ts": time.time(), **kwargs, **gpu_memory()}
+    if done is not None:
+        event["done"] = done
+    if total is not None:
+        event["total"] = total
+    print(f"{TASK_EVENT} {json.dumps(event)}", flush=True)
+
+
+def wait_if_paused(interval: float = 0.5) -> float:
+    """
+    Wait while the (running) background task is paused by the scheduler (see :py:class:`TaskScheduler`).
+
+    Call it between the units of work (e.g. images) of the task and never while holding a lock;  a no-op when the
+    task is not run in background.
+
+    :return: secs waited
+    """
+    f = os.environ.get(TASK_PAUSE_ENV)
+    if not f or not os.path.exists(f):
+        return 0.0
+
+    logger.info("Task paused (interactive requests in progress)")
+    start = time.time()
+    while os.path.exists(f):
+        time.sleep(interval)
+
+    waited = time.time() - start
+    logger.info(f"Task resumed after {waited:.3f} secs")
+    return waited
+
+
+def parse_event(line: str) -> Optional[Dict[str, Any]]:
+    if not line.startswith(TASK_EVENT):
+        return None
+    try:
+        event = json.loads(line[len(TASK_EVENT) :])
+    except ValueError:
+        event = None
+
+    if not isinstance(event, dict):
+        logger.warning(f"Invalid Task Event: {line}")
+        return None
+    return event
+
+
+def update_progress(task: Dict[str, Any], event: Dict[str, Any], start: float) -> Dict[str, Any]:
+    """
+    Merge the event into `task["progress"]` and compute progress (fraction), throughput and eta (secs)
+    """
+    progress: Dict[str, Any] = task.get("progress", {})
+    progress.update(event)
+    progress["seq"] = progress.get("seq", 0) + 1
+
+    elapsed = max(event.get("ts", time.time()) - start, 1e-6)
+    progress["elapsed"] = round(elapsed, 3)
+
+    done, total = progress.get("done"), progress.get("total")
+    if done is not None and total:
+        progress["progress"] = round(min(done / total, 1.0), 4)
+        progress["throughput"] = round(done / elapsed, 4)
+        progress["eta"] = round(elapsed / done * (total - done), 3) if done else None
+
+    task["progress"] = progress
+    return progress
@@ -0,0 +1,242 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    TRAIN = 1
+    SCORING = 2
+    BATCH = 3
+
+
+METHOD_PRIORITY = {"train": Priority.TRAIN, "scoring": Priority.SCORING, "batch_infer": Priority.BATCH}
+
+
+class _Entry:
+    def __init__(self, task: Dict, method: str, fn: Callable, priority: int, gpus: Sequence[int]):
+        self.task = task
+        self.method = method
+        self.fn = fn
+        self.priority = priority
+        self.gpus = list(gpus)
+
+
+class TaskScheduler:
+    """
+    Central scheduler for background tasks (train, scoring, batch infer).
+
+    - tasks start in the order of their priority (interactive > train > scoring > batch)
+    - at most one task runs per method; and at most `gpu_tasks` tasks share a gpu (0 => unlimited)
+    - queued (not yet started) low priority tasks with the same request are coalesced into one
+    - low priority tasks (scoring, batch) do not start and running ones are paused while there are interactive
+      requests (see :py:meth:`interactive`) and until `idle_time` secs after the last one
+
+    Pausing is cooperative;  the scheduler creates a pause flag file (see :py:meth:`pause_file`) and the task waits
+    between its units of work (e.g. images) while the file exists (see
+    :py:func:`monailabel.utils.async_tasks.progress.wait_if_paused`).  A task is never suspended in the middle of
+    its work;  so it never holds a lock (e.g. of the datastore) which an interactive request could wait for.
+
+    :param gpu_tasks: max number of tasks running on same gpu; 0 => unlimited
+    :param idle_time: secs after last interactive request before low priority tasks are started/resumed;
+        0 => never pause
+    :param pause_dir: directory for the pause flag files of the tasks;  None => tasks are never paused
+    :param interval: interval (secs) to re-evaluate the queue
+    """
+
+    def __init__(
+        self,
+        gpu_tasks: int = 1,
+        idle_time: int = 10,
+        pause_dir: Optional[str] = None,
+        interval: float = 1.0,
+    ):
+        self.gpu_tasks = gpu_tasks
+        self.idle_time = idle_time
+        self.pause_dir = pause_dir
+        self.interval = interval
+        if pause_dir:
+            os.makedirs(pause_dir, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, _Entry]] = []
+        self._seq = itertools.count()
+        self._running: Dict[str, _Entry] = {}
+        self._gpu_usage: Dict[int, int] = {}
+        self._paused: Dict[str, _Entry] = {}
+        self._inflight = 0
+        self._last_active = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, task: Dict, method: str, fn: Callable, priority: Optional[int] = None, gpus=()) -> Dict:
+        """
+        Queue the task; `fn` is called (in a separate thread) to run it.
+
+        :return: the queued task;  an already queued task in case the request is coalesced
+        """
+        priority = METHOD_PRIORITY.get(method, Priority.BATCH) if priority is None else priority
+        with self._cond:
+            if priority >= Priority.SCORING:
+                for _, _, e in self._queue:
+                    if e.method == method and e.task["request"] == task["request"]:
+                        logger.info(f"Coalesce {method} task {task['id']} => {e.task['id']}")
+                        return e.task
+
+            heapq.heappush(self._queue, (priority, next(self._seq), _Entry(task, method, fn, priority, gpus)))
+            self._start_thread()
+            self._cond.notify_all()
+        return task
+
+    def pause_file(self, task_id: str) -> Optional[str]:
+        """
+        Path of the pause flag file of the task (exists while the task should pause);  None if pausing is disabled
+        """
+        return os.path.join(self.pause_dir, f"{task_id}.pause") if self.pause_dir else None
+
+    def cancel(self, method: str) -> List[Dict]:
+        """
+        Remove queued (not yet started) tasks of the method;  running task (if any) is not affected
+        """
+        with self._cond:
+            cancelled = [e.task for _, _, e in self._queue if e.method == method]
+            self._queue = [q for q in self._queue if q[2].method != method]
+            heapq.heapify(self._queue)
+        return cancelled
+
+    @contextmanager
+    def interactive(self):
+        """
+        Mark an interactive (annotator) request;  low priority tasks are paused while it runs
+        """
+        with self._cond:
+            self._inflight += 1
+            self._last_active = time.time()
+            self._update_paused()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._inflight -= 1
+                self._last_active = time.time()
+
+    def busy(self) -> bool:
+        if self.idle_time <= 0:
+            return False
+        return self._inflight > 0 or time.time() - self._last_active < self.idle_time
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queued": [{"id": e.task["id"], "method": e.method, "priority": e.priority} for _, _, e in self._queue],
+                "running": {m: e.task["id"] for m, e in self._running.items()},
+                "paused": list(self._paused),
+                "gpus": dict(self._gpu_usage),
+                "busy": self.busy(),
+            }
+
+    def _start_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="TaskScheduler", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._update_paused()
+                for e in self._next():
+                    self._start(e)
+                self._cond.wait(timeout=self.interval)
+
+    def _available(self, e: _Entry) -> bool:
+        if e.method in self._running:
+            return False
+        if e.priority >= Priority.SCORING and self.busy():
+            return False
+        return self.gpu_tasks <= 0 or all(self._gpu_usage.get(g, 0) < self.gpu_tasks for g in e.gpus)
+
+    def _next(self) -> List[_Entry]:
+        selected = []
+        for q in sorted(self._queue):
+            e = q[2]
+            if self._available(e):
+                self._queue.remove(q)
+                self._running[e.method] = e
+                for g in e.gpus:
+                    self._gpu_usage[g] = self._gpu_usage.get(g, 0) + 1
+                selected.append(e)
+        heapq.heapify(self._queue)
+        return selected
+
+    def _start(self, e: _Entry):
+        logger.info(f"Start {e.method} task {e.task['id']} (priority: {e.priority}; gpus: {e.gpus})")
+        threading.Thread(target=self._run, args=(e,), name=f"Task-{e.method}", daemon=True).start()
+
+    def _run(self, e: _Entry):
+        try:
+            e.fn()
+        except Exception as ex:
+            logger.exception(ex)
+        finally:
+            with self._cond:
+                self._running.pop(e.method, None)
+                if self._paused.pop(e.task["id"], None) is not None:
+                    self._set_pause_flag(e.task["id"], False)
+                for g in e.gpus:
+                    self._gpu_usage[g] -= 1
+                self._cond.notify_all()
+
+    def _set_pause_flag(self, task_id: str, paused: bool) -> bool:
+        f = self.pause_file(task_id)
+        if not f:
+            return False
+        try:
+            if paused:
+                open(f, "w").close()
+            elif os.path.exists(f):
+                os.remove(f)
+            return True
+        except OSError as ex:
+            logger.warning(f"Failed to {'pause' if paused else 'resume'} task {task_id}: {ex}")
+            return False
+
+    def _update_paused(self):
+        if not self.pause_dir:
+            return
+
+        busy = self.busy()
+        for e in list(self._running.values()):
+            task_id = e.task["id"]
+            paused = task_id in self._paused
+            if e.priority < Priority.SCORING or busy == paused:
+                continue
+
+            logger.info(f"{'Pause' if busy else 'Resume'} {e.method} task {task_id}")
+            if not self._set_pause_flag(task_id, busy):
+                continue
+
+            if busy:
+                self._paused[task_id] = e
+                e.task["status"] = "PAUSED"
+            else:
+                self._paused.pop(task_id, None)
+                if e.task.get("status") == "PAUSED":
+                    e.task["status"] = "RUNNING"
@@ -72,5 +72,5 @@ class AsyncTask:
         return ret, None
 
     @staticmethod
-    def stop(method):
-        return stop_background_task(method)
+    def stop(method, cancel_queued=False):
+        return stop_background_task(method, cancel_queued)
@@ -13,27 +13,157 @@ import json
 import logging
 import os
 import os.path
+import queue
 import random
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 import uuid
 from collections import deque
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict
+from functools import partial
+from typing import Dict, List, Optional
 
 import psutil
 
+from monailabel.config import settings
+from monailabel.utils.async_tasks.progress import TASK_EVENTS_ENV, TASK_PAUSE_ENV, parse_event, update_progress
+from monailabel.utils.async_tasks.scheduler import TaskScheduler
+
 logger = logging.getLogger(__name__)
 
+# printed (with task id and return code) by warm worker once a task is finished
+TASK_DONE = "__MONAILABEL_TASK_DONE__"
+
 background_tasks: Dict = {}
 background_processes: Dict = {}
-background_executors: Dict = {}
+background_workers: Dict[str, "WarmWorker"] = {}
+_scheduler: Optional[TaskScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler() -> TaskScheduler:
+    """
+    Process-wide instance of :py:class:`TaskScheduler` for background tasks configured from settings
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TaskScheduler(
+                gpu_tasks=settings.MONAI_LABEL_SCHEDULER_GPU_TASKS,
+                idle_time=settings.MONAI_LABEL_SCHEDULER_IDLE_TIME,
+                pause_dir=os.path.join(tempfile.gettempdir(), "monailabel", "pause", str(os.getpid())),
+            )
+        return _scheduler
+
+
+def _gpu_ids(request) -> List[int]:
+    gpus = request.get("gpus", "all")
+    gpus = gpus if gpus else "all"
+    if gpus == "all":
+        import torch
+
+        return list(range(torch.cuda.device_count()))
+    return [int(g) for g in str(gpus).split(",") if g.strip()]
+
+
+class WarmWorker:
+    """
+    Long-lived process (see :py:mod:`monailabel.utils.async_tasks.worker`) which runs background tasks
+    of a method one after the other;  avoids re-importing torch/MONAI and re-loading app/networks for every run.
+
+    Output of the process is drained continuously (by a reader thread) so that it never blocks on a full pipe;
+    lines printed while a task runs are available via :py:meth:`readline` and the rest are logged.
+    """
+
+    def __init__(self, env: Dict[str, str], cmd: Optional[List[str]] = None):
+        self.env_key = self.key(env)
+        cmd = cmd if cmd else [sys.executable, "-m", "monailabel.utils.async_tasks.worker"]
+        logger.info(f"COMMAND:: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            env={**env, "MONAI_LABEL_DATASTORE_AUTO_RELOAD": "false"},
+        )
+
+        self.busy = False
+        self.lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, name=f"WarmWorker-{self.process.pid}", daemon=True)
+        self._reader.start()
+
+    @staticmethod
+    def key(env: Dict[str, str]):
+        # environment which can not be changed once the worker has started
+        return env.get("CUDA_VISIBLE_DEVICES"), env.get("PYTHONPATH")
+
+    def _read(self):
+        plogger = logging.getLogger("task_worker")
+        for line in self.process.stdout:
+            line = line.rstrip()
+            if not self.busy:
+                if line:
+                    plogger.info(line)
+                continue
+
+            self.lines.put(line)
+            if line.startswith(TASK_DONE):
+                self.busy = False
+        self.process.stdout.close()
+        self.lines.put(None)
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def submit(self, task_id: str, method: str, request: Dict, env: Dict[str, str]):
+        task = {"id": task_id, "method": method, "request": request, "env": env}
+        stdin = self.process.stdin
+        assert stdin is not None, "Worker is started with stdin=PIPE"
+
+        self.busy = True
+        stdin.write(json.dumps(task, separators=(",", ":")) + "\n")
+        stdin.flush()
+
+    def readline(self) -> Optional[str]:
+        """
+        Next output line of the running task (blocks until available);  None if the process has exited
+        """
+        line = self.lines.get()
+        if line is None:
+            self.lines.put(None)  # for any later call
+        return line
+
+    def close(self):
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self._reader.join(timeout=10)
+
+
+def _warm_worker(method, env) -> WarmWorker:
+    worker = background_workers.get(method)
+    if worker is None or not worker.alive() or worker.env_key != WarmWorker.key(env):
+        if worker is not None:
+            worker.close()
+        worker = WarmWorker(env)
+        background_workers[method] = worker
+    return worker
 
 
 def _task_func(task, method, callback=None):
     request = task["request"]
     my_env = {**os.environ}
+    run_env = {TASK_EVENTS_ENV: "true"}
+    pause_file = scheduler().pause_file(task["id"])
+    if pause_file:
+        run_env[TASK_PAUSE_ENV] = pause_file
 
     gpus = request.get("gpus", "all")
     gpus = gpus if gpus else "all"
@@ -42,9 +172,9 @@ def _task_func(task, method, callback=None):
     request["gpus"] = "all"
 
     if method == "train":
-        my_env["MONAI_LABEL_DATASTORE_AUTO_RELOAD"] = "false"
-        my_env["MASTER_ADDR"] = "127.0.0.1"
-        my_env["MASTER_PORT"] = str(random.randint(1234, 1334))
+        run_env["MONAI_LABEL_DATASTORE_AUTO_RELOAD"] = "false"
+        run_env["MASTER_ADDR"] = "127.0.0.1"
+        run_env["MASTER_PORT"] = str(random.randint(1234, 1334))
 
     logger.info("Before:: " + my_env["PYTHONPATH"])
     bundle_path = request.get("bundle_path")
@@ -52,41 +182,62 @@ def _task_func(task, method, callback=None):
         my_env["PYTHONPATH"] = my_env.get("PYTHONPATH") + os.pathsep + bundle_path
     logger.info("After:: " + my_env["PYTHONPATH"])
 
-    cmd = [
-        sys.executable,
-        "-m",
-        "monailabel.interfaces.utils.app",
-        "-m",
-        method,
-        "-r",
-        json.dumps(request, separators=(",", ":")),
-    ]
-
-    logger.info(f"COMMAND:: {' '.join(cmd)}")
-    process = subprocess.Popen(
-        cmd, stderr=subprocess.STDOUT, stdout=subprocess.PIPE, universal_newlines=True, env=my_env
-    )
     task_id = task["id"]
+    done = None
+    worker = None
+    if method in settings.MONAI_LABEL_TASKS_WARM_WORKERS:
+        worker = _warm_worker(method, my_env)
+        worker.submit(task_id, method, request, run_env)
+        process = worker.process
+        done = f"{TASK_DONE} {task_id} "
+    else:
+        cmd = [
+            sys.executable,
+            "-m",
+            "monailabel.interfaces.utils.app",
+            "-m",
+            method,
+            "-r",
+            json.dumps(request, separators=(",", ":")),
+        ]
+
+        logger.info(f"COMMAND:: {' '.join(cmd)}")
+        process = subprocess.Popen(
+            cmd, stderr=subprocess.STDOUT, stdout=subprocess.PIPE, universal_newlines=True, env={**my_env, **run_env}
+        )
     background_processes[method][task_id] = process
 
     task["status"] = "RUNNING"
     task["details"] = deque(maxlen=20)
 
+    start = time.time()
+    returncode = None
     plogger = logging.getLogger(f"task_{method}")
-    while process.poll() is None:
-        line = process.stdout.readline()
+    while worker is not None or process.poll() is None:
+        line = worker.readline() if worker is not None else process.stdout.readline()
+        if line is None:  # warm worker has exited (e.g. killed)
+            process.wait()
+            break
         line = line.rstrip()
-        if line:
+        if done and line.startswith(done):
+            returncode = int(line[len(done) :])
+            break
+        event = parse_event(line)
+        if event:
+            update_progress(task, event, start)
+        elif line:
             plogger.info(line)
             task["details"].append(line)
 
-    logger.info(f"Return code: {process.returncode}")
+    returncode = process.returncode if returncode is None else returncode
+    logger.info(f"Return code: {returncode}")
     background_processes[method].pop(task_id, None)
-    process.stdout.close()
+    if not done:
+        process.stdout.close()
 
     task["end_ts"] = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
-    if task["status"] == "RUNNING":
-        task["status"] = "DONE" if process.returncode == 0 else "ERROR"
+    if task["status"] in ("RUNNING", "PAUSED"):
+        task["status"] = "DONE" if returncode == 0 else "ERROR"
 
     if callback:
         callback(task)
@@ -104,22 +255,35 @@ def run_background_task(request, method, callback=None, debug=False):
         background_tasks[method] = []
     if background_processes.get(method) is None:
         background_processes[method] = dict()
-    if background_executors.get(method) is None:
-        background_executors[method] = ThreadPoolExecutor(max_workers=1)
 
     background_tasks[method].append(task)
     if debug:
         _task_func(task, method)
-    else:
-        executor = background_executors[method]
-        executor.submit(_task_func, task, method, callback)
-    return task
+        return task
+
+    queued = scheduler().submit(task, method, partial(_task_func, task, method, callback), gpus=_gpu_ids(request))
+    if queued is not task:
+        background_tasks[method].remove(task)
+    return queued
 
 
-def stop_background_task(method):
+def stop_background_task(method, cancel_queued=False):
+    """
+    Stop (kill) the running background task of the method
+
+    :param method: method of the task (e.g. train, scoring, batch_infer)
+    :param cancel_queued: also cancel (mark as STOPPED) the queued (not yet started) tasks of the method;
+        they run after the stopped one otherwise
+    :return: the stopped task;  the last cancelled task (if any) when no task is running
+    """
     logger.info(f"Kill background task for {method}")
+    cancelled = scheduler().cancel(method) if cancel_queued else []
+    for task in cancelled:
+        task["status"] = "STOPPED"
+        task["end_ts"] = datetime.today().strftime("%Y-%m-%d %H:%M:%S")
+
     if not background_tasks.get(method) or not background_processes.get(method):
-        return None
+        return cancelled[-1] if cancelled else None
 
     task_id, process = next(iter(background_processes[method].items()))
     children = psutil.Process(pid=process.pid).children(recursive=True)
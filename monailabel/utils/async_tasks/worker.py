@@ -0,0 +1,72 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import sys
+
+import torch
+
+from monailabel.interfaces.utils.app import app_instance, save_result
+from monailabel.utils.async_tasks.utils import TASK_DONE
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(app, method, request):
+    if method == "train":
+        request.setdefault("local_rank", 0)
+        return app.train(request)
+    if method == "batch_infer":
+        return app.batch_infer(request)
+    if method == "scoring":
+        return app.scoring(request)
+    raise ValueError(f"Unsupported method: {method}")
+
+
+def run_main():
+    """
+    Warm worker;  reads tasks (one json per line) from stdin and runs them on the same app instance.
+    App, datastore and networks (see network cache) stay loaded between the tasks.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] [%(process)s] [%(threadName)s] [%(levelname)s] (%(name)s:%(lineno)d) - %(message)s",
+    )
+
+    app = app_instance()
+    logger.info("Worker is ready")
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        task = json.loads(line)
+        os.environ.update(task.get("env", {}))
+
+        code = 0
+        try:
+            app.datastore().refresh()
+            save_result(run_task(app, task["method"], task["request"]), None)
+        except Exception as e:
+            logger.exception(e)
+            code = 1
+        finally:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+        sys.stderr.flush()
+        print(f"{TASK_DONE} {task['id']} {code}", flush=True)
+
+
+if __name__ == "__main__":
+    run_main()
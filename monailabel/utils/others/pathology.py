@@ -18,6 +18,38 @@ from monailabel.utils.others.label_colors import to_hex, to_rgb
 logger = logging.getLogger(__name__)
 
 
+def dsa_annotation_elements(annotation):
+    """
+    Convert annotation (result of a single tile) into DSA elements (closed polylines)
+    """
+    if not annotation:
+        return
+
+    color_map = annotation.get("labels")
+    elements = annotation.get("elements", [])
+    for element in elements:
+        label = element["label"]
+        color = to_rgb(color_map.get(label))
+
+        logger.info(f"Adding Contours for label: {label}; color: {color}; color_map: {color_map}")
+
+        contours = element["contours"]
+        for contour in contours:
+            points = []
+            for point in contour:
+                points.append([point[0], point[1], 0])
+
+            yield {
+                "group": label,
+                "type": "polyline",
+                "lineColor": color,
+                "lineWidth": 2.0,
+                "closed": True,
+                "points": points,
+                "label": {"value": label},
+            }
+
+
 def create_dsa_annotations_json(json_data, loglevel="INFO"):
     logger.setLevel(loglevel.upper())
 
@@ -33,38 +65,12 @@ def create_dsa_annotations_json(json_data, loglevel="INFO"):
             if not res:
                 continue
 
-            annotation = res.get("annotation")
-            if not annotation:
-                continue
+            for annotation_style in dsa_annotation_elements(res.get("annotation")):
+                if total_count > 0:
+                    fp.write(",\n")
 
-            color_map = annotation.get("labels")
-            elements = annotation.get("elements", [])
-            for element in elements:
-                label = element["label"]
-                color = to_rgb(color_map.get(label))
-
-                logger.info(f"Adding Contours for label: {label}; color: {color}; color_map: {color_map}")
-
-                contours = element["contours"]
-                for contour in contours:
-                    points = []
-                    for point in contour:
-                        points.append([point[0], point[1], 0])
-
-                    if total_count > 0:
-                        fp.write(",\n")
-
-                    annotation_style = {
-                        "group": label,
-                        "type": "polyline",
-                        "lineColor": color,
-                        "lineWidth": 2.0,
-                        "closed": True,
-                        "points": points,
-                        "label": {"value": label},
-                    }
-                    fp.write(f"  {json.dumps(annotation_style)}")
-                    total_count += 1
+                fp.write(f"  {json.dumps(annotation_style)}")
+                total_count += 1
 
         fp.write(" ],\n")  # close elements
         fp.write(
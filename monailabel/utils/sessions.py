@@ -15,12 +15,101 @@ import os
 import pathlib
 import shutil
 import tempfile
+import threading
 import time
 import uuid
-from typing import Dict
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from monailabel.config import settings
+from monailabel.transform.cache import MB, TransformCache
 
 logger = logging.getLogger(__name__)
 
+_session_caches: "OrderedDict[str, SessionCache]" = OrderedDict()  # least recently used session first
+_session_caches_lock = threading.Lock()
+
+
+class SessionCache(TransformCache):
+    """
+    :py:class:`TransformCache` of a session.  In-memory entries of all the sessions share a process-wide budget
+    (`MONAI_LABEL_SESSION_CACHE_MEMORY`);  entries of the least recently used sessions are evicted first.
+    """
+
+    def __init__(self, session_path: str, memory: int, shared: bool):
+        super().__init__(path=os.path.join(session_path, "cache"), memory=memory, shared=shared)
+        self.session_path = session_path
+
+    def get(self, key: str, in_memory: bool = True, ttl: int = 0) -> Optional[Any]:
+        _touch(self)
+        obj = super().get(key, in_memory, ttl)
+        _enforce_budget()
+        return obj
+
+    def put(self, key: str, obj: Any, in_memory: bool = True, ttl: int = 600) -> None:
+        _touch(self)
+        super().put(key, obj, in_memory, ttl)
+        _enforce_budget()
+
+
+def _touch(cache: SessionCache):
+    with _session_caches_lock:
+        if _session_caches.get(cache.session_path) is cache:
+            _session_caches.move_to_end(cache.session_path)
+
+
+def _enforce_budget():
+    budget = settings.MONAI_LABEL_SESSION_CACHE_MEMORY * MB
+    with _session_caches_lock:
+        excess = sum(c.used for c in _session_caches.values()) - budget
+        for c in list(_session_caches.values()):
+            if excess <= 0:
+                break
+            excess -= c.evict(excess)
+
+
+def prune_session_caches():
+    """
+    Drop caches of the sessions which are removed (e.g. by other workers) and expired in-memory entries
+    """
+    with _session_caches_lock:
+        for p in [p for p in _session_caches if not os.path.isdir(p)]:
+            _session_caches.pop(p).clear()
+        caches = list(_session_caches.values())
+
+    for c in caches:
+        c.remove_expired(ttl=0, interval=0)
+
+
+def session_cache(path: str) -> TransformCache:
+    """
+    Cache of decoded/pre-processed images for the session stored at `path`.
+
+    Entries are kept in memory (bounded by `MONAI_LABEL_SESSION_CACHE_MEMORY` across all the sessions) and/or as
+    uncompressed (memory-mapped on load) files under `<path>/cache` which are removed along with the session.
+    """
+    with _session_caches_lock:
+        cache = _session_caches.get(path)
+        if cache is not None:
+            _session_caches.move_to_end(path)
+            return cache
+
+    prune_session_caches()
+    with _session_caches_lock:
+        cache = _session_caches.get(path)
+        if cache is None:
+            memory = settings.MONAI_LABEL_SESSION_CACHE_MEMORY * MB
+            cache = SessionCache(path, memory=memory, shared=memory > 0 and settings.MONAI_LABEL_TRANSFORM_CACHE_SHARED)
+            _session_caches[path] = cache
+        return cache
+
+
+def remove_session_cache(path: str):
+    with _session_caches_lock:
+        cache = _session_caches.pop(path, None)
+    if cache is not None:
+        cache.clear()
+
 
 class SessionInfo:
     def __init__(self, c=None):
@@ -77,6 +166,8 @@ class Sessions(dict):
                 else:
                     logger.info(f"Invalid session-id: {session_id} (will be removed)")
                     self.remove_session(session_id)
+
+        prune_session_caches()
         return count
 
     def get_session(self, session_id: str, update_ts: bool = True, fetch_cache: bool = True):
@@ -105,6 +196,7 @@ class Sessions(dict):
         if session_info:
             self.pop(session_id)
         path = os.path.join(self.store_path, session_id)
+        remove_session_cache(path)
         shutil.rmtree(path, ignore_errors=True)
 
     def add_session(self, data_file: str, expiry: int = 0, uncompress: bool = False, session_id=None):
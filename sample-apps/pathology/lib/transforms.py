@@ -13,7 +13,6 @@ import logging
 import pathlib
 
 import numpy as np
-import openslide
 import torch
 from monai.config import KeysCollection
 from monai.data import MetaTensor
@@ -23,6 +22,8 @@ from PIL import Image
 from scipy.ndimage import binary_fill_holes
 from skimage.morphology import remove_small_holes, remove_small_objects
 
+from monailabel.interfaces.utils.wsi import slide_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,9 +66,10 @@ class LoadImagePatchd(MapTransform):
                         ".vms",
                         ".vmu",
                     ):
-                        slide = openslide.OpenSlide(name)
-                        size = size if size else slide.dimensions
-                        img = slide.read_region(location, level, size)
+                        if not size:
+                            with slide_cache().open(name) as slide:
+                                size = slide.dimensions
+                        img = slide_cache().read_region(name, location, level, size)
                     else:
                         img = Image.open(d[key])
                         d["location"] = [0, 0]
@@ -19,6 +19,7 @@ from tqdm import tqdm
 from monailabel.interfaces.tasks.infer_v2 import InferTask, InferType
 from monailabel.interfaces.utils.transform import run_transforms
 from monailabel.tasks.infer.basic_infer import BasicInferTask
+from monailabel.tasks.infer.network_cache import network_cache
 from monailabel.transform.post import Restored
 from monailabel.transform.writer import Writer
 
@@ -33,11 +34,13 @@ class InferVertebraPipeline(BasicInferTask):
         task_seg_vertebra: InferTask,
         type=InferType.SEGMENTATION,
         description="Combines three stages for vertebra segmentation",
+        seg_batch_size=0,
         **kwargs,
     ):
         self.task_loc_spine = task_loc_spine
         self.task_loc_vertebra = task_loc_vertebra
         self.task_seg_vertebra = task_seg_vertebra
+        self.seg_batch_size = seg_batch_size  # max vertebra crops per forward pass (0 => all)
 
         super().__init__(
             path=None,
@@ -81,54 +84,82 @@ class InferVertebraPipeline(BasicInferTask):
         return d, r, self._latencies(r)
 
     def segment_vertebra(self, request, image, centroids):
+        """
+        Crops around all the centroids are segmented in batched forward pass(es) of `seg_batch_size` crops
+        (0 => all at once; halved automatically on running out of GPU memory) and pasted into a single mask.
+
+        Each crop goes through the same stages as running the task for it (pre-transforms, inferer, invert/post
+        transforms and writer);  only the forward passes are batched.
+        """
+        task = self.task_seg_vertebra
+        l = None
         original_size = list(image.shape)
-        result_mask = None
+        begin = time.time()
 
-        l = None
-        image_cached = None
-        count = 0
-        for centroid in tqdm(centroids):
-            # For Debuging - select few label...
-            # logger.info(f"Centroid: {centroid}")
-            # lkey = list(centroid.keys())[0]
-            # if lkey not in ("label_20", "label_22", "label_24"):
-            #     continue
-
-            req = copy.deepcopy(request)
-            req.update(
-                {
-                    "image": image,
-                    "image_cached": image_cached,
-                    "original_size": original_size,
-                    "centroids": [centroid],
-                    "pipeline_mode": True,
-                    "logging": "ERROR" if count > 1 else "INFO",
-                }
-            )
-
-            d, r = self.task_seg_vertebra(req)
+        with network_cache().busy(task):
+            # Pre-process (spacing/intensity) the image once; then crop + create signal for each centroid
+            start = time.time()
+            items = []
+            image_cached = None
+            for idx, centroid in enumerate(centroids):
+                req = copy.deepcopy(request)
+                req.update(
+                    {
+                        "image": image,
+                        "image_cached": image_cached,
+                        "original_size": original_size,
+                        "centroids": [centroid],
+                        "pipeline_mode": True,
+                        "logging": "ERROR" if idx > 1 else "INFO",
+                    }
+                )
+                d = task.prepare_request(req)
+                pre_transforms = task.pre_transforms(d)
+                d = task.run_pre_transforms(d, pre_transforms)
+                image = image_cached = d["image_cached"]
+                items.append((d, pre_transforms))
+            latency_pre = time.time() - start
+
+            start = time.time()
+            if items:
+                device = items[0][0]["device"]
+                batch_size = request.get("seg_batch_size", self.seg_batch_size)
+                batch_size = batch_size if batch_size > 0 else len(items)
+
+                i = 0
+                while i < len(items):
+                    chunk = [d for d, _ in items[i : i + batch_size]]
+                    try:
+                        task.run_inferer_batch(chunk, device=device)
+                    except RuntimeError as e:
+                        if len(chunk) == 1 or "out of memory" not in str(e):
+                            raise
+                        batch_size = len(chunk) // 2
+                        logger.warning(f"Vertebra Segmentation => OOM; reducing crops per pass to {batch_size}")
+                        torch.cuda.empty_cache()
+                        continue
+                    i += len(chunk)
+            latency_infer = time.time() - start
+
+        # Invert/Post/Write each crop and paste/merge its mask (in-place) into one pre-allocated mask
+        result_mask = torch.zeros_like(image)
+        for d, pre_transforms in tqdm(items):
+            out, r = task.finish(d, pre_transforms, time.time(), 0, 0)
             l = self._latencies(r, l)
 
-            image = d["image"]
-            image_cached = image
-
-            # Paste/Merge each mask
-            v = d["current_label"]
-            s = d["slices_cropped"]
-            m = d["pred"]
-            m[m > 0] = v
-
-            mask = torch.zeros_like(image)
-            mask[:, s[-3][0] : s[-3][1], s[-2][0] : s[-2][1], s[-1][0] : s[-1][1]] = m
-
-            if result_mask is None:
-                result_mask = mask
-            else:
-                result_mask = result_mask + mask
-                result_mask[result_mask > v] = v
-
-            count = count + 1
-
+            s = out["slices_cropped"]
+            m = torch.as_tensor(out["pred"], device=result_mask.device)
+            region = result_mask[:, s[-3][0] : s[-3][1], s[-2][0] : s[-2][1], s[-1][0] : s[-1][1]]
+            region[m > 0] = out["current_label"]
+
+        l = l if l else self._latencies({})
+        l.update(
+            {
+                "pre": round(latency_pre, 2),
+                "infer": round(latency_infer, 2),
+                "total": round(time.time() - begin, 2),
+            }
+        )
         return result_mask, l
 
     def __call__(self, request):
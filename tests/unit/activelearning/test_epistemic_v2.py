@@ -0,0 +1,123 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from unittest.mock import MagicMock
+
+import torch
+from monai.networks.nets import UNet
+from monai.utils import set_determinism
+
+from monailabel.interfaces.tasks.infer_v2 import InferType
+from monailabel.tasks.infer.basic_infer import BasicInferTask
+from monailabel.tasks.scoring.epistemic_v2 import EpistemicScoring, RunningStats, nanmean
+
+
+class _LoadImage:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data):
+        self.calls += 1
+        data["image"] = torch.rand(1, 16, 16, 16)
+        return data
+
+
+class _DropoutInfer(BasicInferTask):
+    def __init__(self):
+        super().__init__(
+            path=None,
+            network=UNet(3, 1, 2, channels=(4, 8), strides=(2,), dropout=0.5),
+            type=InferType.SEGMENTATION,
+            labels=["spleen"],
+            dimension=3,
+            description="dropout",
+            train_mode=True,
+            skip_writer=True,
+        )
+        self.loader = _LoadImage()
+
+    def pre_transforms(self, data=None):
+        return [self.loader]
+
+    def post_transforms(self, data=None):
+        return []
+
+
+class TestEpistemicScoringV2(unittest.TestCase):
+    def setUp(self) -> None:
+        set_determinism(seed=0)
+
+    def tearDown(self) -> None:
+        set_determinism(None)
+
+    def test_batched_scoring(self):
+        task = _DropoutInfer()
+        datastore = MagicMock()
+        datastore.get_unlabeled_images.return_value = ["image1", "image2"]
+        datastore.get_image_info.return_value = {}
+        datastore.get_image_uri.side_effect = lambda image_id: f"{image_id}.nii.gz"
+
+        scoring = EpistemicScoring(task, simulation_size=5, batched=True, mc_batch_size=2)
+        summary = scoring({"device": "cpu", "max_workers": 1}, datastore)
+
+        self.assertEqual(summary["executed"], 2)
+        self.assertEqual(task.loader.calls, 2)  # pre-processed once per image
+
+        infos = datastore.update_image_info_many.call_args[0][0]
+        self.assertEqual(sorted(infos.keys()), ["image1", "image2"])
+        for info in infos.values():
+            self.assertGreater(info["epistemic_entropy"], 0)
+
+    def test_failure_keeps_scores(self):
+        task = _DropoutInfer()
+        datastore = MagicMock()
+        datastore.get_unlabeled_images.return_value = ["image1", "image2", "image3"]
+        datastore.get_image_info.return_value = {}
+        datastore.get_image_uri.side_effect = lambda image_id: f"{image_id}.nii.gz"
+
+        scoring = EpistemicScoring(task, simulation_size=2, batched=True, mc_batch_size=2, info_batch_size=10)
+        run_scoring_batched = scoring.run_scoring_batched
+
+        def fail_last(image_id, *args):
+            if image_id == "image3":
+                raise RuntimeError("failed to load image3")
+            return run_scoring_batched(image_id, *args)
+
+        scoring.run_scoring_batched = fail_last
+        with self.assertRaises(RuntimeError):
+            scoring({"device": "cpu", "max_workers": 1}, datastore)
+
+        infos = datastore.update_image_info_many.call_args[0][0]
+        self.assertEqual(sorted(infos.keys()), ["image1", "image2"])
+
+    def test_running_stats(self):
+        accum = torch.rand(7, 2, 4, 4, 4)
+        stats = RunningStats()
+        for chunk in torch.split(accum.clone(), [1, 3, 2, 1]):
+            stats.update(chunk)
+
+        self.assertEqual(stats.count, 7)
+        self.assertTrue(torch.allclose(stats.mean, accum.mean(dim=0), atol=1e-6))
+        self.assertTrue(torch.allclose(stats.variance(), accum.var(dim=0, unbiased=False), atol=1e-6))
+
+        scoring = EpistemicScoring(_DropoutInfer())
+        avg = accum.mean(dim=0)
+        self.assertAlmostEqual(scoring.entropy_tensor(stats), float(-(avg * avg.log()).sum(0).mean()), places=5)
+
+    def test_nanmean(self):
+        self.assertAlmostEqual(nanmean(torch.tensor([1.0, float("nan"), 3.0])), 2.0)
+        self.assertTrue(torch.isnan(torch.tensor(nanmean(torch.tensor([float("nan")])))))
+        self.assertTrue(torch.isnan(torch.tensor(EpistemicScoring(_DropoutInfer()).score(RunningStats()))))
+
+
+if __name__ == "__main__":
+    unittest.main()
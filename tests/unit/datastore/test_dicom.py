@@ -11,7 +11,9 @@
 
 import os
 import tempfile
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 from dicomweb_client import DICOMwebClient
@@ -19,7 +21,8 @@ from dicomweb_client import DICOMwebClient
 
 class Instance(dict):
     def save_as(self, f):
-        pass
+        with open(f, "w") as fp:
+            fp.write("dcm")
 
     def iterall(self):
         return [SOPInstanceUID("/series/xyz")]
@@ -34,13 +37,20 @@ class SOPInstanceUID:
 
 
 class MockDICOMwebClient(DICOMwebClient):
-    def __init__(self):
-        pass
+    def __init__(self, instances=("xyz",)):
+        self.instances = instances
+        self.retrieved = []
 
-    def retrieve_series(self, *args, **kwargs):
+    def retrieve_series_metadata(self, *args, **kwargs):
+        return [{"00080018": {"vr": "UI", "Value": [i]}} for i in self.instances]
+
+    def retrieve_instance(self, study_id, series_id, instance_id, **kwargs):
+        self.retrieved.append(instance_id)
+        if instance_id == "fail":
+            raise ConnectionError("failed to retrieve instance")
         instance = Instance()
-        instance["SOPInstanceUID"] = SOPInstanceUID()
-        return [instance]
+        instance["SOPInstanceUID"] = SOPInstanceUID(instance_id)
+        return instance
 
     def store_instances(self, *args, **kwargs):
         return Instance()
@@ -75,6 +85,77 @@ class TestDicom(unittest.TestCase):
 
         with tempfile.TemporaryDirectory() as d:
             dicom_web_download_series("xyz", "abc", d, MockDICOMwebClient())
+            self.assertEqual(os.listdir(d), ["xyz.dcm"])
+
+    def test_dicom_web_download_series_resume(self):
+        from monailabel.datastore.utils.dicom import dicom_web_download_series
+
+        with tempfile.TemporaryDirectory() as d:
+            save_dir = os.path.join(d, "series")
+            client = MockDICOMwebClient(instances=("a", "b", "fail"))
+            with self.assertRaises(ConnectionError):
+                dicom_web_download_series("xyz", "abc", save_dir, client, workers=2)
+            self.assertFalse(os.path.exists(save_dir))
+
+            client = MockDICOMwebClient(instances=("a", "b", "c"))
+            dicom_web_download_series("xyz", "abc", save_dir, client, workers=2)
+            self.assertEqual(client.retrieved, ["c"])
+            self.assertEqual(sorted(os.listdir(save_dir)), ["a.dcm", "b.dcm", "c.dcm"])
+            self.assertFalse(os.path.exists(f"{save_dir}.partial"))
+
+    def test_dicom_web_download_series_concurrent(self):
+        from monailabel.datastore.utils import dicom
+
+        class SlowClient(MockDICOMwebClient):
+            def retrieve_instance(self, *args, **kwargs):
+                time.sleep(0.05)
+                return super().retrieve_instance(*args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as d:
+            save_dir = os.path.join(d, "series")
+            client = SlowClient(instances=[f"i{i}" for i in range(8)])
+            with ThreadPoolExecutor(4) as executor:
+                futures = [
+                    executor.submit(dicom.dicom_web_download_series, "xyz", "abc", save_dir, client, workers=2)
+                    for _ in range(4)
+                ]
+                for future in futures:
+                    future.result()
+
+            self.assertEqual(sorted(client.retrieved), sorted(client.instances))
+            self.assertEqual(sorted(os.listdir(save_dir)), sorted(f"{i}.dcm" for i in client.instances))
+            self.assertEqual(sorted(os.listdir(d)), ["series"])
+            self.assertEqual(dicom._download_locks, {})
+
+    def test_dicom_web_download_series_other_process(self):
+        from filelock import FileLock
+
+        from monailabel.datastore.utils import dicom
+
+        with tempfile.TemporaryDirectory() as d:
+            save_dir = os.path.join(d, "series")
+            client = MockDICOMwebClient(instances=("a", "b"))
+
+            # download of the same series by other process (e.g. http worker) is in progress
+            lock = FileLock(dicom._download_lock_file(save_dir))
+            lock.acquire()
+            with ThreadPoolExecutor(1) as executor:
+                future = executor.submit(dicom.dicom_web_download_series, "xyz", "abc", save_dir, client)
+                time.sleep(0.3)
+                self.assertFalse(future.done())
+                self.assertEqual(client.retrieved, [])
+
+                lock.release()
+                future.result()
+
+            self.assertEqual(sorted(os.listdir(save_dir)), ["a.dcm", "b.dcm"])
+            self.assertEqual(sorted(os.listdir(d)), ["series"])
+
+    def test_create_session_pool(self):
+        from monailabel.datastore.utils.dicom import create_session_pool
+
+        session = create_session_pool(size=16)
+        self.assertEqual(session.get_adapter("https://").poolmanager.connection_pool_kw["maxsize"], 16)
 
     @patch("monailabel.datastore.utils.dicom.dcmread")
     def test_dicom_web_upload_dcm(self, f3):
@@ -0,0 +1,151 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import tempfile
+import threading
+import unittest
+
+from monailabel.datastore.dsa import DSADatastore
+
+
+class MockGirderClient:
+    def __init__(self):
+        self.items = [
+            {"_id": "i1", "name": "slide1.svs", "largeImage": {"fileId": "f"}, "updated": "2023-01-01T00:00:01"},
+            {"_id": "i2", "name": "slide2.svs", "largeImage": {"fileId": "f"}, "updated": "2023-01-01T00:00:02"},
+            {"_id": "i3", "name": "notes.txt", "updated": "2023-01-01T00:00:03"},
+        ]
+        self.annotations = [
+            {
+                "_id": "a1",
+                "itemId": "i1",
+                "groups": ["Tumor"],
+                "annotation": {"name": "nuclei"},
+                "updated": "2023-01-01T00:00:01",
+            },
+        ]
+        self.calls = []
+
+    def get(self, path, parameters=None, jsonResp=True):
+        self.calls.append(path)
+        if path.startswith("annotation/"):
+            return {"annotation": {"elements": [{"type": "point", "center": [1, 2, 0]}]}}
+
+        records = self.items if path == "item" else self.annotations
+        records = sorted(records, key=lambda d: d["updated"], reverse=parameters.get("sortdir") == -1)
+        offset, limit = parameters["offset"], parameters["limit"]
+        return records[offset : offset + limit]
+
+    def getItem(self, item_id):
+        return dict(next(d for d in self.items if d["_id"] == item_id))
+
+    def addMetadataToItem(self, item_id, metadata):
+        item = next(d for d in self.items if d["_id"] == item_id)
+        item["meta"] = {**item.get("meta", {}), **metadata}
+
+
+class TestDSA(unittest.TestCase):
+    def create(self, path):
+        ds = DSADatastore("http://dsa.com/api/v1", folder="f1", annotation_groups=["tumor"], cache_path=path)
+        ds.gc = ds.index.gc = MockGirderClient()
+        ds.index.page_size = 2
+        return ds
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as d:
+            ds = self.create(d)
+            gc = ds.gc
+
+            self.assertEqual(sorted(ds.list_images()), ["i1", "i2"])
+            self.assertEqual(ds.get_labeled_images(), ["i1"])
+            self.assertEqual(ds.get_unlabeled_images(), ["i2"])
+            self.assertEqual(ds.get_annotations_by_image_id("slide1")["nuclei"]["points"], [(1.0, 2.0, 0.0)])
+
+            # queries within refresh interval are answered from the index
+            count = len(gc.calls)
+            ds.status()
+            ds.get_annotations_by_image_id("slide1")
+            self.assertEqual(len(gc.calls), count)
+
+            # incremental refresh only fetches the updated records
+            gc.annotations.append(
+                {
+                    "_id": "a2",
+                    "itemId": "i2",
+                    "groups": ["tumor"],
+                    "annotation": {"name": "nuclei"},
+                    "updated": "2023-01-01T00:00:05",
+                }
+            )
+            ds.refresh()
+            self.assertEqual(ds.get_labeled_images(), ["i1", "i2"])
+            self.assertEqual(ds.get_unlabeled_images(), [])
+
+            # index is loaded from disk
+            ds = self.create(d)
+            ds.index._refresh_ts = float("inf")
+            self.assertEqual(sorted(ds.list_images()), ["i1", "i2"])
+            self.assertEqual(ds.gc.calls, [])
+
+    def test_paging_while_deleted(self):
+        with tempfile.TemporaryDirectory() as d:
+            ds = self.create(d)
+            gc = ds.gc
+            get = gc.get
+
+            def delete_newest(path, parameters=None, jsonResp=True):
+                page = get(path, parameters, jsonResp)
+                if path == "item" and parameters["offset"] == 0 and gc.items[-1]["_id"] == "i3":
+                    gc.items.pop()  # i3 is deleted after the first page;  i1 shifts into the first page
+                return page
+
+            gc.get = delete_newest
+            updated = ds.index._updated_since("item", {}, "")
+            self.assertEqual(sorted(i["_id"] for i in updated), ["i1", "i2", "i3"])
+
+    def test_refresh_outside_lock(self):
+        with tempfile.TemporaryDirectory() as d:
+            ds = self.create(d)
+            ds.index.refresh(force=True)
+            gc = ds.gc
+            get = gc.get
+            started, release = threading.Event(), threading.Event()
+
+            def slow(path, parameters=None, jsonResp=True):
+                started.set()
+                release.wait(5)
+                return get(path, parameters, jsonResp)
+
+            gc.get = slow
+            ds.index.interval = 0
+            refresh = threading.Thread(target=ds.index.refresh, kwargs={"force": True})
+            refresh.start()
+            self.assertTrue(started.wait(5))
+
+            # queries are answered from the current index while it is being refreshed
+            self.assertEqual(sorted(ds.list_images()), ["i1", "i2"])
+            self.assertEqual(ds.get_labeled_images(), ["i1"])
+            release.set()
+            refresh.join()
+
+    def test_image_info(self):
+        with tempfile.TemporaryDirectory() as d:
+            ds = self.create(d)
+            ds.update_image_info_many({"i1": {"epistemic_ts": 1}, "i2": {"epistemic_ts": 2}})
+            ds.update_image_info("i1", {"epistemic_entropy": 0.5, "name": "other"})
+
+            info = ds.get_image_info("i1")
+            self.assertEqual((info["epistemic_ts"], info["epistemic_entropy"]), (1, 0.5))
+            self.assertEqual(info["name"], "slide1.svs")
+            self.assertEqual(ds.get_image_info("i2")["epistemic_ts"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
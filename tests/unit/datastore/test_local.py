@@ -0,0 +1,149 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from monailabel.datastore.local import LocalDatastore
+from monailabel.interfaces.datastore import DefaultLabelTag
+from monailabel.interfaces.exception import ImageNotFoundException
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+
+
+class TestLocalDatastore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.studies = self.tmp.name
+        for i in range(3):
+            _touch(os.path.join(self.studies, f"image{i}.nii.gz"))
+        _touch(os.path.join(self.studies, "labels", "final", "image0.nii.gz"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _verify(self, ds):
+        self.assertEqual(sorted(ds.list_images()), ["image0", "image1", "image2"])
+        self.assertEqual(ds.get_labeled_images(), ["image0"])
+        self.assertEqual(sorted(ds.get_unlabeled_images()), ["image1", "image2"])
+
+    def test_json_store(self):
+        ds = LocalDatastore(self.studies)
+        self._verify(ds)
+        self.assertTrue(os.path.exists(os.path.join(self.studies, "datastore_v2.json")))
+
+        ds.update_image_info("image1", {"epistemic_v2": 0.5})
+        self.assertEqual(LocalDatastore(self.studies).get_image_info("image1")["epistemic_v2"], 0.5)
+
+    def test_sqlite_store(self):
+        ds = LocalDatastore(self.studies, metadata_store="sqlite")
+        self._verify(ds)
+        self.assertTrue(os.path.exists(os.path.join(self.studies, "datastore_v2.db")))
+
+        ds.update_image_info("image1", {"epistemic_v2": 0.5})
+        ds.update_label_info("image0", DefaultLabelTag.FINAL, {"dice": 0.9})
+
+        other = LocalDatastore(self.studies, metadata_store="sqlite")
+        self._verify(other)
+        self.assertEqual(other.get_image_info("image1")["epistemic_v2"], 0.5)
+        self.assertEqual(other.get_label_info("image0", DefaultLabelTag.FINAL)["dice"], 0.9)
+
+        # changes from other instance (process) are synced incrementally
+        other.update_image_info("image2", {"epistemic_v2": 0.7})
+        ds._init_from_datastore_file()
+        self.assertEqual(ds.get_image_info("image2")["epistemic_v2"], 0.7)
+
+        os.remove(os.path.join(self.studies, "image2.nii.gz"))
+        other.refresh()
+        ds._init_from_datastore_file()
+        self.assertEqual(sorted(ds.list_images()), ["image0", "image1"])
+
+    def test_update_info_many(self):
+        for store in ("json", "sqlite"):
+            ds = LocalDatastore(self.studies, metadata_store=store)
+            ds.update_image_info_many({"image1": {"score": 1}, "image2": {"score": 2}})
+            ds.update_label_info_many(DefaultLabelTag.FINAL, {"image0": {"sum": 3}})
+            self.assertRaises(ImageNotFoundException, ds.update_image_info_many, {"image9": {"score": 9}})
+
+            ds = LocalDatastore(self.studies, metadata_store=store)
+            self.assertEqual(ds.get_image_info("image1")["score"], 1)
+            self.assertEqual(ds.get_image_info("image2")["score"], 2)
+            self.assertEqual(ds.get_label_info("image0", DefaultLabelTag.FINAL)["sum"], 3)
+
+    def test_file_events(self):
+        ds = LocalDatastore(self.studies)
+
+        # label dropped before its image is picked up along with the image
+        label = os.path.join(self.studies, "labels", "final", "image3.nii.gz")
+        _touch(label)
+        ds._on_file_changed(label)
+        self.assertNotIn("image3", ds.list_images())
+
+        image = os.path.join(self.studies, "image3.nii.gz")
+        _touch(image)
+        ds._on_file_changed(image)
+        self.assertIn("image3", ds.list_images())
+        self.assertEqual(ds.get_label_by_image_id("image3", DefaultLabelTag.FINAL), "image3")
+
+        os.remove(label)
+        ds._on_file_changed(label)
+        self.assertEqual(ds.get_label_by_image_id("image3", DefaultLabelTag.FINAL), "")
+
+        os.remove(image)
+        ds._on_file_changed(image)
+        self._verify(ds)
+        self._verify(LocalDatastore(self.studies))
+
+    def test_sqlite_migration(self):
+        ds = LocalDatastore(self.studies)
+        ds.set_name("migrated")
+        ds.update_image_info("image1", {"epistemic_v2": 0.5})
+
+        ds = LocalDatastore(self.studies, metadata_store="sqlite")
+        self._verify(ds)
+        self.assertEqual(ds.name(), "migrated")
+        self.assertEqual(ds.get_image_info("image1")["epistemic_v2"], 0.5)
+
+    def test_follower(self):
+        # only the reconciling process watches the files;  others follow its updates of the datastore config
+        follower = LocalDatastore(self.studies, auto_reload=True, reconcile=False)
+        try:
+            self.assertEqual(follower.list_images(), [])
+            self.assertEqual(sorted(follower._handler.patterns), sorted(follower._store.patterns()))
+
+            LocalDatastore(self.studies)
+            for _ in range(50):
+                if follower.list_images():
+                    break
+                time.sleep(0.1)
+            self._verify(follower)
+        finally:
+            follower.close()
+
+    def test_close(self):
+        ds = LocalDatastore(self.studies, auto_reload=True, metadata_store="sqlite", reconcile_interval=1)
+        observer, reconciler = ds._observer, ds._reconciler
+        ds.close()
+
+        self.assertFalse(observer.is_alive())
+        self.assertFalse(reconciler.is_alive())
+        self.assertRaises(sqlite3.ProgrammingError, ds._store.changes)
+
+
+if __name__ == "__main__":
+    unittest.main()
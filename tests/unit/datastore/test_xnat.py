@@ -9,8 +9,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import argparse
+import io
 import os
+import tempfile
 import unittest
+import zipfile
 
 from monailabel.datastore.xnat import XNATDatastore
 
@@ -35,8 +38,28 @@ xml_response = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
 """
 
 
+class ZipResponse:
+    def __init__(self, content):
+        self.ok = True
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class XNATDatastorMocked(XNATDatastore):
+    zip_content = None
+    requests = []
+
     def _request_get(self, url):
+        self.requests.append(url)
         if "JSESSION?CSRF=true" in url:
             return argparse.Namespace(ok=True, content=b"xyzc=deffad")
         if "projects?format=json" in url:
@@ -45,14 +68,19 @@ class XNATDatastorMocked(XNATDatastore):
             return ExperimentResponse()
         if "experiment1?format=xml" in url:
             return argparse.Namespace(content=xml_response)
-        if "format=zip" in url:
-            with open(os.path.join(base_dir, "downloads", "dicom.zip"), mode="rb") as file:
-                content = file.read()
-            return argparse.Namespace(ok=True, content=content)
         if "format=xml" in url:
             return argparse.Namespace(ok=True)
         return None
 
+    def _request_stream(self, url):
+        if "format=zip" in url:
+            content = self.zip_content
+            if content is None:
+                with open(os.path.join(base_dir, "downloads", "dicom.zip"), mode="rb") as file:
+                    content = file.read()
+            return ZipResponse(content)
+        return None
+
     def _request_post(self, url):
         return argparse.Namespace(ok=True)
 
@@ -63,3 +91,60 @@ class TestXNAT(unittest.TestCase):
         xnat.get_image_info("abcd/xyz/1234/def")
         xnat.get_image("abcd/xyz/1234/def")
         xnat.list_images()
+
+    def test_catalog_and_download(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("scan/resources/DICOM/files/1.dcm", b"dcm1")
+            zf.writestr("scan/resources/DICOM/files/2.dcm", b"dcm2")
+            zf.writestr("scan/resources/DICOM/files/catalog.xml", b"xml")
+
+        with tempfile.TemporaryDirectory() as d:
+            xnat = XNATDatastorMocked("http://xnat.com", cache_path=d)
+            xnat.zip_content = buf.getvalue()
+            xnat.requests = []
+
+            self.assertEqual(xnat.list_images(), ["project1/CENTRAL_S00358/experiment1/3"])
+            count = len(xnat.requests)
+            xnat.list_images()  # served from cached catalog
+            self.assertEqual(len(xnat.requests), count)
+
+            # catalog is saved on disk
+            xnat = XNATDatastorMocked("http://xnat.com", cache_path=d)
+            self.assertIn("experiment1", xnat._catalog)
+
+            xnat.zip_content = buf.getvalue()
+            uris = xnat.fetch_images(["project1/CENTRAL_S00358/experiment1/3"])
+            dicom_dir = uris["project1/CENTRAL_S00358/experiment1/3"]
+            self.assertEqual(sorted(os.listdir(dicom_dir)), ["1.dcm", "2.dcm"])
+            self.assertTrue(os.path.exists(os.path.join(os.path.dirname(dicom_dir), "files.zip")))
+            self.assertEqual(xnat._download_locks, {})
+
+    def test_download_zip(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("scan/resources/DICOM/files/1.dcm", b"dcm1")
+            zf.writestr("scan/resources/SECONDARY/files/1.dcm", b"dcm2")
+            zf.writestr("scan/resources/DICOM/files/2.dcm", b"dcm3")
+
+        with tempfile.TemporaryDirectory() as d:
+            xnat = XNATDatastorMocked("http://xnat.com", cache_path=d)
+            dest_dir = os.path.join(d, "scan")
+            args = (dest_dir, os.path.join(dest_dir, "files.zip"), os.path.join(dest_dir, "DICOM"), "p", "s", "e", "3")
+
+            # same file name in different folders is not overwritten
+            xnat.zip_content = buf.getvalue()
+            dicom_dir = xnat._download_zip(*args)
+            files = sorted(os.listdir(dicom_dir))
+            self.assertEqual(len(files), 3)
+            self.assertIn("2.dcm", files)
+            contents = set()
+            for f in files:
+                with open(os.path.join(dicom_dir, f), "rb") as fp:
+                    contents.add(fp.read())
+            self.assertEqual(contents, {b"dcm1", b"dcm2", b"dcm3"})
+
+            # no leftovers of a failed download
+            xnat.zip_content = b"not a zip"
+            self.assertRaises(zipfile.BadZipFile, xnat._download_zip, *args)
+            self.assertEqual(sorted(os.listdir(dest_dir)), ["DICOM", "files.zip"])
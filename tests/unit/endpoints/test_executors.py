@@ -0,0 +1,172 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import statistics
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from monailabel.endpoints import executors, info, train
+from monailabel.endpoints.executors import BoundedExecutor, Pool, run_in_pool
+
+
+class TestBoundedExecutor(unittest.TestCase):
+    def test_event_loop_not_blocked(self):
+        executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+
+        async def main():
+            ticks = []
+
+            async def health():
+                for _ in range(5):
+                    ticks.append(time.time())
+                    await asyncio.sleep(0.05)
+
+            start = time.time()
+            await asyncio.gather(executor.run(time.sleep, 0.5), health())
+            return start, ticks
+
+        start, ticks = asyncio.run(main())
+        self.assertLess(ticks[-1] - start, 0.45)  # health checks are served while "infer" is running
+        self.assertEqual(executor.stats()["completed"], 1)
+
+    def test_backpressure(self):
+        executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+
+        async def main():
+            return await asyncio.gather(*[executor.run(time.sleep, 0.2) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(main())
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(rejected[0].status_code, 503)
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.stats()["completed"], 2)
+
+    def test_iterate(self):
+        executor = BoundedExecutor("test", max_workers=1, max_queue=0)
+        closed = []
+
+        def events():
+            try:
+                for i in range(3):
+                    time.sleep(0.05)
+                    yield i
+            finally:
+                closed.append(True)
+
+        async def main():
+            items = []
+            async for item in executor.iterate(events()):
+                items.append(item)
+                # slot is held while the stream is being consumed
+                self.assertRaises(HTTPException, executor.iterate, iter([]))
+            return items
+
+        self.assertEqual(asyncio.run(main()), [0, 1, 2])
+        self.assertEqual(closed, [True])
+        self.assertEqual(executor.stats()["completed"], 1)
+        self.assertEqual(executor.stats()["rejected"], 3)
+
+        async def partial():
+            stream = executor.iterate(events())
+            await stream.__anext__()
+            await stream.aclose()
+
+        closed.clear()
+        asyncio.run(partial())
+        self.assertEqual(closed, [True])
+        self.assertEqual(executor.stats()["running"] + executor.stats()["waiting"], 0)
+
+
+class TestLoad(unittest.TestCase):
+    """
+    Benchmark: health/status endpoints stay responsive under sustained infer load (and a sync train)
+    """
+
+    def test_health_under_infer_load(self):
+        app = FastAPI()
+        app.include_router(info.router)
+        app.include_router(train.router)
+
+        @app.post("/infer")
+        async def infer():
+            return await run_in_pool(Pool.INFER, time.sleep, 0.1)
+
+        duration = 2.0
+        infer_clients = 4  # more than infer workers + queue => some requests are rejected (503) immediately
+
+        async def main():
+            stats = {"infer": 0, "rejected": 0, "infer_during_train": 0}
+            latencies = []
+            train_running = asyncio.Event()
+
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                end = time.time() + duration
+
+                async def infer_load():
+                    while time.time() < end:
+                        r = await client.post("/infer")
+                        if r.status_code == 503:
+                            stats["rejected"] += 1
+                            await asyncio.sleep(0.01)
+                            continue
+                        stats["infer"] += 1
+                        if train_running.is_set():
+                            stats["infer_during_train"] += 1
+
+                async def sync_train():
+                    await asyncio.sleep(0.2)
+                    train_running.set()
+                    r = await client.post("/train/segmentation", params={"run_sync": True})
+                    train_running.clear()
+                    return r.status_code
+
+                async def health():
+                    while time.time() < end:
+                        start = time.time()
+                        r = await client.get("/info/")
+                        latencies.append(time.time() - start)
+                        self.assertEqual(r.status_code, 200)
+                        await asyncio.sleep(0.05)
+
+                res = await asyncio.gather(sync_train(), health(), *[infer_load() for _ in range(infer_clients)])
+            return res[0], stats, latencies
+
+        def run_model(model, params=None, run_sync=False, enqueue=False):
+            time.sleep(1.0)
+            return {"model": model}
+
+        with patch.dict(executors._executors, clear=True), patch.object(
+            executors.settings, "MONAI_LABEL_API_INFER_WORKERS", 1
+        ), patch.object(executors.settings, "MONAI_LABEL_API_INFER_QUEUE", 1), patch.object(
+            info, "app_info", lambda: {"name": "test"}
+        ), patch.object(
+            train, "run_model", run_model
+        ):
+            train_status, stats, latencies = asyncio.run(main())
+
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"Health: {len(latencies)} requests; max: {max(latencies):.4f}; p95: {p95:.4f}; Infer: {stats}")
+
+        self.assertEqual(train_status, 200)
+        self.assertGreater(stats["infer_during_train"], 0)  # sync train does not block infer
+        self.assertGreater(stats["rejected"], 0)  # infer is saturated
+        self.assertGreater(len(latencies), 20)
+        self.assertLess(max(latencies), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
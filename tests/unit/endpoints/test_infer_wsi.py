@@ -9,6 +9,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import time
 import unittest
 
@@ -54,6 +55,26 @@ class EndPointWSIInfer(BasicEndpointV4TestSuite):
         assert response.status_code == 200
         time.sleep(1)
 
+    def test_segmentation_stream(self):
+        if not torch.cuda.is_available():
+            return
+
+        model = "segmentation_nuclei"
+        image = "JP2K-33003-1"
+        wsi = {"level": 0, "size": [2000, 2000], "pos": [2000, 4000], "tile_size": [1000, 1000]}
+
+        response = self.client.post(
+            f"/infer/wsi_v2/{model}?image={image}&output=dsa&stream=true", data={"wsi": json.dumps(wsi)}
+        )
+        assert response.status_code == 200
+
+        events = [json.loads(line) for line in response.text.splitlines() if line]
+        assert events[0]["type"] == "start"
+        assert events[-1]["type"] == "end"
+        assert len([e for e in events if e["type"] == "tile"]) == events[0]["tiles"]
+        assert events[-1]["count"] == sum(len(e["elements"]) for e in events if e["type"] == "tile")
+        time.sleep(1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from monailabel.endpoints.metrics import TaskMethod, metrics, task_events
+from monailabel.utils.async_tasks import utils
+
+TASK = {
+    "id": "t1",
+    "status": "RUNNING",
+    "request": {},
+    "start_ts": "2023-01-01 00:00:00",
+    "progress": {"seq": 3, "done": 5, "total": 10, "progress": 0.5, "eta": 12.5, "loss": 0.25},
+}
+
+
+class _Request:
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+class TestMetrics(unittest.TestCase):
+    def test_metrics(self):
+        with patch.dict(utils.background_tasks, {"train": [TASK]}):
+            text = metrics()
+        self.assertIn("# TYPE monailabel_task_progress gauge", text)
+        self.assertIn('monailabel_task_running{method="train"} 1.0', text)
+        self.assertIn('monailabel_task_progress{method="train"} 0.5', text)
+        self.assertIn('monailabel_task_eta_seconds{method="train"} 12.5', text)
+        self.assertIn('monailabel_tasks{method="train",status="RUNNING"} 1.0', text)
+        self.assertIn("monailabel_transform_cache_hits_total", text)
+
+    def test_events(self):
+        async def collect():
+            return [e async for e in task_events(_Request(polls=3), TaskMethod.train, 0.01)]
+
+        with patch.dict(utils.background_tasks, {"train": [TASK]}):
+            events = asyncio.run(collect())
+
+        # same state is sent only once
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith("event: train\ndata: "))
+        data = json.loads(events[0].split("data: ")[1])
+        self.assertEqual((data["id"], data["progress"]["done"]), ("t1", 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
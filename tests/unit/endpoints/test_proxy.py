@@ -8,35 +8,134 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+import tempfile
+import threading
+import time
 import unittest
-from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
+
+import httpx
+
+from monailabel.config import settings
+from monailabel.endpoints import proxy
 
 from .context import BasicEndpointTestSuite
 
+requests = []
 
-class MockHttpClient(MagicMock):
-    def __init__(self, auth):
-        pass
 
-    async def get(self, url, **kwargs):
-        return SimpleNamespace(content=b"xyz", status_code=400)
+class MockStream(httpx.AsyncByteStream):
+    def __init__(self, content: bytes):
+        self.content = content
 
-    async def __aenter__(self):
-        return self
+    async def __aiter__(self):
+        yield self.content
 
-    async def __aexit__(self, *args):
-        pass
 
+def mock_http_client():
+    def handler(request: httpx.Request):
+        requests.append(str(request.url))
+        if "instances" in request.url.path:
+            return httpx.Response(200, stream=MockStream(b"dicom"), headers={"content-type": "application/dicom"})
+        return httpx.Response(400, stream=MockStream(b"xyz"))
 
-def mock_http_client(auth):
-    return MockHttpClient(auth)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
 
 
-@patch("httpx.AsyncClient", new=mock_http_client)
+@patch("monailabel.endpoints.proxy._create_client", new=mock_http_client)
+@patch.object(settings, "MONAI_LABEL_STUDIES", "http://127.0.0.1:8042/dicom-web")
 class TestEndPointLogs(BasicEndpointTestSuite):
     def test_proxy(self):
-        self.client.get("/proxy/dicom/studies")
+        response = self.client.get("/proxy/dicom/studies")
+        assert response.status_code == 400
+        assert response.content == b"xyz"
+
+    def test_proxy_cache(self):
+        path = "/proxy/dicom/wado/studies/1.2/series/1.2.3/instances/1.2.3.4"
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.object(settings, "MONAI_LABEL_DICOMWEB_PROXY_CACHE_PATH", tmp), patch.object(
+                settings, "MONAI_LABEL_DICOMWEB_PROXY_CACHE_SIZE", 1
+            ), patch.object(proxy, "_proxy_cache", None):
+                count = len(requests)
+                for _ in range(2):
+                    response = self.client.get(path)
+                    assert response.status_code == 200
+                    assert response.content == b"dicom"
+                    assert response.headers["content-type"] == "application/dicom"
+
+                # second request is served from cache
+                assert len(requests) == count + 1
+
+
+class TestProxyCache(unittest.TestCase):
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = proxy.ProxyCache(tmp, size=1000)
+            scans = []
+            entries = cache._entries
+            cache._entries = lambda: scans.append(1) or entries()
+
+            for i in range(20):
+                t = cache.temp_file()
+                with open(t, "wb") as f:
+                    f.write(b"x" * 100)
+                cache.put(f"k{i}", t, 200, {})
+                time.sleep(0.01)
+
+            # evicted down to low watermark;  so the directory is not scanned for every put once full
+            self.assertLessEqual(cache._used, 1000)
+            self.assertLessEqual(len(scans), 10)
+            self.assertIsNone(cache.get("k0"))
+            self.assertIsNotNone(cache.get("k19"))
+
+
+class MockCredentials:
+    def __init__(self):
+        self.valid = False
+        self.token = None
+        self.refreshed = 0
+
+    def refresh(self, request):
+        time.sleep(0.5)
+        self.refreshed += 1
+        self.token = f"token-{self.refreshed}"
+        self.valid = True
+
+
+class TestGoogleAuth(unittest.TestCase):
+    def test_refresh_not_on_event_loop(self):
+        credentials = MockCredentials()
+        auth = proxy.GoogleAuth(credentials)
+
+        async def flow():
+            request = httpx.Request("GET", "http://127.0.0.1/dicom-web/studies")
+            return (await auth.async_auth_flow(request).__anext__()).headers["Authorization"]
+
+        async def main():
+            ticks = []
+
+            async def heartbeat():
+                for _ in range(5):
+                    ticks.append(time.time())
+                    await asyncio.sleep(0.05)
+
+            start = time.time()
+            res = await asyncio.gather(flow(), heartbeat())
+            return res[0], ticks[-1] - start
+
+        # refresh (while holding the lock) in progress
+        t = threading.Thread(target=auth.token)
+        t.start()
+        time.sleep(0.1)
+
+        header, elapsed = asyncio.run(main())
+        t.join()
+
+        self.assertLess(elapsed, 0.4)  # event loop is not blocked by the refresh
+        self.assertEqual(header, "Bearer token-1")
+        self.assertEqual(credentials.refreshed, 1)
+        self.assertEqual(auth.cached_token(), "token-1")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,175 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from PIL import Image
+
+from monailabel.interfaces.utils.wsi import SlideCache, create_infer_wsi_tasks
+
+opened = []
+
+
+class MockSlide:
+    def __init__(self, path):
+        self.path = path
+        self.dimensions = (300, 200)
+        self.closed = False
+        self.reads = []
+        self.lock = threading.Lock()
+        opened.append(self)
+
+    def read_region(self, location, level, size):
+        with self.lock:
+            self.reads.append(location)
+        return (location, level, size)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class TissueSlide(MockSlide):
+    """
+    Slide (1000 x 800; level 1 is downsampled by 4) with tissue only in region (100, 100) - (300, 400);
+    top half of the tissue is lightly (pink) and bottom half is darkly (purple) stained
+    """
+
+    level_downsamples = (1.0, 4.0)
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.dimensions = (1000, 800)
+
+    def get_best_level_for_downsample(self, downsample):
+        return 1 if downsample >= 4 else 0
+
+    def read_region(self, location, level, size):
+        ds = self.level_downsamples[level]
+        img = np.full((800, 1000, 4), 240, dtype=np.uint8)
+        img[100:250, 100:300, :3] = (245, 208, 230)
+        img[250:400, 100:300, :3] = (200, 80, 160)
+        img = img[:: int(ds), :: int(ds)]
+        x, y = int(location[0] / ds), int(location[1] / ds)
+        return Image.fromarray(img[y : y + size[1], x : x + size[0]])
+
+
+@patch("monailabel.interfaces.utils.wsi._openslide", new=lambda: SimpleNamespace(OpenSlide=MockSlide))
+class TestSlideCache(unittest.TestCase):
+    def setUp(self):
+        opened.clear()
+
+    def test_pool(self):
+        with tempfile.NamedTemporaryFile(suffix=".svs") as f1, tempfile.NamedTemporaryFile(suffix=".svs") as f2:
+            cache = SlideCache(max_slides=1)
+            for _ in range(3):
+                self.assertEqual(cache.read_region(f1.name, (0, 0), 0, (10, 10)), ((0, 0), 0, (10, 10)))
+            self.assertEqual(len(opened), 1)
+
+            # evicted (LRU) handle is closed only after it is no longer used
+            with cache.open(f1.name) as s1:
+                cache.read_region(f2.name, (0, 0), 0, (10, 10))
+                self.assertFalse(s1.closed)
+            self.assertTrue(s1.closed)
+            self.assertEqual(len(opened), 2)
+
+    def test_open_outside_lock(self):
+        with tempfile.NamedTemporaryFile(suffix=".svs") as f1, tempfile.NamedTemporaryFile(suffix=".svs") as f2:
+
+            class SlowSlide(MockSlide):
+                def __init__(self, path):
+                    if path == f1.name:
+                        time.sleep(0.5)
+                    super().__init__(path)
+
+            cache = SlideCache()
+            with patch("monailabel.interfaces.utils.wsi._openslide", new=lambda: SimpleNamespace(OpenSlide=SlowSlide)):
+                readers = [
+                    threading.Thread(target=cache.read_region, args=(f1.name, (0, 0), 0, (10, 10))) for _ in range(3)
+                ]
+                for t in readers:
+                    t.start()
+                time.sleep(0.1)
+
+                # other slides are available while the (slow) slide is being opened
+                start = time.time()
+                cache.read_region(f2.name, (0, 0), 0, (10, 10))
+                self.assertLess(time.time() - start, 0.3)
+
+                for t in readers:
+                    t.join()
+            self.assertEqual(sorted(s.path for s in opened), sorted([f1.name, f2.name]))
+            self.assertEqual(len([s for s in opened if s.path == f1.name][0].reads), 3)
+
+            # failure to open is raised (to all the waiters) and not cached
+            def fail(path):
+                raise OSError("unsupported slide")
+
+            cache.clear()
+            with patch("monailabel.interfaces.utils.wsi._openslide", new=lambda: SimpleNamespace(OpenSlide=fail)):
+                self.assertRaises(OSError, cache.read_region, f1.name, (0, 0), 0, (10, 10))
+            self.assertEqual(cache.read_region(f1.name, (0, 0), 0, (10, 10)), ((0, 0), 0, (10, 10)))
+
+    def test_prefetch(self):
+        with tempfile.NamedTemporaryFile(suffix=".svs") as f:
+            cache = SlideCache()
+            with patch("monailabel.interfaces.utils.wsi.slide_cache", new=lambda: cache):
+                tasks = create_infer_wsi_tasks({"tile_size": (100, 100), "tissue_threshold": 0}, f.name)
+            self.assertEqual(len(tasks), 6)
+
+            with cache.prefetch(f.name, tasks, depth=2):
+                time.sleep(0.5)
+                slide = opened[0]
+                self.assertEqual(len(slide.reads), 2)  # bounded read ahead
+
+                for t in tasks:
+                    self.assertEqual(cache.read_region(f.name, t["location"], 0, t["size"])[0], t["location"])
+                    time.sleep(0.1)
+
+                # all regions are read once (by the prefetcher)
+                self.assertEqual(sorted(slide.reads), sorted(t["location"] for t in tasks))
+            self.assertEqual(cache._prefetched, {})
+
+    def test_tissue(self):
+        with tempfile.NamedTemporaryFile(suffix=".svs") as f:
+            cache = SlideCache()
+            openslide = SimpleNamespace(OpenSlide=TissueSlide)
+            with patch("monailabel.interfaces.utils.wsi._openslide", new=lambda: openslide):
+                with patch("monailabel.interfaces.utils.wsi.slide_cache", new=lambda: cache):
+                    request = {"tile_size": (100, 100), "tissue_threshold": 0.05, "max_workers": 1}
+                    tasks = create_infer_wsi_tasks({**request, "tissue_threshold": 0}, f.name)
+                    self.assertEqual(len(tasks), 80)
+
+                    tasks = create_infer_wsi_tasks(request, f.name)
+                    self.assertEqual(len(tasks), 6)
+                    self.assertEqual(sorted(t["location"] for t in tasks)[0], (100, 100))
+                    for t in tasks:
+                        x, y = t["location"]
+                        self.assertTrue(100 <= x < 300 and 100 <= y < 400)
+
+                    # region which is entirely tissue;  lightly stained tiles are not dropped
+                    tasks = create_infer_wsi_tasks({**request, "location": (100, 100), "size": (200, 300)}, f.name)
+                    self.assertEqual(len(tasks), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from monai.data import MetaTensor
+from monai.transforms import LoadImaged, ScaleIntensityd
+
+from monailabel.transform.cache import MB, TransformCache, content_fingerprint, transform_fingerprint
+
+
+class TestTransformCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_lru(self):
+        cache = TransformCache(self.tmp.name, memory=2 * MB)
+        for key in ("a", "b", "c"):
+            cache.put(key, torch.zeros(MB // 4, dtype=torch.float32))  # 1 MB
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["used"]["memory"], 2)
+
+    def test_copy_on_write(self):
+        cache = TransformCache(self.tmp.name)
+        image = MetaTensor(torch.zeros(8, 8), meta={"spacing": 1.0})
+        cache.put("a", {"image": image, "image_meta_dict": {"spacing": 1.0}})
+
+        # hits share the storage (no copy); but not the meta
+        hit = cache.get("a")
+        self.assertEqual(hit["image"].data_ptr(), image.data_ptr())
+        hit["image"].meta["spacing"] = 2.0
+        hit["image_meta_dict"]["spacing"] = 2.0
+        other = cache.get("a")
+        self.assertEqual(other["image"].meta["spacing"], 1.0)
+        self.assertEqual(other["image_meta_dict"]["spacing"], 1.0)
+
+        # in-place modification of any view invalidates the entry
+        other["image"].add_(1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_concurrent_readers(self):
+        cache = TransformCache(self.tmp.name)
+        image = torch.zeros(64, 64)
+        cache.put("a", {"image": image})
+        barrier = threading.Barrier(2)
+
+        def read(mutate):
+            d = cache.get("a")
+            barrier.wait()  # both readers hold their result
+            if mutate:
+                d["image"] = d["image"].clone().add_(1)  # (repo transforms) clone before modifying in-place
+            barrier.wait()
+            return d
+
+        with ThreadPoolExecutor(2) as executor:
+            mutated, other = executor.map(read, [True, False])
+
+        # zero-copy hits;  both readers share the storage of the cached tensor
+        self.assertEqual(other["image"].data_ptr(), image.data_ptr())
+        self.assertNotEqual(mutated["image"].data_ptr(), image.data_ptr())
+        self.assertEqual(float(other["image"].sum()), 0)
+        self.assertEqual(float(mutated["image"].sum()), 64 * 64)
+
+        hit = cache.get("a")
+        self.assertEqual(hit["image"].data_ptr(), image.data_ptr())
+        self.assertEqual(cache.stats()["hits"], 3)
+        self.assertEqual(cache.stats()["invalidations"], 0)
+
+    def test_shared_disk(self):
+        cache = TransformCache(self.tmp.name, shared=True)
+        cache.put("a", {"image": torch.ones(4)})
+
+        # other worker (process) with empty memory tier
+        other = TransformCache(self.tmp.name, shared=True)
+        self.assertTrue(torch.equal(other.get("a")["image"], torch.ones(4)))
+        self.assertEqual(other.stats()["disk_hits"], 1)
+        self.assertIsNotNone(other.get("a"))
+        self.assertEqual(other.stats()["hits"], 1)
+
+        disk = TransformCache(self.tmp.name, disk=1)
+        disk.put("b", torch.ones(4), in_memory=False)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+        self.assertEqual(disk.stats()["disk_evictions"], 2)
+
+    def test_ttl_since_last_access(self):
+        cache = TransformCache(self.tmp.name)
+        cache.put("a", torch.ones(4), ttl=1)
+        for _ in range(3):
+            time.sleep(0.6)
+            self.assertIsNotNone(cache.get("a"))
+
+        time.sleep(1.1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_fingerprints(self):
+        f = os.path.join(self.tmp.name, "image.nii.gz")
+        with open(f, "w") as fp:
+            fp.write("a")
+        before = content_fingerprint(f)
+        with open(f, "w") as fp:
+            fp.write("ab")
+        self.assertNotEqual(before, content_fingerprint(f))
+
+        t1 = [LoadImaged("image"), ScaleIntensityd("image", minv=0.0, maxv=1.0)]
+        t2 = [LoadImaged("image"), ScaleIntensityd("image", minv=0.0, maxv=1.0)]
+        t3 = [LoadImaged("image"), ScaleIntensityd("image", minv=-1.0, maxv=1.0)]
+        self.assertEqual(transform_fingerprint(t1), transform_fingerprint(t2))
+        self.assertNotEqual(transform_fingerprint(t1), transform_fingerprint(t3))
+
+
+if __name__ == "__main__":
+    unittest.main()
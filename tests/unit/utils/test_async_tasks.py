@@ -0,0 +1,204 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from monailabel.utils.async_tasks import progress, utils
+from monailabel.utils.async_tasks.scheduler import TaskScheduler
+from monailabel.utils.async_tasks.utils import TASK_DONE, WarmWorker, run_background_task
+
+# emulates monailabel.utils.async_tasks.worker
+WORKER = f"""
+import json, os, sys
+for line in sys.stdin:
+    task = json.loads(line)
+    print("running", task["method"], os.getpid(), flush=True)
+    print("{TASK_DONE}", task["id"], 1 if task["request"].get("fail") else 0, flush=True)
+"""
+
+# keeps printing (e.g. logs of app threads) while idle;  marker file is written once all of it is consumed
+NOISY_WORKER = f"""
+import json, sys
+for line in sys.stdin:
+    task = json.loads(line)
+    print("running", task["method"], flush=True)
+    print("{TASK_DONE}", task["id"], 0, flush=True)
+    for i in range(20000):
+        print("idle", "x" * 64, i)
+    sys.stdout.flush()
+    open(task["request"]["marker"], "w").close()
+"""
+
+
+class TestWarmWorker(unittest.TestCase):
+    def test_reuse(self):
+        with patch.dict(os.environ, {"PYTHONPATH": os.environ.get("PYTHONPATH", "")}):
+            worker = WarmWorker({**os.environ}, cmd=[sys.executable, "-c", WORKER])
+            with patch.dict(utils.background_workers, {"scoring": worker}):
+                t1 = run_background_task({}, "scoring", debug=True)
+                t2 = run_background_task({"fail": True}, "scoring", debug=True)
+
+                self.assertEqual(t1["status"], "DONE")
+                self.assertEqual(t2["status"], "ERROR")
+                self.assertEqual(list(t1["details"]), list(t2["details"]))  # same (warm) process
+                self.assertEqual(list(t1["details"]), [f"running scoring {worker.process.pid}"])
+                self.assertIs(utils.background_workers["scoring"], worker)
+                self.assertEqual(utils.processes("scoring"), {})
+            worker.close()
+            self.assertFalse(worker.alive())
+
+    def test_idle_output(self):
+        with tempfile.TemporaryDirectory() as d, patch.dict(os.environ, {"PYTHONPATH": ""}):
+            worker = WarmWorker({**os.environ}, cmd=[sys.executable, "-c", NOISY_WORKER])
+            with patch.dict(utils.background_workers, {"scoring": worker}), patch.object(
+                utils.settings, "MONAI_LABEL_TASKS_WARM_WORKERS", ["scoring"]
+            ):
+                marker = os.path.join(d, "m1")
+                t1 = run_background_task({"marker": marker}, "scoring", debug=True)
+                self.assertEqual(list(t1["details"]), ["running scoring"])
+
+                # worker is never blocked on a full pipe between the tasks
+                for _ in range(100):
+                    if os.path.exists(marker):
+                        break
+                    time.sleep(0.1)
+                self.assertTrue(os.path.exists(marker))
+
+                t2 = run_background_task({"marker": os.path.join(d, "m2")}, "scoring", debug=True)
+                self.assertEqual((t2["status"], t2["details"][-1]), ("DONE", "running scoring"))
+            worker.close()
+
+            # killed while running a task
+            worker = WarmWorker({**os.environ}, cmd=[sys.executable, "-c", "import time; time.sleep(30)"])
+            worker.submit("t", "scoring", {}, {})
+            worker.process.kill()
+            self.assertIsNone(worker.readline())
+            self.assertIsNone(worker.readline())
+            worker.close()
+
+
+class TestTaskScheduler(unittest.TestCase):
+    @staticmethod
+    def _task(task_id, request=None):
+        return {"id": task_id, "status": "SUBMITTED", "request": request if request else {}}
+
+    def test_priority(self):
+        s = TaskScheduler(gpu_tasks=1, idle_time=0, interval=0.05)
+        order = []
+        release = threading.Event()
+        done = threading.Event()
+
+        def run(name, wait=None, last=False):
+            def fn():
+                order.append(name)
+                if wait:
+                    wait.wait(5)
+                if last:
+                    done.set()
+
+            return fn
+
+        s.submit(self._task("t"), "train", run("train", wait=release), gpus=[0])
+        time.sleep(0.2)
+        s.submit(self._task("b"), "batch_infer", run("batch", last=True), gpus=[0])
+        s.submit(self._task("s1", {"model": "x"}), "scoring", run("scoring"), gpus=[0])
+        queued = s.submit(self._task("s2", {"model": "x"}), "scoring", run("scoring"), gpus=[0])
+        self.assertEqual(queued["id"], "s1")  # coalesced
+        self.assertEqual(len(s.stats()["queued"]), 2)
+
+        release.set()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(order, ["train", "scoring", "batch"])
+
+    def test_pause(self):
+        with tempfile.TemporaryDirectory() as pause_dir:
+            s = TaskScheduler(idle_time=1, interval=0.05, pause_dir=pause_dir)
+            task = self._task("s")
+            units = []
+            stop = threading.Event()
+
+            def fn():
+                while not stop.is_set():
+                    progress.wait_if_paused(interval=0.05)
+                    units.append(time.time())
+                    time.sleep(0.02)
+
+            with patch.dict(os.environ, {progress.TASK_PAUSE_ENV: s.pause_file("s")}):
+                s.submit(task, "scoring", fn)
+                time.sleep(0.2)
+                self.assertIn("s", s.stats()["running"].values())
+
+                with s.interactive():
+                    self.assertEqual(task["status"], "PAUSED")
+                    self.assertTrue(os.path.exists(s.pause_file("s")))
+                    time.sleep(0.1)  # finish the current unit of work
+                    count = len(units)
+                    time.sleep(0.3)
+                    self.assertEqual(len(units), count)
+
+                time.sleep(1.5)
+                self.assertEqual(task["status"], "RUNNING")
+                self.assertFalse(os.path.exists(s.pause_file("s")))
+                self.assertGreater(len(units), count)
+
+                stop.set()
+                time.sleep(0.2)
+                self.assertEqual(s.stats()["running"], {})
+
+    def test_stop_cancel_queued(self):
+        s = TaskScheduler(idle_time=0, interval=0.05)
+        release = threading.Event()
+        s.submit(self._task("s1", {"model": "x"}), "scoring", lambda: release.wait(5))
+        time.sleep(0.2)
+        queued = s.submit(self._task("s2", {"model": "y"}), "scoring", lambda: None)
+        try:
+            with patch.object(utils, "scheduler", return_value=s):
+                self.assertIsNone(utils.stop_background_task("scoring"))
+                self.assertEqual(len(s.stats()["queued"]), 1)  # queued tasks are kept by default
+
+                self.assertIs(utils.stop_background_task("scoring", cancel_queued=True), queued)
+                self.assertEqual(queued["status"], "STOPPED")
+                self.assertEqual(s.stats()["queued"], [])
+        finally:
+            release.set()
+
+
+class TestProgress(unittest.TestCase):
+    def test_events(self):
+        with patch("builtins.print") as p:
+            progress.emit("scoring", done=1, total=4)
+            p.assert_not_called()  # not a background task
+
+            with patch.dict(os.environ, {progress.TASK_EVENTS_ENV: "true"}):
+                progress.emit("scoring", done=1, total=4, name="epistemic")
+            line = p.call_args[0][0]
+
+        event = progress.parse_event(line)
+        self.assertEqual((event["type"], event["done"], event["total"], event["name"]), ("scoring", 1, 4, "epistemic"))
+        self.assertIsNone(progress.parse_event("some log line"))
+
+        task: dict = {}
+        res = progress.update_progress(task, {**event, "ts": 110.0}, start=100.0)
+        self.assertIs(task["progress"], res)
+        self.assertEqual(res["progress"], 0.25)
+        self.assertEqual(res["throughput"], 0.1)
+        self.assertEqual(res["eta"], 30.0)
+        self.assertEqual(res["seq"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+from monailabel.tasks.infer.batching import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_batching(self):
+        batcher = MicroBatcher(max_batch_size=4, max_wait=2)
+        sizes = []
+
+        def forward(x):
+            sizes.append(x.shape[0])
+            return x * 2
+
+        def run(i):
+            return batcher("key", torch.full((1, 2), float(i)), forward)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(run, range(4)))
+
+        self.assertEqual(sizes, [4])
+        for i, r in enumerate(results):
+            self.assertTrue(torch.equal(r, torch.full((2,), 2.0 * i)))
+
+    def test_incompatible_and_errors(self):
+        batcher = MicroBatcher(max_batch_size=4, max_wait=0.01)
+        r = batcher("a", torch.ones(1, 3), lambda x: {"pred": x + 1})
+        self.assertTrue(torch.equal(r["pred"], torch.full((3,), 2.0)))
+
+        def fail(x):
+            raise RuntimeError("failed")
+
+        self.assertRaises(RuntimeError, batcher, "b", torch.ones(1, 3), fail)
+
+
+if __name__ == "__main__":
+    unittest.main()
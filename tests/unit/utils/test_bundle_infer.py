@@ -0,0 +1,109 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import torch
+
+from monailabel.tasks.infer.bundle import BundleInferTask
+
+INFERENCE = {
+    "device": "cpu",
+    "displayable_configs": {"threshold": 0.5},
+    "network_def": {"_target_": "torch.nn.Conv3d", "in_channels": 1, "out_channels": 2, "kernel_size": 1},
+    "preprocessing": {
+        "_target_": "Compose",
+        "transforms": [
+            {"_target_": "LoadImaged", "keys": "image"},
+            {"_target_": "ScaleIntensityd", "keys": "image"},
+        ],
+    },
+    "postprocessing": {
+        "_target_": "Compose",
+        "transforms": [{"_target_": "AsDiscreted", "keys": "pred", "threshold": "@displayable_configs#threshold"}],
+    },
+}
+
+METADATA = {
+    "version": "0.1.0",
+    "description": "test bundle",
+    "network_data_format": {
+        "inputs": {"image": {"spatial_shape": [8, 8, 8]}},
+        "outputs": {"pred": {"channel_def": {"0": "background", "1": "spleen"}}},
+    },
+}
+
+
+class TestBundleInferTask(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = self.tmp.name
+        for d in ("configs", "models"):
+            os.makedirs(os.path.join(path, d))
+        self.config = os.path.join(path, "configs", "inference.json")
+        with open(self.config, "w") as fp:
+            json.dump(INFERENCE, fp)
+        with open(os.path.join(path, "configs", "metadata.json"), "w") as fp:
+            json.dump(METADATA, fp)
+        torch.save(torch.nn.Conv3d(1, 2, 1).state_dict(), os.path.join(path, "models", "model.pt"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_chains(self):
+        task = BundleInferTask(self.tmp.name, {})
+        self.assertTrue(task.is_valid())
+
+        data = {"device": "cpu", "threshold": 0.5}
+        with patch.object(task, "_create_pre_transforms", wraps=task._create_pre_transforms) as create:
+            pre = task.pre_transforms(data)
+            pre2 = task.pre_transforms(dict(data))
+            self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(pre), 2)
+
+        # instantiated only once;  but every request gets its own copy
+        self.assertTrue(all(a is not b and type(a) is type(b) for a, b in zip(pre, pre2)))
+        self.assertIsNot(task.inferer(data), task.inferer(data))
+
+        # different displayable config value
+        post = task.post_transforms(data)
+        post2 = task.post_transforms({"device": "cpu", "threshold": 0.8})
+        self.assertEqual(post2[0].threshold[0], 0.8)
+        self.assertEqual(post[0].threshold[0], 0.5)
+
+        # base config value is restored when not in request
+        task._chains.clear()
+        self.assertEqual(task.post_transforms({"device": "cpu"})[0].threshold[0], 0.5)
+
+    def test_bundle_modified(self):
+        task = BundleInferTask(self.tmp.name, {})
+        data = task.prepare_request({"device": "cpu"})
+        task.pre_transforms(data)
+        self.assertEqual(len(task._chains), 1)
+
+        # bundle files are checked once per request
+        with patch.object(task, "_bundle_files_ts", wraps=task._bundle_files_ts) as ts:
+            task.pre_transforms(data)
+            task.post_transforms(data)
+            self.assertEqual(ts.call_count, 0)
+
+        st = os.stat(self.config)
+        os.utime(self.config, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        task.prepare_request({"device": "cpu"})
+        self.assertEqual(len(task._chains), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import torch
+
+from monailabel.config import settings
+from monailabel.interfaces.exception import MONAILabelException
+from monailabel.interfaces.utils import model_server
+from monailabel.interfaces.utils.model_server import (
+    ModelServer,
+    ModelServerClient,
+    SharedArray,
+    release,
+    share,
+    unshare,
+)
+
+
+class TestModelServer(unittest.TestCase):
+    def test_share(self):
+        segments = []
+        request = {"image": np.ones((512, 512), dtype=np.float32), "label": torch.zeros(512, 1024), "small": [1, 2]}
+        shared = share(request, segments)
+        self.assertIsInstance(shared["image"], SharedArray)
+        self.assertIsInstance(shared["label"], SharedArray)
+        self.assertEqual(shared["small"], [1, 2])
+        self.assertEqual(len(segments), 2)
+
+        res = unshare(shared)
+        release(segments)
+        self.assertTrue(np.array_equal(res["image"], request["image"]))
+        self.assertTrue(torch.equal(res["label"], request["label"]))
+        self.assertEqual(segments, [])
+
+    def test_dispatch(self):
+        def handler(request):
+            if request.get("fail"):
+                raise ValueError("failed")
+            return {"device": request["device"], "sum": float(request["image"].sum())}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            address = os.path.join(tmp, "model.sock")
+            server = ModelServer(address, handler, device="cuda:1", authkey=b"secret")
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+            client = ModelServerClient([address], authkey=b"secret", timeout=10)
+            for _ in range(2):
+                res = client({"image": np.ones((1024, 1024), dtype=np.float32)})
+                self.assertEqual(res, {"device": "cuda:1", "sum": 1024 * 1024})
+            self.assertEqual(client._idle[address].qsize(), 1)  # connection is reused
+
+            with self.assertRaises(MONAILabelException):
+                client({"image": np.ones(1), "fail": True})
+            server.close()
+
+    def test_frontend_leader(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.object(settings, "MONAI_LABEL_MODEL_SERVER_PATH", tmp), patch.object(
+                model_server, "_frontend_lock", None
+            ):
+                self.assertTrue(model_server.is_frontend_leader(port=8123))
+                self.assertTrue(model_server.is_frontend_leader(port=8123))
+
+                # any other http worker (process) of the same server is not
+                code = "from monailabel.interfaces.utils.model_server import is_frontend_leader as f; print(f(8123))"
+                env = {**os.environ, "MONAI_LABEL_MODEL_SERVER_PATH": tmp}
+                out = subprocess.check_output([sys.executable, "-c", code], env=env, universal_newlines=True)
+                self.assertEqual(out.strip().splitlines()[-1], "False")
+
+                model_server._frontend_lock.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import torch
+
+from monailabel.tasks.infer.network_cache import MB, NetworkCache, network_size
+
+
+def _network():
+    return torch.nn.Linear(512, 512, bias=False)  # 1 MB
+
+
+class TestNetworkCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = NetworkCache(host_memory=2 * MB)
+        for owner in ("a", "b", "c"):
+            cache.put(owner, "cpu", _network(), ts=1)
+
+        self.assertIsNone(cache.get("a", "cpu", ts=1))
+        self.assertIsNotNone(cache.get("b", "cpu", ts=1))
+        self.assertIsNotNone(cache.get("c", "cpu", ts=1))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+        # model file changed
+        self.assertIsNone(cache.get("b", "cpu", ts=2))
+
+    def test_pinned_and_busy(self):
+        cache = NetworkCache(host_memory=2 * MB)
+        cache.put("a", "cpu", _network(), ts=1, pinned=True)
+        cache.put("b", "cpu", _network(), ts=1)
+        with cache.busy("b"):
+            cache.put("c", "cpu", _network(), ts=1)
+            self.assertIsNotNone(cache.get("a", "cpu", ts=1))
+            self.assertIsNotNone(cache.get("b", "cpu", ts=1))
+
+        cache.put("d", "cpu", _network(), ts=1)
+        self.assertIsNotNone(cache.get("a", "cpu", ts=1))
+        self.assertIsNone(cache.get("b", "cpu", ts=1))
+
+    def test_stats(self):
+        cache = NetworkCache()
+        network = _network()
+        cache.put("a", "cpu", network, ts=1, name="segmentation")
+        cache.get("a", "cpu", ts=1)
+        cache.remove("x")
+
+        stats = cache.stats()
+        self.assertEqual(network_size(network), MB)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["used"]["cpu"], 1)
+        self.assertEqual(stats["networks"][0]["name"], "segmentation")
+
+        cache.remove("a")
+        self.assertEqual(len(cache.stats()["networks"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
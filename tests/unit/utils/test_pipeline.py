@@ -0,0 +1,127 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import torch
+
+from monailabel.interfaces.tasks.infer_v2 import InferType
+from monailabel.tasks.infer.basic_infer import BasicInferTask
+from monailabel.tasks.infer.pipeline import BatchInferPipeline
+
+
+class Network(torch.nn.Module):
+    sizes = []  # shared by copies (of the network cache)
+
+    def forward(self, x):
+        self.sizes.append(x.shape[0])
+        return x * 2 + 1
+
+
+class LoadTile:
+    def __call__(self, data):
+        d = dict(data)
+        d["image"] = torch.full((1, data["size"], data["size"]), float(data["value"]))
+        return d
+
+
+class Contours:
+    def __call__(self, data):
+        d = dict(data)
+        d["result"] = {"sum": float(d["pred"].sum()), "value": d["value"]}
+        return d
+
+
+class TileInferTask(BasicInferTask):
+    def __init__(self):
+        super().__init__(None, Network(), InferType.SEGMENTATION, ["tissue"], 2, "Tile Infer")
+
+    def pre_transforms(self, data=None):
+        return [LoadTile()]
+
+    def post_transforms(self, data=None):
+        return [Contours()]
+
+    def writer(self, data, extension=None, dtype=None):
+        return None, data["result"]
+
+
+class TestBatchInferPipeline(unittest.TestCase):
+    def test_pipeline(self):
+        task = TileInferTask()
+        requests = [{"value": i, "size": 4 if i < 10 else 2, "device": "cpu", "logging": "WARNING"} for i in range(11)]
+        expected = [task(r)[1] for r in requests]
+        for e in expected:
+            e.pop("latencies")
+
+        Network.sizes.clear()
+        pipeline = BatchInferPipeline(task, batch_size=4, workers=2)
+        results = dict(pipeline(requests))
+
+        self.assertEqual(sorted(results), list(range(11)))
+        for i, (_, result) in results.items():
+            latencies = result.pop("latencies")
+            self.assertEqual(result, expected[i])
+            self.assertEqual(set(latencies), {"pre", "infer", "invert", "post", "write", "total", "transform"})
+
+        # inputs of different shape are never batched together
+        self.assertEqual(sum(Network.sizes), 11)
+        self.assertTrue(max(Network.sizes) <= 4 and len(Network.sizes) < 11)
+
+    def test_out_of_memory(self):
+        class SmallGPUTask(TileInferTask):
+            def run_inferer_batch(self, batch, device="cuda"):
+                if len(batch) > 2:
+                    raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+                return super().run_inferer_batch(batch, device)
+
+        task = SmallGPUTask()
+        requests = [{"value": i, "size": 4, "device": "cpu", "logging": "WARNING"} for i in range(10)]
+        expected = [task(r)[1]["sum"] for r in requests]
+
+        Network.sizes.clear()
+        with ThreadPoolExecutor(1) as executor:
+            pipeline = BatchInferPipeline(task, batch_size=8, workers=2, executor=executor, timeout=60)
+            results = dict(pipeline(requests))
+
+        self.assertEqual([results[i][1]["sum"] for i in range(10)], expected)
+        self.assertEqual(sum(Network.sizes), 10)
+        self.assertTrue(max(Network.sizes) <= 2)
+
+    def test_timeout(self):
+        class SlowTask(TileInferTask):
+            def run_inferer_batch(self, batch, device="cuda"):
+                time.sleep(1)
+                return super().run_inferer_batch(batch, device)
+
+        requests = [{"value": i, "size": 4, "device": "cpu", "logging": "WARNING"} for i in range(4)]
+        with ThreadPoolExecutor(1) as executor:
+            pipeline = BatchInferPipeline(SlowTask(), batch_size=2, workers=2, executor=executor, timeout=0.2)
+            self.assertRaises(FutureTimeoutError, lambda: list(pipeline(requests)))
+
+    def test_errors(self):
+        task = TileInferTask()
+        requests = [{"value": i, "size": 4, "device": "cpu"} for i in range(3)] + [{"value": 3, "device": "cpu"}]
+        self.assertRaises(KeyError, lambda: list(BatchInferPipeline(task, batch_size=2, workers=2)(requests)))
+
+        class CustomTask(TileInferTask):
+            def __call__(self, request, callbacks=None):
+                return super().__call__(request, callbacks)
+
+        self.assertTrue(BatchInferPipeline.supported(task))
+        self.assertFalse(BatchInferPipeline.supported(CustomTask()))
+
+
+if __name__ == "__main__":
+    unittest.main()
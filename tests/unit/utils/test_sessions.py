@@ -10,10 +10,17 @@
 # limitations under the License.
 
 import os
+import shutil
+import tempfile
 import time
 import unittest
+from unittest.mock import patch
 
-from monailabel.utils.sessions import Sessions
+import torch
+
+from monailabel.config import settings
+from monailabel.transform.cache import CacheTransformDatad
+from monailabel.utils.sessions import Sessions, session_cache
 
 
 class MyTestCase(unittest.TestCase):
@@ -32,6 +39,62 @@ class MyTestCase(unittest.TestCase):
         sessions.remove_expired()
         assert len(sessions) == count
 
+    def test_session_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sessions = Sessions(os.path.join(tmp, "sessions"))
+            image = os.path.join(tmp, "image.nii.gz")
+            with open(image, "wb") as f:
+                f.write(b"image")
+
+            session_id, session = sessions.add_session(image)
+            cache = session_cache(session.path)
+            assert session_cache(session.path) is cache
+
+            t = CacheTransformDatad(keys="image", fingerprint="pre", cache=cache)
+            data = {"image_path": session.image, "model": "deepedit", "image": torch.ones(4, 4)}
+            t(data)
+            assert cache.stats()["items"] == 1
+
+            d = t.load({"image_path": session.image, "model": "deepedit"})
+            assert torch.equal(d["image"], torch.ones(4, 4))
+            # repeated requests (clicks) of the session are zero-copy hits
+            hit = t.load({"image_path": session.image, "model": "deepedit"})
+            assert hit["image"].data_ptr() == d["image"].data_ptr()
+            assert t.load({"image_path": session.image, "model": "deepgrow"}) is None
+
+            sessions.remove_session(session_id)
+            assert cache.stats()["items"] == 0
+            assert not os.path.exists(session.path)
+            assert session_cache(session.path) is not cache
+
+    @patch.object(settings, "MONAI_LABEL_SESSION_CACHE_MEMORY", 1)
+    @patch.object(settings, "MONAI_LABEL_TRANSFORM_CACHE_SHARED", False)
+    def test_session_cache_budget(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sessions = Sessions(os.path.join(tmp, "sessions"))
+            caches = []
+            for i in range(3):
+                image = os.path.join(tmp, f"image{i}.nii.gz")
+                with open(image, "wb") as f:
+                    f.write(b"image")
+                caches.append(session_cache(sessions.add_session(image)[1].path))
+
+            caches[0].put("a", torch.ones(256, 256), ttl=60)  # 256 KB
+            caches[1].put("b", torch.ones(256, 256), ttl=60)
+            assert caches[0].get("a") is not None  # session 0 is used more recently than session 1
+
+            # process-wide budget (1 MB);  least recently used session is evicted first
+            caches[2].put("c", torch.ones(768, 256), ttl=60)
+            assert caches[1].get("b") is None
+            assert caches[0].get("a") is not None and caches[2].get("c") is not None
+            assert sum(c.used for c in caches) <= 1024 * 1024
+
+            # caches of sessions removed by other workers are swept on remove_expired
+            shutil.rmtree(caches[0].session_path)
+            sessions.remove_expired()
+            assert caches[0].stats()["items"] == 0
+            assert caches[2].stats()["items"] == 1
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+# Copyright (c) MONAI Consortium
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#     http://www.apache.org/licenses/LICENSE-2.0
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import torch
+from monai.data import MetaTensor
+
+from monailabel.tasks.infer.network_cache import network_cache
+
+
+class TestVertebraPipeline(unittest.TestCase):
+    base_dir = os.path.realpath(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+    app_dir = os.path.join(base_dir, "sample-apps", "radiology")
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # lib (of the radiology app) is only importable with the app dir in sys.path
+        cls.modules = set(sys.modules)
+        sys.path.insert(0, cls.app_dir)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        sys.path.remove(cls.app_dir)
+        for m in set(sys.modules) - cls.modules:
+            if m == "lib" or m.startswith("lib."):
+                sys.modules.pop(m)
+
+    def setUp(self):
+        from lib.infers.segmentation_vertebra import SegmentationVertebra
+        from lib.infers.vertebra_pipeline import InferVertebraPipeline
+
+        torch.manual_seed(0)
+        network = torch.nn.Conv3d(2, 2, kernel_size=3, padding=1)
+        self.task = SegmentationVertebra(path=None, network=network, roi_size=(32, 32, 16), labels={"L1": 1, "L2": 2})
+        self.pipeline = InferVertebraPipeline(None, None, self.task)
+
+        image = MetaTensor(torch.rand(1, 48, 40, 32))
+        image.meta["spatial_shape"] = list(image.shape[1:])
+        self.image = image
+        self.centroids = [{"L1": [1, 20, 16, 10]}, {"L2": [2, 24, 20, 18]}, {"L1": [1, 30, 22, 14]}]
+        self.request = {"device": "cpu", "logging": "ERROR"}
+
+    def tearDown(self):
+        network_cache().remove(self.task)
+
+    def _segment_per_centroid(self):
+        # same as running the task for each centroid (before the crops were batched)
+        image, image_cached = self.image, None
+        result_mask = None
+        for centroid in self.centroids:
+            req = copy.deepcopy(self.request)
+            req.update(
+                {
+                    "image": image,
+                    "image_cached": image_cached,
+                    "original_size": list(self.image.shape),
+                    "centroids": [centroid],
+                    "pipeline_mode": True,
+                }
+            )
+            d, _ = self.task(req)
+            image = image_cached = d["image"]
+            result_mask = torch.zeros_like(image) if result_mask is None else result_mask
+
+            s = d["slices_cropped"]
+            m = torch.as_tensor(d["pred"])
+            region = result_mask[:, s[-3][0] : s[-3][1], s[-2][0] : s[-2][1], s[-1][0] : s[-1][1]]
+            region[m > 0] = d["current_label"]
+        return result_mask
+
+    def test_batched_same_as_per_centroid(self):
+        expected = self._segment_per_centroid()
+        self.assertGreater(int((expected > 0).sum()), 0)
+
+        for seg_batch_size in (0, 2):
+            with patch.object(
+                self.task, "run_invert_transforms", wraps=self.task.run_invert_transforms
+            ) as invert, patch.object(self.task, "writer", wraps=self.task.writer) as writer:
+                request = {**self.request, "seg_batch_size": seg_batch_size}
+                result_mask, latencies = self.pipeline.segment_vertebra(request, self.image, self.centroids)
+
+            self.assertEqual(invert.call_count, len(self.centroids))
+            self.assertEqual(writer.call_count, len(self.centroids))
+            self.assertTrue(torch.equal(torch.as_tensor(result_mask), torch.as_tensor(expected)))
+            self.assertEqual(set(latencies), {"pre", "infer", "invert", "post", "write", "total"})
+
+    def test_request_not_shared(self):
+        self.request["label_info"] = [{"name": "L1"}]
+        with patch.object(self.task, "finish", wraps=self.task.finish) as finish:
+            self.pipeline.segment_vertebra(self.request, self.image, self.centroids)
+
+        items = [c.args[0] for c in finish.call_args_list]
+        self.assertEqual(len(items), len(self.centroids))
+        self.assertIsNot(items[0]["label_info"], items[1]["label_info"])
+        self.assertIsNot(items[0]["label_info"], self.request["label_info"])
+
+
+if __name__ == "__main__":
+    unittest.main()